@@ -12,7 +12,11 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'TicTacToe'))
 path, script = os.path.split(sys.argv[0])
 os.chdir(os.path.abspath(path))
 
-install_requires = ['funcy==1.6','rome==0.0.3']
+install_requires = ['rome==0.0.3']
+
+extras_require = {
+    'batch' : ['numpy']
+}
 
 setup(
     name='TicTacToe',
@@ -24,6 +28,7 @@ setup(
     include_package_data=True,
     zip_safe=False,
     install_requires=install_requires,
+    extras_require=extras_require,
     test_suite='test'
 )
 
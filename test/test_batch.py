@@ -0,0 +1,75 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from tictactoe.batch         import (evaluate_grid_hashes, evaluate_bitboards, grid_hashes_to_lanes,
+                                     lanes_to_grid_hashes)
+from tictactoe.compute       import get_all_possible_lines
+from tictactoe.errors        import TicTacToeHashException
+from tictactoe.hash.bitboard import BitBoard, BitBoard4, BitBoard5
+from tictactoe.line.line     import Line
+
+from test.test_engine        import random_grids
+
+
+BITBOARD_KLASSES = (BitBoard, BitBoard4, BitBoard5)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class BatchEvaluationTest(unittest.TestCase):
+
+    def test_matches_grids(self):
+        for board_cls in BITBOARD_KLASSES:
+            mode = board_cls.MODE
+            grids = random_grids(grid_cls=board_cls.GRID_KLASS,total=60)
+            lines = get_all_possible_lines(mode=mode)
+            result = evaluate_grid_hashes(hashes=[g.hash for g in grids],mode=mode,extra=True)
+
+            self.assertEqual(len(result), len(grids))
+
+            for n, grid in enumerate(grids):
+                self.assertEqual(result.winner[n], grid.winner())
+                self.assertEqual(result.status[n], grid.status(extra=True))
+                self.assertEqual(result.free_cells[n], grid.total_free_cells())
+                self.assertEqual(list(result.cells[n]), [c.player for c in grid.cells])
+                self.assertEqual(list(result.line_events[n]),
+                                 [Line(grid=grid,indexes=[c - 1 for c in cells]).event(extra=True)
+                                  for cells in lines])
+
+    def test_bitboards_match_hashes(self):
+        for board_cls in BITBOARD_KLASSES:
+            mode = board_cls.MODE
+            boards = [board_cls.from_grid(grid=g) for g in random_grids(grid_cls=board_cls.GRID_KLASS,total=60)]
+
+            by_hash = evaluate_grid_hashes(hashes=[b.to_grid().hash for b in boards],mode=mode)
+            by_bitboards = evaluate_bitboards(player_1=[b.player_1 for b in boards],
+                                              player_2=[b.player_2 for b in boards],
+                                              mode=mode)
+
+            self.assertTrue((by_hash.cells == by_bitboards.cells).all())
+            self.assertTrue((by_hash.status == by_bitboards.status).all())
+            self.assertTrue((by_hash.line_events == by_bitboards.line_events).all())
+
+    def test_lanes_round_trip(self):
+        for board_cls in BITBOARD_KLASSES:
+            hashes = [g.hash for g in random_grids(grid_cls=board_cls.GRID_KLASS,total=20)]
+            lanes = grid_hashes_to_lanes(hashes=hashes,mode=board_cls.MODE)
+
+            self.assertEqual(lanes_to_grid_hashes(lanes=lanes), hashes)
+
+    def test_invalid_grids(self):
+        grid = BitBoard5().to_grid()
+
+        with self.assertRaises(TicTacToeHashException):
+            evaluate_grid_hashes(hashes=[grid.hash, grid.hash | 2],mode=grid.MODE)
+
+        # 5x5 hashes don't fit in a single lane.
+        with self.assertRaises(TicTacToeHashException):
+            evaluate_grid_hashes(hashes=numpy.zeros(4, dtype=numpy.uint64),mode=grid.MODE)
+
+
+if __name__ == '__main__':
+    unittest.main()
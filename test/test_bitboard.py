@@ -0,0 +1,49 @@
+import unittest
+
+from tictactoe.errors        import TicTacToeHashException
+from tictactoe.hash.bitboard import BitBoard, BitBoard4, BitBoard5
+from tictactoe.settings      import PLAYER_1, PLAYER_2
+
+from test.test_grid          import play_random_game
+
+
+BITBOARD_KLASSES = (BitBoard, BitBoard4, BitBoard5)
+
+
+class BitBoardTest(unittest.TestCase):
+
+    def test_grid_round_trip(self):
+        for board_cls in BITBOARD_KLASSES:
+            for seed in xrange(0, 3, 1):
+                for grid, move in play_random_game(grid_cls=board_cls.GRID_KLASS,seed=seed):
+                    board = board_cls.from_grid(grid=grid)
+
+                    self.assertEqual(board.to_grid().hash, grid.hash)
+                    self.assertEqual(board.state, grid.state.hash)
+
+                    for cell in grid.cells:
+                        bit = 1 << (cell.number - 1)
+                        self.assertEqual(bool(board.player_1 & bit), cell.player == PLAYER_1)
+                        self.assertEqual(bool(board.player_2 & bit), cell.player == PLAYER_2)
+
+    def test_hash_and_binary_round_trip(self):
+        for board_cls in BITBOARD_KLASSES:
+            for grid, move in play_random_game(grid_cls=board_cls.GRID_KLASS,seed=3):
+                board = board_cls.from_grid(grid=grid.apply_move(move))
+
+                self.assertEqual(board.hash, board.player_1 | (board.player_2 << board_cls.CELLS))
+                self.assertEqual(board_cls.from_hash(hash=board.hash).hash, board.hash)
+                self.assertEqual(board_cls.from_binary(binary=board.binary).hash, board.hash)
+
+    def test_invalid_bitboards(self):
+        for i, board_cls in enumerate(BITBOARD_KLASSES):
+            with self.assertRaises(TicTacToeHashException):
+                board_cls(player_1=1,player_2=1)
+
+            # A grid of another game mode.
+            with self.assertRaises(TicTacToeHashException):
+                board_cls.from_grid(grid=BITBOARD_KLASSES[(i + 1) % len(BITBOARD_KLASSES)].GRID_KLASS())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+from tictactoe.board    import Board, Board4, Board5
+from tictactoe.errors   import TicTacToeHashException, CellIsTaken
+from tictactoe.settings import PLAYER_1, PLAYER_2
+
+from test.test_grid     import play_random_game
+
+
+BOARD_KLASSES = (Board, Board4, Board5)
+
+
+class BoardTest(unittest.TestCase):
+
+    def assertBoardIsGrid(self,board,grid):
+        self.assertEqual(board.hash, grid.hash)
+        self.assertEqual(board.state, grid.state.hash)
+        self.assertEqual(board.zobrist, grid.zobrist)
+        self.assertEqual(board.total_taken_cells(), grid.total_taken_cells())
+        self.assertEqual(board.free_cells(), [c.number for c in grid.cells_taken()])
+        self.assertEqual(board.winner(), grid.winner())
+        self.assertEqual(board.status(extra=True), grid.status(extra=True))
+
+    def test_make_move_matches_apply_move(self):
+        for board_cls in BOARD_KLASSES:
+            for seed in xrange(0, 3, 1):
+                board = board_cls()
+
+                for grid, move in play_random_game(grid_cls=board_cls.GRID_KLASS,seed=seed):
+                    self.assertBoardIsGrid(board, grid)
+                    board.make_move(move)
+
+                self.assertBoardIsGrid(board, grid.apply_move(move))
+                self.assertEqual(board.to_grid().hash, grid.apply_move(move).hash)
+
+    def test_unmake_move_restores_board(self):
+        for board_cls in BOARD_KLASSES:
+            played = play_random_game(grid_cls=board_cls.GRID_KLASS,seed=7)
+            board = board_cls()
+
+            for grid, move in played:
+                board.make_move(move)
+
+            for grid, move in reversed(played):
+                self.assertIs(board.unmake_move(), move)
+                self.assertBoardIsGrid(board, grid)
+
+            self.assertEqual(board.moves, ())
+            with self.assertRaises(TicTacToeHashException):
+                board.unmake_move()
+
+    def test_illegal_moves(self):
+        for i, board_cls in enumerate(BOARD_KLASSES):
+            move = board_cls.MOVE_KLASS
+            board = board_cls()
+            board.make_move(move(number=1,player=PLAYER_1))
+
+            with self.assertRaises(CellIsTaken):
+                board.make_move(move(number=1,player=PLAYER_2))
+
+            # Player 1 moving twice in a row.
+            with self.assertRaises(TicTacToeHashException):
+                board.make_move(move(number=2,player=PLAYER_1))
+
+            # A grid of another game mode.
+            with self.assertRaises(TicTacToeHashException):
+                board_cls(grid=BOARD_KLASSES[(i + 1) % len(BOARD_KLASSES)].GRID_KLASS())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import cPickle
+import shutil
+import tempfile
+import unittest
+
+from tictactoe.cache    import (CACHE_VERSION, NAMED_TABLES, ModeTable, get_cache_directory,
+                                set_cache_directory, table_cache_path, precompile_tables)
+from tictactoe.compute  import WIN_LINE_MASKS, create_win_line_masks
+from tictactoe.settings import TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW
+
+
+TABLE_NAME = 'test_cache_table'
+
+
+class ModeTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self._directory = get_cache_directory()
+        self.directory = tempfile.mkdtemp()
+        self.built = []
+
+    def tearDown(self):
+        set_cache_directory(directory=self._directory)
+        NAMED_TABLES.pop(TABLE_NAME, None)
+        shutil.rmtree(self.directory)
+
+    def builder(self,mode):
+        self.built.append(mode)
+        return ('built', mode)
+
+    def failing_builder(self,mode):
+        raise AssertionError('Table of mode {} was built instead of loaded'.format(mode))
+
+    def test_tables_are_built_lazily(self):
+        table = ModeTable(builder=self.builder)
+
+        self.assertEqual(self.built, [])
+        self.assertEqual(table[TTT_4_IN_A_ROW], ('built', TTT_4_IN_A_ROW))
+        self.assertEqual(table[TTT_4_IN_A_ROW], ('built', TTT_4_IN_A_ROW))
+        self.assertEqual(self.built, [TTT_4_IN_A_ROW])
+        self.assertNotIn(TTT_3_IN_A_ROW, table)
+
+        table.build()
+        self.assertEqual(sorted(self.built), [TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW])
+
+        with self.assertRaises(KeyError):
+            table[3]
+
+    def test_lazy_tables_match_builders(self):
+        for mode in (TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW):
+            self.assertEqual(WIN_LINE_MASKS[mode], create_win_line_masks(mode=mode))
+
+    def test_precompiled_tables_are_loaded(self):
+        ModeTable(builder=self.builder,name=TABLE_NAME)
+        paths = precompile_tables(directory=self.directory)
+
+        self.assertIn(table_cache_path(directory=self.directory,name=TABLE_NAME,mode=TTT_5_IN_A_ROW), paths)
+
+        set_cache_directory(directory=self.directory)
+        table = ModeTable(builder=self.failing_builder,name=TABLE_NAME)
+
+        self.assertEqual(table[TTT_5_IN_A_ROW], ('built', TTT_5_IN_A_ROW))
+
+    def test_bad_cache_files_are_ignored(self):
+        set_cache_directory(directory=self.directory)
+
+        with open(table_cache_path(directory=self.directory,name=TABLE_NAME,mode=TTT_3_IN_A_ROW), 'wb') as f:
+            cPickle.dump((CACHE_VERSION + 1, 'stale'), f)
+
+        with open(table_cache_path(directory=self.directory,name=TABLE_NAME,mode=TTT_4_IN_A_ROW), 'wb') as f:
+            f.write('not a pickle')
+
+        table = ModeTable(builder=self.builder,name=TABLE_NAME)
+
+        for mode in (TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW):
+            self.assertEqual(table[mode], ('built', mode))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from tictactoe.errors    import TicTacToeException
+from tictactoe.hash.cell import Cell, Cell4, Cell5
+from tictactoe.hash.move import Move, Move4, Move5
+from tictactoe.settings  import FREE_SPACE, PLAYER_1, PLAYER_2
+
+
+KLASSES = ((Cell, 9), (Cell4, 16), (Cell5, 25), (Move, 9), (Move4, 16), (Move5, 25))
+
+
+class CellTest(unittest.TestCase):
+
+    def test_cells_are_interned(self):
+        for cell_cls, length in KLASSES:
+            for number in xrange(1, length + 1, 1):
+                for player in (FREE_SPACE, PLAYER_1, PLAYER_2):
+                    cell = cell_cls(number=number,player=player)
+
+                    self.assertIs(type(cell), cell_cls)
+                    self.assertEqual((cell.number, cell.player), (number, player))
+                    self.assertEqual(cell.hash, 1 << ((number - 1) * 3 + player))
+
+                    self.assertIs(cell_cls(number=long(number),player=player), cell)
+                    self.assertIs(cell_cls.from_hash(hash=cell.hash), cell)
+
+        self.assertIsNot(Move(number=1,player=PLAYER_1), Cell(number=1,player=PLAYER_1))
+        self.assertIs(Cell(number=3), Cell(number=3,player=FREE_SPACE))
+
+    def test_invalid_cells(self):
+        for cell_cls, length in KLASSES:
+            for number, player in ((0, PLAYER_1), (-1, PLAYER_1), (length + 1, PLAYER_1),
+                                   (1, 3), (1, -1), ('1', PLAYER_1), (1.0, PLAYER_1),
+                                   (1, '1'), (None, PLAYER_1), (1, None)):
+                with self.assertRaises(TicTacToeException):
+                    cell_cls(number=number,player=player)
+
+            for hash in (0, -1, 3, 1 << (length * 3), '1', 1.0):
+                with self.assertRaises(TicTacToeException):
+                    cell_cls.from_hash(hash=hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
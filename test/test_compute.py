@@ -0,0 +1,113 @@
+import random
+import unittest
+
+from tictactoe.compute       import WIN_LINE_MASKS, decompose_grid_hash, get_all_possible_lines
+from tictactoe.errors        import TicTacToeException, TicTacToeHashException
+from tictactoe.events        import NEW_GAME, PLAYING, DRAW, PLAYER_1_WON, PLAYER_2_WON
+from tictactoe.hash.bitboard import BitBoard, BitBoard4, BitBoard5
+from tictactoe.settings      import (FREE_SPACE, PLAYER_1, PLAYER_2, MODES, GAME_MODES,
+                                     TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
+
+from test.test_grid          import play_random_game
+
+
+GAME_MODE_LIST = (TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
+
+
+def total_cells(mode):
+    return MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+def random_grid_hash(mode,generator):
+    return sum([1 << ((c * 3) + generator.choice((FREE_SPACE, PLAYER_1, PLAYER_2)))
+                for c in xrange(0, total_cells(mode=mode), 1)])
+
+def decompose_with_strings(hash,mode):
+
+    """
+        The original decompose_grid_hash, through the binary string of **hash**.
+    """
+
+    binary = bin(hash)[2:].zfill(MODES[GAME_MODES[mode]['GRID']]['length'])
+    fields = reversed([binary[b:b+3] for b in xrange(0, len(binary), 3)])
+
+    return [1 << ((int(field, 2) >> 1) + (cell * 3)) for cell, field in enumerate(fields)]
+
+
+class DecomposeGridHashTest(unittest.TestCase):
+
+    def test_decompose_matches_string_version(self):
+        generator = random.Random(0)
+
+        for mode in GAME_MODE_LIST:
+            for _ in xrange(0, 500, 1):
+                hash = random_grid_hash(mode=mode,generator=generator)
+                self.assertEqual(decompose_grid_hash(hash=hash,mode=mode),
+                                 decompose_with_strings(hash=hash,mode=mode))
+
+    def test_decompose_rejects_malformed_fields(self):
+        for mode in GAME_MODE_LIST:
+            hash = random_grid_hash(mode=mode,generator=random.Random(mode))
+
+            for cell in (0, total_cells(mode=mode) // 2, total_cells(mode=mode) - 1):
+                for field in (0, 3, 5, 6, 7):
+                    malformed = (hash & ~(7 << (cell * 3))) | (field << (cell * 3))
+
+                    with self.assertRaises(TicTacToeHashException):
+                        decompose_grid_hash(hash=malformed,mode=mode)
+
+    def test_decompose_rejects_invalid_hashes(self):
+        for mode in GAME_MODE_LIST:
+            hash = random_grid_hash(mode=mode,generator=random.Random(mode))
+
+            for invalid in (-hash, hash | (1 << (total_cells(mode=mode) * 3)), str(hash)):
+                with self.assertRaises(TicTacToeException):
+                    decompose_grid_hash(hash=invalid,mode=mode)
+
+        with self.assertRaises(ValueError):
+            decompose_grid_hash(hash=random_grid_hash(mode=TTT_3_IN_A_ROW,generator=random.Random(0)),
+                                mode=3)
+
+
+class WinLineTest(unittest.TestCase):
+
+    def winner_by_scanning(self,grid):
+        for line in get_all_possible_lines(mode=grid.MODE):
+            players = set([grid.cells[c-1].player for c in line])
+            if len(players) == 1 and FREE_SPACE not in players:
+                return players.pop()
+
+        return FREE_SPACE
+
+    def test_win_line_masks(self):
+        for mode, size in ((TTT_3_IN_A_ROW, 3), (TTT_4_IN_A_ROW, 4), (TTT_5_IN_A_ROW, 5)):
+            self.assertEqual(len(WIN_LINE_MASKS[mode]), (size * 2) + 2)
+
+            for mask in WIN_LINE_MASKS[mode]:
+                self.assertEqual(bin(mask).count('1'), size)
+
+    def test_winner_and_status(self):
+        for board_cls in (BitBoard, BitBoard4, BitBoard5):
+            for seed in xrange(0, 10, 1):
+                played = play_random_game(grid_cls=board_cls.GRID_KLASS,seed=seed)
+                grids = [grid for grid, move in played] + [played[-1][0].apply_move(played[-1][1])]
+
+                for grid in grids:
+                    winner = self.winner_by_scanning(grid=grid)
+                    board = board_cls.from_grid(grid=grid)
+
+                    self.assertEqual(grid.winner(), winner)
+                    self.assertEqual(board.winner(), winner)
+                    self.assertEqual(grid.status(extra=True), board.status(extra=True))
+
+                if winner == FREE_SPACE:
+                    self.assertEqual(grid.status(), DRAW)
+                else:
+                    self.assertEqual(grid.status(extra=True),
+                                     PLAYER_1_WON if winner == PLAYER_1 else PLAYER_2_WON)
+
+                self.assertEqual(grids[0].status(), NEW_GAME)
+                self.assertEqual(grids[1].status(), PLAYING)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import random
+import unittest
+
+from tictactoe.engine     import WIN_SCORE, DRAW_SCORE, Engine, player_to_move
+from tictactoe.errors     import TicTacToeEngineException
+from tictactoe.evaluation import Evaluator
+from tictactoe.hash.grid  import Grid, Grid4, Grid5
+from tictactoe.settings   import FREE_SPACE, PLAYER_1, PLAYER_2
+
+
+def back_up(score):
+
+    if score > DRAW_SCORE:
+        return -score + 1
+
+    if score < DRAW_SCORE:
+        return -score - 1
+
+    return DRAW_SCORE
+
+def solve(grid,solved):
+
+    """
+        Plain minimax score of **grid** for the player to move, on the same
+        scale as `Engine`, remembering every grid it solves in **solved**.
+    """
+
+    if grid.hash not in solved:
+        if grid.winner() != FREE_SPACE:
+            solved[grid.hash] = -WIN_SCORE
+
+        elif grid.total_free_cells() == 0:
+            solved[grid.hash] = DRAW_SCORE
+
+        else:
+            player = player_to_move(grid=grid)
+            solved[grid.hash] = max([back_up(solve(grid.apply_move(grid.MOVE_KLASS(number=c.number,player=player)),solved))
+                                     for c in grid.cells_taken(FREE_SPACE)])
+
+    return solved[grid.hash]
+
+def random_grids(grid_cls,total,seed=0):
+
+    generator = random.Random(seed)
+    grids = []
+
+    while len(grids) < total:
+        grid = grid_cls()
+
+        while grid.winner() == FREE_SPACE and grid.total_free_cells():
+            grids.append(grid)
+            cell = generator.choice(grid.cells_taken(FREE_SPACE))
+            grid = grid.apply_move(grid.MOVE_KLASS(number=cell.number,player=player_to_move(grid=grid)))
+
+        grids.append(grid)
+
+    return grids[:total]
+
+
+class EngineTest(unittest.TestCase):
+
+    def test_scores_match_minimax(self):
+        solved = {}
+
+        for grid in random_grids(grid_cls=Grid,total=150):
+            result = Engine().search(grid)
+
+            self.assertTrue(result.complete)
+            self.assertEqual(result.score, solve(grid=grid,solved=solved))
+
+            if result.move is not None:
+                self.assertEqual(back_up(solve(grid=grid.apply_move(result.move),solved=solved)), result.score)
+
+    def test_empty_grid_is_a_draw(self):
+        self.assertEqual(Engine().search(Grid()).score, DRAW_SCORE)
+
+    def test_takes_the_win(self):
+        grid = Grid4()
+        for number, player in ((1, PLAYER_1), (5, PLAYER_2), (2, PLAYER_1), (6, PLAYER_2),
+                               (3, PLAYER_1), (7, PLAYER_2)):
+            grid = grid.apply_move(grid.MOVE_KLASS(number=number,player=player))
+
+        result = Engine().search(grid)
+
+        self.assertEqual(result.score, WIN_SCORE - 1)
+        self.assertEqual((result.move.number, result.move.player), (4, PLAYER_1))
+
+    def test_limits(self):
+        result = Engine(max_nodes=10).search(Grid4())
+
+        self.assertFalse(result.complete)
+        self.assertIn(result.move.number, [c.number for c in Grid4().cells_taken(FREE_SPACE)])
+
+        for limit in ('max_nodes', 'max_time', 'max_depth'):
+            with self.assertRaises(TicTacToeEngineException):
+                Engine(**{limit : 0})
+
+        with self.assertRaises(TicTacToeEngineException):
+            Engine().search(Grid().hash)
+
+
+class IterativeSearchTest(unittest.TestCase):
+
+    def test_matches_search(self):
+        engine = Engine()
+
+        for grid in random_grids(grid_cls=Grid,total=60,seed=1):
+            reports = []
+            result = engine.iterative_search(grid,callback=reports.append)
+
+            self.assertTrue(result.complete)
+            self.assertEqual(result.score, Engine().search(grid).score)
+            self.assertEqual(result.iterations, tuple(reports))
+            self.assertEqual([r.depth for r in reports], range(1, len(reports) + 1))
+            self.assertIsNone(engine.table)
+
+            if reports:
+                self.assertEqual(result.move, reports[-1].move)
+                self.assertEqual(reports[-1].principal_variation[0], result.move)
+
+    def test_aspiration_windows(self):
+        for grid in random_grids(grid_cls=Grid4,total=8,seed=2):
+            if grid.winner() != FREE_SPACE:
+                continue
+
+            engine = Engine(max_depth=3,evaluator=Evaluator(mode=grid.MODE))
+            searched = Engine(max_depth=3,evaluator=Evaluator(mode=grid.MODE)).search(grid)
+
+            for window in (None, 1, 25):
+                self.assertEqual(engine.iterative_search(grid,window=window).score, searched.score)
+
+    def test_time_limits(self):
+        result = Engine().iterative_search(Grid5(),hard_time=0.05)
+
+        self.assertFalse(result.complete)
+        self.assertEqual(result.depth, len(result.iterations))
+        self.assertEqual(Grid5().cells[result.move.number-1].player, FREE_SPACE)
+
+        result = Engine().iterative_search(Grid5(),soft_time=0.0001)
+
+        self.assertTrue(result.complete)
+        self.assertEqual(len(result.iterations), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from tictactoe.compute    import get_all_possible_lines, compute_line_event
+from tictactoe.engine     import WIN_SCORE, Engine
+from tictactoe.errors     import TicTacToeException
+from tictactoe.evaluation import MAX_EVALUATION, DEFAULT_WEIGHTS, Evaluator
+from tictactoe.events     import LINE_PLAYER_1_MAJORITY
+from tictactoe.hash.grid  import Grid, Grid4, Grid5
+from tictactoe.settings   import PLAYER_1, PLAYER_2
+
+from test.test_grid       import play_random_game
+
+
+GRID_KLASSES = (Grid, Grid4, Grid5)
+
+
+def score_by_scanning(grid,weights=DEFAULT_WEIGHTS):
+
+    score = 0
+    for cells in get_all_possible_lines(mode=grid.MODE):
+        players = [grid.cells[c-1].player for c in cells]
+        score += weights[compute_line_event(players.count(PLAYER_1),players.count(PLAYER_2),
+                                            len(cells),extra=True)]
+
+    return score
+
+
+class EvaluatorTest(unittest.TestCase):
+
+    def test_reset_matches_scan(self):
+        for grid_cls in GRID_KLASSES:
+            evaluator = Evaluator(mode=grid_cls.MODE)
+
+            for grid, move in play_random_game(grid_cls=grid_cls,seed=4):
+                self.assertEqual(evaluator.evaluate(grid=grid), score_by_scanning(grid=grid))
+
+    def test_incremental_updates(self):
+        weights = {LINE_PLAYER_1_MAJORITY : 25}
+
+        for grid_cls in GRID_KLASSES:
+            played = play_random_game(grid_cls=grid_cls,seed=5)
+            evaluator = Evaluator(mode=grid_cls.MODE,weights=weights)
+            evaluator.reset()
+
+            for grid, move in played:
+                evaluator.make_move(move=move)
+                self.assertEqual(evaluator.score, Evaluator(mode=grid_cls.MODE,weights=weights)
+                                                  .evaluate(grid=grid.apply_move(move)))
+
+            for grid, move in reversed(played):
+                evaluator.unmake_move(move=move)
+                self.assertEqual(evaluator.score, score_by_scanning(grid=grid,weights=evaluator.weights))
+
+    def test_relative_score(self):
+        evaluator = Evaluator(mode=Grid5.MODE,weights={LINE_PLAYER_1_MAJORITY : WIN_SCORE})
+        grid = Grid5()
+
+        for number, player in ((1, PLAYER_1), (21, PLAYER_2), (2, PLAYER_1), (22, PLAYER_2), (3, PLAYER_1)):
+            grid = grid.apply_move(grid.MOVE_KLASS(number=number,player=player))
+
+        evaluator.reset(grid=grid)
+
+        self.assertEqual(evaluator.relative_score(player=PLAYER_1), MAX_EVALUATION)
+        self.assertEqual(evaluator.relative_score(player=PLAYER_2), -MAX_EVALUATION)
+
+    def test_engine_with_evaluator(self):
+        result = Engine(max_depth=2,evaluator=Evaluator(mode=Grid4.MODE)).search(Grid4())
+
+        self.assertTrue(abs(result.score) <= MAX_EVALUATION)
+        self.assertIsNotNone(result.move)
+
+    def test_invalid_evaluators(self):
+        with self.assertRaises(TicTacToeException):
+            Evaluator(mode=Grid4.MODE,weights={'majority' : 1})
+
+        with self.assertRaises(TicTacToeException):
+            Evaluator(mode=Grid4.MODE).reset(grid=Grid5())
+
+
+if __name__ == '__main__':
+    unittest.main()
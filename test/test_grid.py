@@ -0,0 +1,173 @@
+import random
+import unittest
+
+from tictactoe.errors       import TicTacToeException, TicTacToeHashException, CellIsTaken
+from tictactoe.hash.grid    import (Grid, Grid4, Grid5, apply_trusted_move, create_trusted_grid,
+                                    clear_grid_caches)
+from tictactoe.settings     import FREE_SPACE, PLAYER_1, PLAYER_2
+from tictactoe.verification import is_debug, set_debug
+
+
+GRID_KLASSES = (Grid, Grid4, Grid5)
+
+
+def play_random_game(grid_cls,seed=0):
+
+    """
+        Returns every (grid, move) pair of a random game of **grid_cls**,
+        moving with the checked `Grid.apply_move`.
+    """
+
+    generator = random.Random(seed)
+    grid, player = grid_cls(), PLAYER_1
+    played = []
+
+    while grid.winner() == FREE_SPACE and grid.total_free_cells():
+        move = grid.MOVE_KLASS(number=generator.choice(grid.cells_taken(FREE_SPACE)).number,
+                               player=player)
+        played.append((grid, move))
+
+        grid = grid.apply_move(move)
+        player = PLAYER_2 if player == PLAYER_1 else PLAYER_1
+
+    return played
+
+
+class ApplyMoveTest(unittest.TestCase):
+
+    def setUp(self):
+        clear_grid_caches()
+
+    def tearDown(self):
+        clear_grid_caches()
+
+    def test_apply_move_matches_grid_from_hash(self):
+        for grid_cls in GRID_KLASSES:
+            for grid, move in play_random_game(grid_cls=grid_cls,seed=1):
+                hash, cells = grid.hash, tuple(grid.cells)
+                child = grid.apply_move(move)
+
+                clear_grid_caches()
+                fresh = grid_cls(hash=child.hash)
+
+                self.assertEqual(child.hash, grid.hash ^ grid.cells[move.number-1].hash ^ move.hash)
+                self.assertEqual(child.cells, fresh.cells)
+                self.assertEqual(child.state.hash, fresh.state.hash)
+                self.assertEqual(child.total_free_cells(), fresh.total_free_cells())
+                self.assertEqual(child.winner(), fresh.winner())
+
+                # The parent grid is left untouched.
+                self.assertEqual(grid.hash, hash)
+                self.assertEqual(grid.cells, cells)
+
+    def test_apply_move_to_taken_cell(self):
+        for grid_cls in GRID_KLASSES:
+            move = grid_cls.MOVE_KLASS(number=1,player=PLAYER_1)
+            grid = grid_cls().apply_move(move)
+
+            self.assertIs(grid.apply_move(move), grid)
+            with self.assertRaises(CellIsTaken):
+                grid.apply_move(grid_cls.MOVE_KLASS(number=1,player=PLAYER_2))
+
+
+class TrustedGridTest(unittest.TestCase):
+
+    def setUp(self):
+        self._debug = is_debug()
+        set_debug(False)
+        clear_grid_caches()
+
+    def tearDown(self):
+        set_debug(self._debug)
+        clear_grid_caches()
+
+    def assertSameGrid(self,trusted,checked):
+        self.assertIs(type(trusted), type(checked))
+        self.assertEqual(trusted.hash, checked.hash)
+        self.assertEqual(trusted.cells, checked.cells)
+        self.assertEqual(trusted.state.hash, checked.state.hash)
+        self.assertEqual(trusted.total_taken_cells(), checked.total_taken_cells())
+        self.assertEqual(trusted.zobrist, checked.zobrist)
+
+    def test_trusted_move_matches_apply_move(self):
+        for grid_cls in GRID_KLASSES:
+            for seed in xrange(0, 5, 1):
+                for grid, move in play_random_game(grid_cls=grid_cls,seed=seed):
+                    self.assertSameGrid(apply_trusted_move(grid=grid,move=move), grid.apply_move(move))
+
+    def test_trusted_grid_matches_grid(self):
+        for grid_cls in GRID_KLASSES:
+            for grid, move in play_random_game(grid_cls=grid_cls):
+                hash = grid.apply_move(move).hash
+
+                clear_grid_caches()
+                trusted = create_trusted_grid(grid_cls=grid_cls,hash=hash)
+                clear_grid_caches()
+
+                self.assertSameGrid(trusted, grid_cls(hash=hash))
+
+    def test_debug_checks_trusted_moves(self):
+        for grid_cls in GRID_KLASSES:
+            grid = grid_cls().apply_move(grid_cls.MOVE_KLASS(number=1,player=PLAYER_1))
+
+            set_debug(True)
+            with self.assertRaises(CellIsTaken):
+                apply_trusted_move(grid=grid,move=grid_cls.MOVE_KLASS(number=1,player=PLAYER_2))
+
+            # Player 1 moving twice in a row.
+            with self.assertRaises(TicTacToeException):
+                apply_trusted_move(grid=grid,move=grid_cls.MOVE_KLASS(number=2,player=PLAYER_1))
+
+            set_debug(False)
+
+    def test_invalid_hash_always_raises(self):
+        for grid_cls in GRID_KLASSES:
+            empty = grid_cls().hash
+            cell_1, cell_2 = grid_cls.CELL_KLASS(number=1,player=PLAYER_1), grid_cls.CELL_KLASS(number=2,player=PLAYER_1)
+            free_1, free_2 = grid_cls.CELL_KLASS(number=1,player=FREE_SPACE), grid_cls.CELL_KLASS(number=2,player=FREE_SPACE)
+
+            # Besides the moves, every cell field must have exactly one bit.
+            invalid = (-1,
+                       1 << (len(grid_cls().cells) * 3),
+                       'hash',
+                       empty ^ free_1.hash ^ cell_1.hash ^ free_2.hash ^ cell_2.hash,
+                       empty ^ free_1.hash,
+                       empty | cell_1.hash,
+                       empty ^ free_2.hash ^ cell_2.hash ^ cell_1.hash)
+
+            for debug in (False, True, False):
+                set_debug(debug)
+
+                for hash in invalid:
+                    with self.assertRaises(TicTacToeException):
+                        grid_cls(hash=hash)
+
+
+class GridCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self._debug = is_debug()
+        set_debug(False)
+        clear_grid_caches()
+
+    def tearDown(self):
+        set_debug(self._debug)
+        clear_grid_caches()
+
+    def test_failed_apply_grid_is_not_cached(self):
+        for grid_cls in GRID_KLASSES:
+            move = grid_cls.MOVE_KLASS
+            grid_a = grid_cls().apply_move(move(number=1,player=PLAYER_1))
+            grid_b = grid_cls().apply_move(move(number=2,player=PLAYER_1))
+
+            with self.assertRaises(TicTacToeHashException):
+                grid_a.apply_grid(grid_b,backwards=True)
+
+            # Player 1 on cells 1 and 2, the grid apply_grid refused.
+            merged = grid_a.hash ^ grid_b.hash ^ grid_cls().hash
+            with self.assertRaises(TicTacToeHashException):
+                grid_cls(hash=merged)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from itertools import permutations
+
+from tictactoe.compute   import (multiset_permutations, player_combinations, compute_line_event,
+                                 get_all_possible_lines)
+from tictactoe.hash.grid import Grid, Grid4, Grid5
+from tictactoe.line      import generate_combinations
+from tictactoe.line.line import LINE_PATTERN_TABLE, Line
+from tictactoe.settings  import (FREE_SPACE, PLAYER_1, PLAYER_2, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW,
+                                 TTT_5_IN_A_ROW)
+
+from test.test_engine    import random_grids
+
+
+LINE_LENGTHS = ((TTT_3_IN_A_ROW, 3), (TTT_4_IN_A_ROW, 4), (TTT_5_IN_A_ROW, 5))
+
+
+class LineStateGenerationTest(unittest.TestCase):
+
+    def test_multiset_permutations(self):
+        for items in ([], [1], [0, 0, 0], [0, 1, 1], [2, 0, 1, 0], [0, 0, 1, 1, 2, 2]):
+            arrangements = list(multiset_permutations(items))
+
+            self.assertEqual(arrangements, sorted(set(permutations(items))))
+
+    def test_player_combinations(self):
+        for length in (3, 4, 5):
+            for player_1 in xrange(0, length + 1, 1):
+                for player_2 in xrange(0, length - player_1 + 1, 1):
+                    player_0 = length - player_1 - player_2
+                    players = [FREE_SPACE] * player_0 + [PLAYER_1] * player_1 + [PLAYER_2] * player_2
+
+                    self.assertEqual(player_combinations(player_0,player_1,player_2),
+                                     sorted(set(permutations(players))))
+
+    def test_generate_combinations(self):
+        for players in ([FREE_SPACE, PLAYER_1], [FREE_SPACE, PLAYER_2], [PLAYER_1, PLAYER_2]):
+            for length in (1, 3, 5):
+                combinations = generate_combinations(players,length)
+                expected = set([(a, b) for a in xrange(0, length + 1, 1) for b in xrange(0, length + 1, 1)
+                                if a + b == length])
+
+                self.assertEqual(len(combinations), length + 1)
+                self.assertEqual(set([tuple(c[p] for p in players) for c in combinations]), expected)
+
+                for c in combinations:
+                    self.assertEqual(sum(c), length)
+
+    def test_every_line_state(self):
+        for mode, length in LINE_LENGTHS:
+            states = Line.STATES[mode]
+            counts = set([(s.player_0, s.player_1, s.player_2) for s in states])
+
+            # One state per number of marks of each player.
+            self.assertEqual(len(states), len(counts))
+            self.assertEqual(counts, set([(length - a - b, a, b) for a in xrange(0, length + 1, 1)
+                                          for b in xrange(0, length - a + 1, 1)]))
+
+            for state in states:
+                self.assertEqual(sorted(state.permutations),
+                                 sorted(set(permutations([FREE_SPACE] * state.player_0 +
+                                                         [PLAYER_1] * state.player_1 +
+                                                         [PLAYER_2] * state.player_2))))
+
+
+class LinePatternTest(unittest.TestCase):
+
+    def test_pattern_table(self):
+        for mode, length in LINE_LENGTHS:
+            table = LINE_PATTERN_TABLE[mode]
+            self.assertEqual(len(table), 3 ** length)
+
+            for pattern, (state, event, extra_event) in enumerate(table):
+                digits = [(pattern // (3 ** n)) % 3 for n in xrange(0, length, 1)]
+                player_1, player_2 = digits.count(PLAYER_1), digits.count(PLAYER_2)
+
+                self.assertEqual((state.player_1, state.player_2), (player_1, player_2))
+                self.assertIn(state, Line.STATES[mode])
+                self.assertEqual(event, compute_line_event(player_1,player_2,length))
+                self.assertEqual(extra_event, compute_line_event(player_1,player_2,length,extra=True))
+
+    def test_lines_of_grids(self):
+        for grid_cls in (Grid, Grid4, Grid5):
+            lines = get_all_possible_lines(mode=grid_cls.MODE)
+
+            for grid in random_grids(grid_cls=grid_cls,total=30):
+                for cells in lines:
+                    line = Line(grid=grid,indexes=[c - 1 for c in cells])
+                    players = [grid.cells[c-1].player for c in cells]
+                    player_1, player_2 = players.count(PLAYER_1), players.count(PLAYER_2)
+
+                    self.assertEqual(line.pattern(), sum([p * (3 ** n) for n, p in enumerate(players)]))
+                    self.assertEqual((line.state().player_1, line.state().player_2), (player_1, player_2))
+                    self.assertEqual(line.event(extra=True),
+                                     compute_line_event(player_1,player_2,len(cells),extra=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
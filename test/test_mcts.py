@@ -0,0 +1,91 @@
+import unittest
+
+from tictactoe.errors    import TicTacToeEngineException
+from tictactoe.hash.grid import Grid, Grid5
+from tictactoe.mcts      import MonteCarloEngine
+from tictactoe.settings  import PLAYER_1, PLAYER_2
+
+
+def play(grid,moves):
+
+    for number, player in moves:
+        grid = grid.apply_move(grid.MOVE_KLASS(number=number,player=player))
+
+    return grid
+
+
+class MonteCarloEngineTest(unittest.TestCase):
+
+    def test_takes_the_win(self):
+        # |x|x|-|
+        # |o|o|-|
+        # |-|-|-|
+        grid = play(grid=Grid(),moves=((1, PLAYER_1), (4, PLAYER_2), (2, PLAYER_1), (5, PLAYER_2)))
+        result = MonteCarloEngine(max_iterations=2000,seed=1).search(grid)
+
+        self.assertEqual((result.move.number, result.move.player), (3, PLAYER_1))
+        self.assertEqual(result.iterations, 2000)
+
+    def test_same_seed_same_search(self):
+        results = [MonteCarloEngine(max_iterations=300,seed=7).search(Grid5()) for _ in xrange(0, 2, 1)]
+
+        self.assertEqual([(r.move, r.visits, r.win_rate, r.tree_size) for r in results[:1]],
+                         [(r.move, r.visits, r.win_rate, r.tree_size) for r in results[1:]])
+
+    def test_tree_is_reused(self):
+        engine = MonteCarloEngine(max_iterations=1000,seed=3)
+        grid = Grid()
+
+        result = engine.search(grid)
+        self.assertEqual(result.reused, 0)
+        self.assertEqual(engine.root.visits, 1000)
+
+        # The reply of the opponent that was searched the most.
+        grid = grid.apply_move(result.move)
+        reply = max(engine.root.child(cell=result.move.number - 1).children, key=lambda c : c.visits)
+        visits = reply.visits
+        grid = grid.apply_move(grid.MOVE_KLASS(number=reply.cell + 1,player=reply.player))
+
+        result = engine.search(grid)
+
+        self.assertTrue(visits > 0)
+        self.assertEqual(result.reused, visits)
+        self.assertIs(engine.root, reply)
+        self.assertIsNone(engine.root.parent)
+        self.assertEqual(engine.root.visits, visits + 1000)
+
+    def test_advance_and_reset(self):
+        engine = MonteCarloEngine(max_iterations=200,seed=5)
+        result = engine.search(Grid())
+        child = engine.root.child(cell=result.move.number - 1)
+
+        engine.advance(result.move)
+        self.assertIs(engine.root, child)
+
+        # A move that can't be played from the new root drops the tree.
+        engine.advance(Grid.MOVE_KLASS(number=result.move.number,player=result.move.player))
+        self.assertIsNone(engine.root)
+
+        engine.search(Grid())
+        engine.reset()
+        self.assertEqual(engine.search(Grid()).reused, 0)
+
+    def test_finished_games(self):
+        grid = play(grid=Grid(),moves=((1, PLAYER_1), (4, PLAYER_2), (2, PLAYER_1), (5, PLAYER_2),
+                                       (3, PLAYER_1)))
+        result = MonteCarloEngine(max_iterations=10).search(grid)
+
+        self.assertIsNone(result.move)
+        self.assertEqual(result.playouts, 0)
+
+    def test_invalid_engines(self):
+        for limits in ({}, {'max_iterations' : 0}, {'max_time' : -1}):
+            with self.assertRaises(TicTacToeEngineException):
+                MonteCarloEngine(**limits)
+
+        with self.assertRaises(TicTacToeEngineException):
+            MonteCarloEngine(max_iterations=10).search(Grid().hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+from tictactoe.engine    import Engine
+from tictactoe.errors    import TicTacToeException
+from tictactoe.hash.grid import Grid, Grid4, Grid5
+from tictactoe.ordering  import KILLER_SLOTS, STATIC_PRIORS, MoveOrdering
+from tictactoe.settings  import PLAYER_1, PLAYER_2
+
+from test.test_engine    import random_grids
+
+
+class MoveOrderingTest(unittest.TestCase):
+
+    def test_static_priors(self):
+        for grid_cls, center in ((Grid, 5), (Grid4, 6), (Grid5, 13)):
+            ordering = MoveOrdering(mode=grid_cls.MODE,killers=0,history=False)
+            moves = ordering.order_moves(grid=grid_cls(),player=PLAYER_1)
+
+            self.assertEqual(sorted([m.number for m in moves]), range(1, len(grid_cls().cells) + 1))
+            self.assertEqual(moves[0].number, center)
+
+            priors = STATIC_PRIORS[grid_cls.MODE]
+            self.assertEqual([priors[m.number-1] for m in moves],
+                             sorted([priors[m.number-1] for m in moves], reverse=True))
+
+    def test_killer_moves(self):
+        ordering = MoveOrdering(mode=Grid.MODE,history=False)
+
+        for number in (1, 2, 3):
+            ordering.cutoff(move=Grid.MOVE_KLASS(number=number,player=PLAYER_1),depth=1,ply=2)
+
+        self.assertEqual(ordering.killers(ply=2), ((3, PLAYER_1), (2, PLAYER_1))[:KILLER_SLOTS])
+        self.assertEqual([m.number for m in ordering.order_moves(grid=Grid(),player=PLAYER_1,ply=2)][:2],
+                         [3, 2])
+
+        # Killers are kept per ply and per player.
+        self.assertEqual(ordering.order_moves(grid=Grid(),player=PLAYER_1,ply=1)[0].number, 5)
+        self.assertEqual(ordering.order_moves(grid=Grid(),player=PLAYER_2,ply=2)[0].number, 5)
+
+        ordering.new_search()
+        self.assertEqual(ordering.killers(ply=2), ())
+
+    def test_history(self):
+        ordering = MoveOrdering(mode=Grid.MODE,killers=0)
+        move = Grid.MOVE_KLASS(number=9,player=PLAYER_2)
+
+        ordering.cutoff(move=move,depth=3,ply=4)
+        ordering.cutoff(move=move,depth=1,ply=2)
+
+        self.assertEqual(ordering.history(number=9,player=PLAYER_2), 10)
+        self.assertEqual(ordering.order_moves(grid=Grid(),player=PLAYER_2)[0].number, 9)
+
+        ordering.new_search()
+        self.assertEqual(ordering.history(number=9,player=PLAYER_2), 5)
+
+        ordering.clear()
+        self.assertEqual(ordering.history(number=9,player=PLAYER_2), 0)
+
+    def test_first_move(self):
+        ordering = MoveOrdering(mode=Grid.MODE)
+        first = Grid.MOVE_KLASS(number=8,player=PLAYER_1)
+
+        self.assertEqual(ordering.order_moves(grid=Grid(),player=PLAYER_1,first=first)[0], first)
+
+    def test_engine_scores_do_not_change(self):
+        engine = Engine(ordering=MoveOrdering(mode=Grid.MODE))
+
+        for grid in random_grids(grid_cls=Grid,total=40,seed=5):
+            self.assertEqual(engine.search(grid).score, Engine().search(grid).score)
+
+    def test_invalid_orderings(self):
+        with self.assertRaises(TicTacToeException):
+            MoveOrdering(mode=Grid.MODE,killers=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
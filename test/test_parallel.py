@@ -0,0 +1,103 @@
+import unittest
+
+from tictactoe.engine    import Engine
+from tictactoe.errors    import TicTacToeEngineException
+from tictactoe.hash.grid import Grid, Grid4
+from tictactoe.parallel  import ParallelSearch, split_budget
+from tictactoe.settings  import FREE_SPACE, PLAYER_1, PLAYER_2
+
+from test.test_engine    import random_grids
+
+
+class ParallelSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.searches = []
+
+    def tearDown(self):
+        for search in self.searches:
+            search.close()
+
+    def create_search(self,**options):
+        search = ParallelSearch(**options)
+        self.searches.append(search)
+        return search
+
+    def playing_grids(self,grid_cls,total,seed=0):
+        return [g for g in random_grids(grid_cls=grid_cls,total=total,seed=seed)
+                if g.winner() == FREE_SPACE and g.total_free_cells()]
+
+    def test_split_budget(self):
+        self.assertEqual(split_budget(total=10,parts=4), [3, 3, 2, 2])
+        self.assertEqual(split_budget(total=8,parts=4), [2, 2, 2, 2])
+        self.assertEqual(split_budget(total=3,parts=3), [1, 1, 1])
+
+    def test_scores_match_engine(self):
+        for workers in (1, 2):
+            search = self.create_search(workers=workers)
+
+            for grid in self.playing_grids(grid_cls=Grid,total=30):
+                result = search.search(grid)
+
+                self.assertTrue(result.complete)
+                self.assertEqual(result.score, Engine().search(grid).score)
+                self.assertEqual(grid.cells[result.move.number-1].player, FREE_SPACE)
+
+    def test_merge_is_deterministic(self):
+        grids = self.playing_grids(grid_cls=Grid4,total=10,seed=1)
+        results = []
+
+        for workers in (1, 2, 3):
+            search = self.create_search(workers=workers,max_depth=3,max_nodes=2000,evaluation=True)
+            results.append([(r.move, r.score, r.nodes, r.complete) for r in map(search.search, grids)])
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+
+    def test_node_budget(self):
+        result = self.create_search(workers=1,max_nodes=5).search(Grid())
+
+        # Every root move is scored, even past the budget.
+        self.assertFalse(result.complete)
+        self.assertEqual(result.nodes, 9)
+        self.assertIsNotNone(result.score)
+        self.assertEqual(result.move.player, PLAYER_1)
+
+        result = self.create_search(workers=2,max_nodes=500).search(Grid())
+        self.assertTrue(result.nodes <= 500)
+
+    def test_shared_table(self):
+        search = self.create_search(workers=2,shared=True)
+
+        for grid in self.playing_grids(grid_cls=Grid,total=20,seed=2):
+            self.assertEqual(search.search(grid).score, Engine().search(grid).score)
+
+    def test_monte_carlo_is_deterministic(self):
+        results = []
+
+        for _ in xrange(0, 2, 1):
+            search = self.create_search(workers=2)
+            result = search.search_monte_carlo(grid=Grid(),iterations=400,seed=3)
+            results.append((result.move, result.visits, result.win_rate, result.iterations))
+
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0][3], 400)
+
+    def test_invalid_searches(self):
+        with self.assertRaises(TicTacToeEngineException):
+            ParallelSearch(workers=0)
+
+        search = self.create_search(workers=1)
+        grid = Grid()
+        for number, player in ((1, PLAYER_1), (4, PLAYER_2), (2, PLAYER_1), (5, PLAYER_2), (3, PLAYER_1)):
+            grid = grid.apply_move(grid.MOVE_KLASS(number=number,player=player))
+
+        with self.assertRaises(TicTacToeEngineException):
+            search.search(grid)
+
+        with self.assertRaises(TicTacToeEngineException):
+            search.search_monte_carlo(grid=Grid())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from tictactoe.compute    import popcount
+from tictactoe.hash.grid  import Grid, Grid4, Grid5
+from tictactoe.hash.state import (STATE_CACHE_SIZE, STATE_CELLS_TABLE, GridState, GridState4,
+                                  GridState5)
+from tictactoe.settings   import FREE_SPACE, PLAYER_1, PLAYER_2
+
+from test.test_grid       import play_random_game
+
+
+STATE_KLASSES = ((GridState, 9), (GridState4, 16), (GridState5, 25))
+
+
+def cells_by_scanning(mask,length):
+    return tuple([n for n in xrange(1, length + 1, 1) if mask & (1 << (n - 1))])
+
+
+class GridStateTest(unittest.TestCase):
+
+    def test_popcount(self):
+        rand = random.Random(0)
+
+        for n in [0, 1, 0xFF, 0x100, (1 << 64) - 1] + [rand.getrandbits(100) for _ in xrange(0, 200, 1)]:
+            self.assertEqual(popcount(n), bin(n).count('1'))
+
+    def test_cells_match_scan(self):
+        rand = random.Random(1)
+
+        for state_cls, length in STATE_KLASSES:
+            full = (1 << length) - 1
+            masks = [0, full] + [rand.getrandbits(length) for _ in xrange(0, 300, 1)]
+
+            for mask in masks:
+                state = state_cls(hash=mask)
+
+                self.assertEqual(state.get_taken_cells(), cells_by_scanning(mask=mask,length=length))
+                self.assertEqual(state.get_free_cells(), cells_by_scanning(mask=full ^ mask,length=length))
+                self.assertEqual(state.taken, bin(mask).count('1'))
+                self.assertEqual(state.free, length - state.taken)
+
+    def test_grid_states(self):
+        for grid_cls in (Grid, Grid4, Grid5):
+            for grid, move in play_random_game(grid_cls=grid_cls,seed=2):
+                free = [c.number for c in grid.cells if c.player == FREE_SPACE]
+
+                for player in (FREE_SPACE, PLAYER_1, PLAYER_2):
+                    self.assertEqual(grid.cells_taken(player=player),
+                                     [c for c in grid.cells if c.player == player])
+
+                self.assertEqual(grid.total_free_cells(), len(free))
+                self.assertEqual(grid.total_taken_cells(), len(grid.cells) - len(free))
+
+    def test_5x5_cache_is_bounded(self):
+        rand = random.Random(3)
+
+        for _ in xrange(0, STATE_CACHE_SIZE + 100, 1):
+            GridState5(hash=rand.getrandbits(25)).get_taken_cells()
+
+        self.assertTrue(len(STATE_CELLS_TABLE[GridState5.MODE]) <= STATE_CACHE_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
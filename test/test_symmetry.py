@@ -0,0 +1,89 @@
+import unittest
+
+from tictactoe.engine             import Engine, player_to_move
+from tictactoe.errors             import TicTacToeHashException
+from tictactoe.hash.grid          import Grid, Grid4, Grid5
+from tictactoe.hash.symmetry      import (IDENTITY, ROTATE_90, TRANSFORMS, inverse_transform,
+                                          transform_grid_hash, canonical_grid_hash,
+                                          transform_cell_number, transform_move)
+from tictactoe.hash.transposition import TranspositionTable
+from tictactoe.settings           import FREE_SPACE
+
+from test.test_engine             import random_grids
+
+
+GRID_KLASSES = (Grid, Grid4, Grid5)
+
+
+class SymmetryTest(unittest.TestCase):
+
+    def test_inverse_transform(self):
+        for grid_cls in GRID_KLASSES:
+            for grid in random_grids(grid_cls=grid_cls,total=30):
+                for transform in TRANSFORMS:
+                    hash = transform_grid_hash(hash=grid.hash,transform=transform,mode=grid.MODE)
+
+                    self.assertEqual(transform_grid_hash(hash=hash,transform=inverse_transform(transform),
+                                                         mode=grid.MODE), grid.hash)
+
+    def test_transforms_are_permutations(self):
+        for grid_cls in GRID_KLASSES:
+            numbers = range(1, len(grid_cls().cells) + 1)
+
+            for transform in TRANSFORMS:
+                self.assertEqual(sorted([transform_cell_number(number=n,transform=transform,mode=grid_cls.MODE)
+                                         for n in numbers]), numbers)
+
+            for n in numbers:
+                rotated = n
+                for _ in xrange(0, 4, 1):
+                    rotated = transform_cell_number(number=rotated,transform=ROTATE_90,mode=grid_cls.MODE)
+
+                self.assertEqual(rotated, n)
+
+    def test_canonical_grid(self):
+        for grid_cls in GRID_KLASSES:
+            for grid in random_grids(grid_cls=grid_cls,total=30,seed=1):
+                canonical, transform = canonical_grid_hash(hash=grid.hash,mode=grid.MODE)
+
+                self.assertEqual(transform_grid_hash(hash=grid.hash,transform=transform,mode=grid.MODE),
+                                 canonical)
+
+                # Every symmetric grid has the same canonical form.
+                for other in TRANSFORMS:
+                    symmetric = transform_grid_hash(hash=grid.hash,transform=other,mode=grid.MODE)
+                    self.assertEqual(canonical_grid_hash(hash=symmetric,mode=grid.MODE)[0], canonical)
+
+    def test_transform_move(self):
+        for grid_cls in GRID_KLASSES:
+            for grid in random_grids(grid_cls=grid_cls,total=20,seed=2):
+                if grid.winner() != FREE_SPACE or not grid.total_free_cells():
+                    continue
+
+                move = grid.MOVE_KLASS(number=grid.cells_taken()[0].number,
+                                       player=player_to_move(grid=grid))
+
+                for transform in TRANSFORMS:
+                    self.assertEqual(grid.apply_move(move).transform(transform).hash,
+                                     grid.transform(transform).apply_move(transform_move(move=move,transform=transform)).hash)
+
+    def test_invalid_transform(self):
+        for transform in (-1, len(TRANSFORMS), None):
+            with self.assertRaises(TicTacToeHashException):
+                transform_grid_hash(hash=Grid().hash,transform=transform)
+
+        self.assertEqual(inverse_transform(IDENTITY), IDENTITY)
+
+    def test_engine_with_symmetry(self):
+        engine = Engine(table=TranspositionTable(size=1 << 10),symmetry=True)
+
+        for grid in random_grids(grid_cls=Grid,total=40,seed=3):
+            result = engine.search(grid)
+            self.assertEqual(result.score, Engine().search(grid).score)
+
+            if result.move is not None:
+                self.assertEqual(grid.cells[result.move.number-1].player, FREE_SPACE)
+
+
+if __name__ == '__main__':
+    unittest.main()
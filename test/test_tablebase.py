@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from tictactoe.engine    import WIN_SCORE, Engine
+from tictactoe.errors    import TicTacToeException
+from tictactoe.hash.grid import Grid, Grid4
+from tictactoe.settings  import FREE_SPACE, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW
+from tictactoe.tablebase import (Tablebase, EndgameTablebase, enumerate_grids, write_tablebase,
+                                 write_endgame_tablebase, verify_endgame_limits)
+
+from test.test_engine    import back_up, solve, random_grids
+
+
+class TablebaseTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.directory, 'ttt3.tb')
+        cls.total = write_tablebase(path=cls.path)
+        cls.tablebase = Tablebase(path=cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tablebase.close()
+        shutil.rmtree(cls.directory)
+
+    def test_every_position_is_solved(self):
+        grids = list(enumerate_grids())
+        solved = {}
+
+        self.assertEqual(len(grids), 5478)
+        self.assertEqual(self.total, 765)
+        self.assertEqual(len(self.tablebase), 765)
+
+        for grid in grids:
+            score, move = self.tablebase.probe(grid)
+            self.assertEqual(score, solve(grid=grid,solved=solved))
+
+            if move is None:
+                self.assertTrue(grid.winner() or not grid.total_free_cells())
+            else:
+                self.assertEqual(back_up(solve(grid=grid.apply_move(move),solved=solved)), score)
+
+    def test_engine_uses_tablebase(self):
+        result = Engine(tablebase=self.tablebase).search(Grid())
+
+        self.assertEqual(result.nodes, 1)
+        self.assertEqual((result.score, result.move), self.tablebase.probe(Grid()))
+
+    def test_other_grids_are_not_found(self):
+        self.assertIsNone(self.tablebase.probe(Grid4()))
+        self.assertIsNone(self.tablebase.probe_hash(hash=Grid4().hash))
+
+    def test_invalid_files(self):
+        with self.assertRaises(TicTacToeException):
+            write_tablebase(path=os.path.join(self.directory, 'ttt4.tb'),mode=TTT_4_IN_A_ROW)
+
+        truncated = os.path.join(self.directory, 'truncated.tb')
+        with open(self.path, 'rb') as f:
+            data = f.read()
+
+        for broken in (data[:-1], 'TTTX' + data[4:]):
+            with open(truncated, 'wb') as f:
+                f.write(broken)
+
+            with self.assertRaises(TicTacToeException):
+                Tablebase(path=truncated)
+
+
+class EndgameTablebaseTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.totals_3 = write_endgame_tablebase(directory=cls.directory,mode=TTT_3_IN_A_ROW,max_free=8)
+        cls.totals_4 = write_endgame_tablebase(directory=cls.directory,mode=TTT_4_IN_A_ROW,max_free=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.directory)
+
+    def test_3x3_matches_minimax(self):
+        tablebase = EndgameTablebase(directory=self.directory,mode=TTT_3_IN_A_ROW)
+        solved = {}
+
+        self.assertEqual(sorted(self.totals_3), range(1, 9))
+
+        for grid in enumerate_grids():
+            record = tablebase.probe(grid)
+
+            if grid.total_free_cells() in (0, 9):
+                self.assertIsNone(record)
+                continue
+
+            score, move = record
+            self.assertEqual(score, solve(grid=grid,solved=solved))
+
+            if move is not None:
+                self.assertEqual(back_up(solve(grid=grid.apply_move(move),solved=solved)), score)
+
+        tablebase.close()
+
+    def test_4x4_matches_engine(self):
+        tablebase = EndgameTablebase(directory=self.directory,mode=TTT_4_IN_A_ROW)
+        probed = 0
+
+        for grid in random_grids(grid_cls=Grid4,total=600,seed=4):
+            record = tablebase.probe(grid)
+
+            if grid.total_free_cells() not in (1, 2):
+                self.assertIsNone(record)
+                continue
+
+            if grid.winner() != FREE_SPACE:
+                self.assertEqual(record, (-WIN_SCORE, None))
+                continue
+
+            self.assertEqual(record[0], Engine().search(grid).score)
+            probed += 1
+
+        self.assertTrue(probed > 0)
+        tablebase.close()
+
+    def test_limits(self):
+        for mode, cells in ((TTT_3_IN_A_ROW, 9), (TTT_4_IN_A_ROW, 16), (TTT_5_IN_A_ROW, 25)):
+            for max_free in (0, cells):
+                with self.assertRaises(TicTacToeException):
+                    verify_endgame_limits(mode=mode,max_free=max_free)
+
+            # Layers are solved a chunk at a time, so every mode is supported.
+            verify_endgame_limits(mode=mode,max_free=cells - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
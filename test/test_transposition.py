@@ -0,0 +1,196 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from tictactoe.engine             import Engine
+from tictactoe.errors             import TicTacToeException
+from tictactoe.hash.grid          import Grid
+from tictactoe.hash.move          import Move
+from tictactoe.hash.transposition import (EXACT, LOWER_BOUND, UPPER_BOUND, DEPTH_PREFERRED,
+                                          ALWAYS_REPLACE, TWO_TIER, SHARED_ENTRY, TranspositionTable,
+                                          SharedTranspositionTable)
+from tictactoe.settings           import PLAYER_1, PLAYER_2
+
+from test.test_engine             import random_grids
+
+
+class TranspositionTableTest(unittest.TestCase):
+
+    TABLE_KLASS = TranspositionTable
+
+    def create_table(self,size=64,replacement=DEPTH_PREFERRED):
+        return self.TABLE_KLASS(size=size,replacement=replacement)
+
+    def colliding_keys(self,table,total):
+
+        """
+            Returns **total** keys that all land on the bucket of key 1.
+        """
+
+        keys = [1]
+        key = 2
+        while len(keys) < total:
+            if table.index(key) == table.index(1):
+                keys.append(key)
+            key += 1
+
+        return keys
+
+    def test_store_and_probe(self):
+        table = self.create_table()
+        move = Move(number=5,player=PLAYER_1)
+
+        self.assertIsNone(table.probe(Grid().hash))
+
+        table.store(Grid().hash,12,3,LOWER_BOUND,move)
+        entry = table.probe(Grid().hash)
+
+        self.assertEqual((entry.key, entry.score, entry.depth, entry.bound), (Grid().hash, 12, 3, LOWER_BOUND))
+        self.assertEqual((entry.move.number, entry.move.player), (5, PLAYER_1))
+
+        table.clear()
+        self.assertIsNone(table.probe(Grid().hash))
+
+    def test_size_is_bounded(self):
+        for replacement in (DEPTH_PREFERRED, ALWAYS_REPLACE, TWO_TIER):
+            table = self.create_table(size=16,replacement=replacement)
+
+            for key in xrange(0, 1000, 1):
+                table.store(key,0,key % 7,EXACT)
+
+            self.assertTrue(0 < len(table) <= 16)
+
+    def test_depth_preferred(self):
+        table = self.create_table(replacement=DEPTH_PREFERRED)
+        deep, shallow, deeper = self.colliding_keys(table=table,total=3)
+
+        table.store(deep,1,5,EXACT)
+        table.store(shallow,2,2,EXACT)
+
+        self.assertIsNotNone(table.probe(deep))
+        self.assertIsNone(table.probe(shallow))
+
+        table.store(deeper,3,6,EXACT)
+
+        self.assertIsNone(table.probe(deep))
+        self.assertEqual(table.probe(deeper).score, 3)
+
+    def test_always_replace(self):
+        table = self.create_table(replacement=ALWAYS_REPLACE)
+        deep, shallow = self.colliding_keys(table=table,total=2)
+
+        table.store(deep,1,5,EXACT)
+        table.store(shallow,2,2,EXACT)
+
+        self.assertIsNone(table.probe(deep))
+        self.assertEqual(table.probe(shallow).score, 2)
+
+    def test_two_tier(self):
+        table = self.create_table(replacement=TWO_TIER)
+        deep, shallow, newest, deeper = self.colliding_keys(table=table,total=4)
+
+        table.store(deep,1,5,EXACT)
+        table.store(shallow,2,2,EXACT)
+
+        self.assertEqual(table.probe(deep).score, 1)
+        self.assertEqual(table.probe(shallow).score, 2)
+
+        # Shallow entries only ever push out the always-replace slot.
+        table.store(newest,3,1,EXACT)
+
+        self.assertEqual(table.probe(deep).score, 1)
+        self.assertIsNone(table.probe(shallow))
+        self.assertEqual(table.probe(newest).score, 3)
+
+        # A deeper entry takes the depth-preferred slot and moves the deep
+        # one to the always-replace slot.
+        table.store(deeper,4,9,EXACT)
+
+        self.assertEqual(table.probe(deeper).score, 4)
+        self.assertEqual(table.probe(deep).score, 1)
+        self.assertIsNone(table.probe(newest))
+
+    def test_invalid_tables(self):
+        for size in (0, 1, 2.5, '64'):
+            with self.assertRaises(TicTacToeException):
+                self.create_table(size=size)
+
+        for replacement in (-1, 3, None):
+            with self.assertRaises(TicTacToeException):
+                self.create_table(replacement=replacement)
+
+    def test_engine_scores_do_not_change(self):
+        for replacement in (DEPTH_PREFERRED, ALWAYS_REPLACE, TWO_TIER):
+            engine = Engine(table=self.create_table(size=256,replacement=replacement))
+
+            for grid in random_grids(grid_cls=Grid,total=40,seed=2):
+                self.assertEqual(engine.search(grid).score, Engine().search(grid).score)
+
+
+class SharedTranspositionTableTest(TranspositionTableTest):
+
+    TABLE_KLASS = SharedTranspositionTable
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.tables = []
+
+    def tearDown(self):
+        for table in self.tables:
+            table.close()
+
+        shutil.rmtree(self.directory)
+
+    def create_table(self,size=64,replacement=DEPTH_PREFERRED,path=None):
+        table = self.TABLE_KLASS(size=size,replacement=replacement,path=path)
+        self.tables.append(table)
+        return table
+
+    def test_entries_round_trip(self):
+        table = self.create_table()
+        key = (1 << 127) | 12345
+
+        table.store(key,-997,255,UPPER_BOUND,Grid.MOVE_KLASS(number=9,player=PLAYER_2))
+        entry = table.probe(key)
+
+        self.assertEqual((entry.key, entry.score, entry.depth, entry.bound), (key, -997, 255, UPPER_BOUND))
+        self.assertEqual((entry.move.number, entry.move.player), (9, PLAYER_2))
+
+        for key, depth in ((1 << 128, 1), (1, 256), (1, -1)):
+            with self.assertRaises(TicTacToeException):
+                table.store(key,0,depth,EXACT)
+
+    def test_forked_processes_share_entries(self):
+        table = self.create_table()
+
+        process = multiprocessing.Process(target=table.store,args=(Grid().hash,42,3,EXACT))
+        process.start()
+        process.join()
+
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual(table.probe(Grid().hash).score, 42)
+
+    def test_file_backed_tables(self):
+        path = os.path.join(self.directory, 'table.tt')
+
+        self.create_table(path=path).store(Grid().hash,7,2,EXACT)
+
+        self.assertEqual(self.create_table(path=path).probe(Grid().hash).score, 7)
+
+    def test_torn_entries_are_misses(self):
+        table = self.create_table()
+        table.store(Grid().hash,7,2,EXACT)
+
+        index = table.index(Grid().hash)
+        low, high, data = SHARED_ENTRY.unpack_from(table._map, index * SHARED_ENTRY.size)
+
+        # The data word of another entry written over half of this one.
+        SHARED_ENTRY.pack_into(table._map, index * SHARED_ENTRY.size, low, high, data ^ (1 << 20))
+
+        self.assertIsNone(table.probe(Grid().hash))
+
+
+if __name__ == '__main__':
+    unittest.main()
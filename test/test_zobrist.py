@@ -0,0 +1,56 @@
+import unittest
+
+from tictactoe.board              import Board, Board4, Board5
+from tictactoe.engine             import Engine
+from tictactoe.hash.grid          import Grid, Grid4, Grid5, apply_trusted_move
+from tictactoe.hash.transposition import TranspositionTable
+from tictactoe.hash.zobrist       import (ZOBRIST_BITS, ZOBRIST_TABLE, create_zobrist_table,
+                                          zobrist_key, zobrist_move_key)
+
+from test.test_engine             import random_grids
+from test.test_grid               import play_random_game
+
+
+BOARD_KLASSES = (Board, Board4, Board5)
+
+
+class ZobristTest(unittest.TestCase):
+
+    def test_incremental_key_matches_scratch(self):
+        for board_cls in BOARD_KLASSES:
+            for seed in xrange(0, 3, 1):
+                board = board_cls()
+                key = zobrist_key(hash=board_cls.GRID_KLASS().hash,mode=board_cls.MODE)
+
+                for grid, move in play_random_game(grid_cls=board_cls.GRID_KLASS,seed=seed):
+                    child = grid.apply_move(move)
+                    key ^= zobrist_move_key(number=move.number,player=move.player,mode=grid.MODE)
+                    board.make_move(move)
+
+                    self.assertEqual(key, zobrist_key(hash=child.hash,mode=grid.MODE))
+                    self.assertEqual(child.zobrist, key)
+                    self.assertEqual(apply_trusted_move(grid=grid,move=move).zobrist, key)
+                    self.assertEqual(board.zobrist, key)
+
+                    self.assertEqual(board_cls.GRID_KLASS(hash=child.hash).zobrist, key)
+
+    def test_keys(self):
+        for grid_cls in (Grid, Grid4, Grid5):
+            self.assertEqual(ZOBRIST_TABLE[grid_cls.MODE], create_zobrist_table(mode=grid_cls.MODE))
+            self.assertEqual(grid_cls().zobrist, 0)
+
+            grids = dict([(g.hash, g.zobrist) for g in random_grids(grid_cls=grid_cls,total=300)])
+
+            self.assertEqual(len(set(grids.values())), len(grids))
+            for key in grids.values():
+                self.assertEqual(key >> ZOBRIST_BITS, 0)
+
+    def test_engine_with_zobrist_keys(self):
+        engine = Engine(table=TranspositionTable(size=1 << 10),zobrist=True)
+
+        for grid in random_grids(grid_cls=Grid,total=40,seed=6):
+            self.assertEqual(engine.search(grid).score, Engine().search(grid).score)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+"""
+Batch evaluation of many grids at once with NumPy.
+===
+
+Creating a `Grid` for every stored hash is dominated by Python overhead when
+there are millions of them. The functions of this module take whole NumPy
+arrays of hashes instead and classify all of them with array operations:
+
+    #!python
+    result = evaluate_grid_hashes(hashes=hashes,mode=TTT_5_IN_A_ROW)
+    print(result.status)       # NEW_GAME, PLAYING, DRAW or WON for every grid
+    print(result.line_events)  # a line event for every line of every grid
+
+A `Grid5` hash has 75 bits, more than a `uint64` can hold, so grid hashes are
+split into lanes of `LANE_BITS` bits. 63 bits are exactly 21 cells, so a cell
+never straddles 2 lanes:
+
+* A 1d `uint64` or `int64` array is taken as is for 3x3 and 4x4 grids.
+* A 2d `uint64` array of shape (grids, lanes) is taken as already split.
+* Anything else, like a list or an `object` array of Python ints, is split
+  with `grid_hashes_to_lanes`.
+
+`evaluate_bitboards` does the same for arrays of **Player 1** and **Player 2**
+bitboards, like the ones of a `BitBoard`.
+
+NumPy is an optional dependency, install it with `pip install numpy` or
+`pip install TicTacToe[batch]`.
+
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from tictactoe.cache        import ModeTable
+from tictactoe.compute      import compute_line_event, get_all_possible_lines
+from tictactoe.errors       import TicTacToeException, TicTacToeHashException
+from tictactoe.events       import NEW_GAME, PLAYING, DRAW, WON, PLAYER_1_WON, PLAYER_2_WON
+from tictactoe.settings     import (FREE_SPACE, PLAYER_1, PLAYER_2, GAME_MODES, MODES,
+                                    TTT_3_IN_A_ROW)
+from tictactoe.verification import verify_game_mode
+
+
+LANE_BITS  = 63
+LANE_CELLS = LANE_BITS // 3
+
+INVALID_CELL = 3
+
+# The 3 bits of a valid cell have a single bit set, at the offset of its player.
+CELL_FIELD_PLAYERS = (INVALID_CELL, FREE_SPACE, PLAYER_1, INVALID_CELL,
+                      PLAYER_2, INVALID_CELL, INVALID_CELL, INVALID_CELL)
+
+
+def verify_numpy():
+    if numpy is None:
+        raise TicTacToeException(
+            'NumPy is required for batch evaluation but it is not installed. ' \
+            'Install it with pip install numpy')
+
+def total_cells(mode):
+    return MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+def total_lanes(mode):
+    return -(-total_cells(mode=mode) // LANE_CELLS)
+
+def create_line_matrix(mode=TTT_3_IN_A_ROW):
+
+    lines  = get_all_possible_lines(mode=mode)
+    matrix = numpy.zeros((total_cells(mode=mode), len(lines)), dtype=numpy.int16)
+
+    for l, line in enumerate(lines):
+        for c in line:
+            matrix[c-1, l] = 1
+
+    return matrix
+
+def create_line_event_table(mode=TTT_3_IN_A_ROW):
+
+    length = MODES[GAME_MODES[mode]['LINE']]['length']
+    table  = numpy.zeros((2, length + 1, length + 1), dtype=numpy.int8)
+
+    for player_1 in xrange(0, length + 1, 1):
+        for player_2 in xrange(0, length + 1 - player_1, 1):
+            table[0, player_1, player_2] = compute_line_event(player_1,player_2,length)
+            table[1, player_1, player_2] = compute_line_event(player_1,player_2,length,extra=True)
+
+    return table
+
+
+# Columns are the lines in the order of `get_all_possible_lines`.
+LINE_MATRIX = ModeTable(builder=create_line_matrix)
+
+LINE_EVENT_TABLE = ModeTable(builder=create_line_event_table)
+
+
+def grid_hashes_to_lanes(hashes,mode=TTT_3_IN_A_ROW):
+
+    """
+        Splits **hashes** into a (grids, lanes) `uint64` array, where lane
+        **k** holds bits `63k` to `63k + 62` of every hash.
+    """
+
+    verify_numpy()
+    verify_game_mode(game_mode=mode)
+    lanes = total_lanes(mode=mode)
+
+    if isinstance(hashes,numpy.ndarray) and hashes.dtype in (numpy.uint64, numpy.int64):
+        if hashes.ndim == 1 and lanes == 1:
+            return hashes.astype(numpy.uint64).reshape(-1, 1)
+
+        if hashes.ndim == 2 and hashes.shape[1] == lanes:
+            return hashes.astype(numpy.uint64)
+
+        raise TicTacToeHashException(
+            'Hashes of game mode {} need to be split into {} lanes of {} bits, ' \
+            'found an array of shape {}'.format(mode,lanes,LANE_BITS,hashes.shape))
+
+    # Python ints can be bigger than 64 bits, so they are shifted and masked
+    # as objects before being turned into uint64 lanes.
+    hashes = numpy.asarray(hashes, dtype=object).reshape(-1)
+    mask   = (1 << LANE_BITS) - 1
+
+    return numpy.stack([((hashes >> (LANE_BITS * k)) & mask).astype(numpy.uint64)
+                        for k in xrange(0, lanes, 1)], axis=1)
+
+def lanes_to_grid_hashes(lanes):
+    return [sum([int(lane) << (LANE_BITS * k) for k, lane in enumerate(row)]) for row in lanes]
+
+def grid_lanes_to_cells(lanes,mode=TTT_3_IN_A_ROW):
+
+    players = numpy.array(CELL_FIELD_PLAYERS, dtype=numpy.int8)
+    cells   = numpy.empty((lanes.shape[0], total_cells(mode=mode)), dtype=numpy.int8)
+
+    # Shifts have to be uint64 too, otherwise NumPy turns them into floats.
+    field = numpy.uint64(7)
+    for c in xrange(0, cells.shape[1], 1):
+        shift = numpy.uint64((c % LANE_CELLS) * 3)
+        cells[:, c] = players[(lanes[:, c // LANE_CELLS] >> shift) & field]
+
+    return cells
+
+def bitboards_to_cells(player_1,player_2,mode=TTT_3_IN_A_ROW):
+
+    player_1 = numpy.asarray(player_1, dtype=numpy.uint64).reshape(-1, 1)
+    player_2 = numpy.asarray(player_2, dtype=numpy.uint64).reshape(-1, 1)
+    shifts   = numpy.arange(total_cells(mode=mode), dtype=numpy.uint64)
+    bit      = numpy.uint64(1)
+
+    return (((player_1 >> shifts) & bit) | (((player_2 >> shifts) & bit) << bit)).astype(numpy.int8)
+
+def evaluate_grid_hashes(hashes,mode=TTT_3_IN_A_ROW,extra=False):
+    lanes = grid_hashes_to_lanes(hashes=hashes,mode=mode)
+    return BatchEvaluation(cells=grid_lanes_to_cells(lanes=lanes,mode=mode),mode=mode,extra=extra)
+
+def evaluate_bitboards(player_1,player_2,mode=TTT_3_IN_A_ROW,extra=False):
+    verify_numpy()
+    verify_game_mode(game_mode=mode)
+    cells = bitboards_to_cells(player_1=player_1,player_2=player_2,mode=mode)
+    return BatchEvaluation(cells=cells,mode=mode,extra=extra)
+
+
+class BatchEvaluation(object):
+
+    """
+        The classification of a batch of grids. Every property is an array
+        with one row per grid, in the order the grids were given.
+    """
+
+    def __init__(self,cells,mode=TTT_3_IN_A_ROW,extra=False):
+
+        invalid = numpy.flatnonzero((cells == INVALID_CELL).any(axis=1))
+        if len(invalid):
+            raise TicTacToeHashException(
+                'Found {} invalid grid(s) in the batch, the first one at ' \
+                'index {}'.format(len(invalid),invalid[0]))
+
+        length = MODES[GAME_MODES[mode]['LINE']]['length']
+        matrix = LINE_MATRIX[mode]
+
+        self._mode  = mode
+        self._cells = cells
+        self._free  = (cells == FREE_SPACE).sum(axis=1)
+
+        self._line_player_1 = numpy.dot((cells == PLAYER_1).astype(numpy.int16), matrix)
+        self._line_player_2 = numpy.dot((cells == PLAYER_2).astype(numpy.int16), matrix)
+        self._line_events   = LINE_EVENT_TABLE[mode][int(extra),
+                                                     self._line_player_1,
+                                                     self._line_player_2]
+
+        # Player 1 wins ties like compute_winner does, even if no legal game
+        # can have 2 winners.
+        won_1 = (self._line_player_1 == length).any(axis=1)
+        won_2 = (self._line_player_2 == length).any(axis=1)
+        self._winner = numpy.select([won_1, won_2], [PLAYER_1, PLAYER_2], FREE_SPACE).astype(numpy.int8)
+
+        self._status = numpy.select(
+            [won_1, won_2, self._free == cells.shape[1], self._free == 0],
+            [PLAYER_1_WON if extra else WON, PLAYER_2_WON if extra else WON, NEW_GAME, DRAW],
+            PLAYING).astype(numpy.int8)
+
+    def __len__(self):
+        return self._cells.shape[0]
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def cells(self):
+        """
+            (grids, cells) array with the player on every cell.
+        """
+        return self._cells
+
+    @property
+    def free_cells(self):
+        return self._free
+
+    @property
+    def taken_cells(self):
+        return self._cells.shape[1] - self._free
+
+    @property
+    def winner(self):
+        return self._winner
+
+    @property
+    def status(self):
+        return self._status
+
+    @property
+    def line_player_1(self):
+        """
+            (grids, lines) array with the marks of **Player 1** on every line.
+        """
+        return self._line_player_1
+
+    @property
+    def line_player_2(self):
+        return self._line_player_2
+
+    @property
+    def line_events(self):
+        """
+            (grids, lines) array with the line event of every line, in the
+            order of `get_all_possible_lines`.
+        """
+        return self._line_events
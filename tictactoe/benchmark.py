@@ -0,0 +1,343 @@
+"""
+Benchmarks for the parts of the game that have to be fast.
+===
+
+Every benchmark returns a plain dictionary with its measurements, so they can
+be printed, compared between commits or asserted on:
+
+    #!python
+    print(benchmark_import(module='tictactoe.line.line'))
+    # {'module': 'tictactoe.line.line', 'repeat': 5, 'best': 0.0121, 'mean': 0.0139, 'worst': 0.0162}
+
+They can also be run from the command line:
+
+    python -m tictactoe.benchmark
+
+"""
+
+import os
+import random
+import subprocess
+import sys
+import time
+
+from tictactoe.settings import (FREE_SPACE, PLAYER_1, PLAYER_2, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW,
+                                TTT_5_IN_A_ROW)
+
+
+IMPORT_SCRIPT = 'import time; started = time.time(); import {}; print(repr(time.time() - started))'
+
+COLD_START_SCRIPT = 'import time; started = time.time(); ' \
+                    'from tictactoe.hash.grid import {0}; {0}(); print(repr(time.time() - started))'
+
+
+def summarize_timings(timings):
+    return {
+        'best'  : min(timings),
+        'mean'  : sum(timings) / len(timings),
+        'worst' : max(timings)
+    }
+
+def benchmark_import(module='tictactoe.line.line',repeat=5,python=sys.executable):
+
+    """
+        Measures how long a cold import of **module** takes, in seconds. Every
+        import runs in a brand new interpreter, so nothing is already loaded
+        or built by a previous import.
+    """
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environ = dict(os.environ)
+    environ['PYTHONPATH'] = os.pathsep.join(filter(None, [root, environ.get('PYTHONPATH')]))
+
+    timings = []
+    for _ in xrange(0, repeat, 1):
+        output = subprocess.check_output([python, '-c', IMPORT_SCRIPT.format(module)], env=environ)
+        timings.append(float(output.strip().splitlines()[-1]))
+
+    result = summarize_timings(timings=timings)
+    result.update({'module' : module, 'repeat' : repeat})
+
+    return result
+
+
+def benchmark_cold_start(mode=TTT_5_IN_A_ROW,repeat=5,python=sys.executable):
+
+    """
+        Measures how long a brand new interpreter takes to import the grids
+        and build the first grid of **mode**, in seconds, once building every
+        table and once loading the named ones from a precompiled cache
+        directory.
+    """
+
+    import shutil
+    import tempfile
+
+    from tictactoe.cache import CACHE_DIRECTORY_ENVIRON, precompile_tables
+
+    klass = {TTT_3_IN_A_ROW : 'Grid', TTT_4_IN_A_ROW : 'Grid4', TTT_5_IN_A_ROW : 'Grid5'}[mode]
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environ = dict(os.environ)
+    environ['PYTHONPATH'] = os.pathsep.join(filter(None, [root, environ.get('PYTHONPATH')]))
+    environ.pop(CACHE_DIRECTORY_ENVIRON, None)
+
+    directory = tempfile.mkdtemp()
+    result = {'mode' : mode, 'repeat' : repeat}
+
+    try:
+        precompile_tables(directory=directory)
+
+        for name, cache in (('uncached', None), ('cached', directory)):
+            if cache is not None:
+                environ[CACHE_DIRECTORY_ENVIRON] = cache
+
+            timings = []
+            for _ in xrange(0, repeat, 1):
+                output = subprocess.check_output([python, '-c', COLD_START_SCRIPT.format(klass)],
+                                                 env=environ)
+                timings.append(float(output.strip().splitlines()[-1]))
+
+            result[name] = min(timings)
+    finally:
+        shutil.rmtree(directory)
+
+    result['speedup'] = result['uncached'] / result['cached']
+
+    return result
+
+def new_grid(mode):
+
+    from tictactoe.hash.grid import Grid, Grid4, Grid5
+
+    return {TTT_3_IN_A_ROW : Grid, TTT_4_IN_A_ROW : Grid4, TTT_5_IN_A_ROW : Grid5}[mode]()
+
+def random_grids(mode,total,seed=0):
+
+    """
+        Returns **total** grids of **mode** reached by playing random moves,
+        always the same ones for the same **seed**.
+    """
+
+    generator = random.Random(seed)
+    grids = []
+
+    for _ in xrange(0, total, 1):
+        grid = new_grid(mode=mode)
+        player = PLAYER_1
+
+        for _ in xrange(0, generator.randint(0, len(grid.cells) - 1), 1):
+            if grid.winner() != FREE_SPACE:
+                break
+
+            cell = generator.choice(grid.cells_taken(FREE_SPACE))
+            grid = grid.apply_move(grid.MOVE_KLASS(number=cell.number,player=player))
+            player = PLAYER_2 if player == PLAYER_1 else PLAYER_1
+
+        grids.append(grid)
+
+    return grids
+
+def decompose_grid_hash_string(hash,mode):
+
+    """
+        Decomposes a grid hash through its binary string, the way
+        `decompose_grid_hash` used to, as the baseline of
+        `benchmark_decompose`.
+    """
+
+    from tictactoe.settings     import GAME_MODES, MODES
+    from tictactoe.verification import verify_game_mode, verify_hash
+
+    verify_game_mode(game_mode=mode)
+    verify_hash(hash=hash,mode=GAME_MODES[mode]['GRID'])
+
+    length = MODES[GAME_MODES[mode]['GRID']]['length']
+    binary = bin(hash)[2:].zfill(length)
+    binary_cells = reversed([binary[c:c+3] for c in xrange(0, len(binary), 3)])
+
+    return [(1 << ((int(b, 2) >> 1) + (cell * 3))) for cell, b in enumerate(binary_cells)]
+
+def benchmark_decompose(modes=(TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW),positions=500,
+                        repeat=20):
+
+    """
+        Measures how many grid hashes of every game mode `decompose_grid_hash`
+        decomposes per second, and its speedup over decomposing them through
+        their binary string.
+    """
+
+    from tictactoe.compute import decompose_grid_hash
+
+    result = {'modes' : tuple(modes)}
+
+    for mode in modes:
+        hashes = [g.hash for g in random_grids(mode=mode,total=positions)]
+
+        # Every table is built before anything is timed.
+        decompose_grid_hash(hash=hashes[0],mode=mode)
+
+        for name, decompose in (('string', decompose_grid_hash_string),
+                                ('table', decompose_grid_hash)):
+            started = time.time()
+            for _ in xrange(0, repeat, 1):
+                for hash in hashes:
+                    decompose(hash, mode)
+
+            result['{}_{}'.format(name, mode)] = (len(hashes) * repeat) / (time.time() - started)
+
+        result['speedup_{}'.format(mode)] = result['table_{}'.format(mode)] / result['string_{}'.format(mode)]
+
+    return result
+
+
+def benchmark_evaluation(mode=TTT_5_IN_A_ROW,positions=200,repeat=20):
+
+    """
+        Measures how many positions an `Evaluator` scores per second, both
+        from scratch and incrementally after making and unmaking a move.
+    """
+
+    from tictactoe.evaluation import Evaluator
+
+    evaluator = Evaluator(mode=mode)
+    grids = [g for g in random_grids(mode=mode,total=positions) if g.total_free_cells()]
+
+    started = time.time()
+    for _ in xrange(0, repeat, 1):
+        for grid in grids:
+            evaluator.evaluate(grid=grid)
+    full = (len(grids) * repeat) / (time.time() - started)
+
+    total, elapsed = 0, 0.0
+    for grid in grids:
+        evaluator.reset(grid=grid)
+        player = PLAYER_1 if grid.total_taken_cells() % 2 == 0 else PLAYER_2
+        moves = [grid.MOVE_KLASS(number=c.number,player=player) for c in grid.cells_taken(FREE_SPACE)]
+
+        started = time.time()
+        for _ in xrange(0, repeat, 1):
+            for move in moves:
+                evaluator.make_move(move=move)
+                evaluator.score
+                evaluator.unmake_move(move=move)
+        elapsed += time.time() - started
+        total += len(moves) * repeat
+
+    incremental = total / elapsed
+
+    return {'mode' : mode, 'full_per_second' : full, 'incremental_per_second' : incremental}
+
+
+def benchmark_playouts(mode=TTT_5_IN_A_ROW,max_time=1.0,seed=0):
+
+    """
+        Runs a `MonteCarloEngine` from an empty grid of **mode** for
+        **max_time** seconds and reports its playouts per second.
+    """
+
+    from tictactoe.mcts import MonteCarloEngine
+
+    result = MonteCarloEngine(max_time=max_time,seed=seed).search(grid=new_grid(mode=mode))
+
+    return {'mode'                : mode,
+            'playouts'            : result.playouts,
+            'playouts_per_second' : result.playouts_per_second,
+            'tree_size'           : result.tree_size}
+
+
+def benchmark_parallel(workers=(1, 2, 4),max_depth=4,iterations=20000,seed=0):
+
+    """
+        Times `ParallelSearch` for every number of **workers**: a root split
+        alpha-beta search of **max_depth** on a 4x4 position and
+        **iterations** Monte Carlo iterations on a 5x5 position. Speedups are
+        relative to the first number of workers.
+    """
+
+    from tictactoe.parallel import ParallelSearch
+
+    grid_4 = [g for g in random_grids(mode=TTT_4_IN_A_ROW,total=20,seed=seed)
+              if g.winner() == FREE_SPACE and g.total_free_cells() >= 10][0]
+    grid_5 = new_grid(mode=TTT_5_IN_A_ROW)
+
+    result = {'workers' : tuple(workers)}
+    timings_4, timings_5 = [], []
+
+    for total in workers:
+        parallel = ParallelSearch(workers=total,max_depth=max_depth,evaluation=True)
+
+        # The first search only starts the pool, so it is not timed.
+        parallel.search_monte_carlo(grid=grid_5,iterations=total,seed=seed)
+
+        started = time.time()
+        parallel.search(grid=grid_4)
+        timings_4.append(time.time() - started)
+
+        started = time.time()
+        parallel.search_monte_carlo(grid=grid_5,iterations=iterations,seed=seed)
+        timings_5.append(time.time() - started)
+
+        parallel.close()
+
+    result['alpha_beta_4x4'] = tuple(timings_4)
+    result['monte_carlo_5x5'] = tuple(timings_5)
+    result['alpha_beta_speedup'] = tuple(timings_4[0] / t for t in timings_4)
+    result['monte_carlo_speedup'] = tuple(timings_5[0] / t for t in timings_5)
+
+    return result
+
+
+def benchmark_ordering(mode=TTT_4_IN_A_ROW,positions=10,max_depth=4,seed=0):
+
+    """
+        Searches the same **positions** random grids of **mode** to
+        **max_depth** with the default move order and with a `MoveOrdering`,
+        and reports how many nodes the ordering saves. Both searches have no
+        transposition table, so they always find the same scores.
+    """
+
+    from tictactoe.engine     import Engine
+    from tictactoe.evaluation import Evaluator
+    from tictactoe.ordering   import MoveOrdering
+
+    grids = [g for g in random_grids(mode=mode,total=positions * 4,seed=seed)
+             if g.winner() == FREE_SPACE and g.total_free_cells() > max_depth][:positions]
+
+    nodes = []
+    for ordering in (None, MoveOrdering(mode=mode)):
+        engine = Engine(max_depth=max_depth,evaluator=Evaluator(mode=mode),ordering=ordering)
+
+        total = 0
+        for grid in grids:
+            total += engine.search(grid=grid).nodes
+
+        nodes.append(total)
+
+    return {'mode'      : mode,
+            'positions' : len(grids),
+            'default'   : nodes[0],
+            'ordered'   : nodes[1],
+            'reduction' : 1.0 - (float(nodes[1]) / nodes[0])}
+
+
+BENCHMARKS = (
+    ('import', benchmark_import),
+    ('cold_start', benchmark_cold_start),
+    ('decompose', benchmark_decompose),
+    ('evaluation', benchmark_evaluation),
+    ('ordering', benchmark_ordering),
+    ('playouts', benchmark_playouts),
+    ('parallel', benchmark_parallel)
+)
+
+
+def main():
+
+    for name, benchmark in BENCHMARKS:
+        result = benchmark()
+        print('{:<12} {}'.format(name, ', '.join(['{}={}'.format(k, result[k]) for k in sorted(result)])))
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,200 @@
+"""
+Board is a mutable representation of a Tic Tac Toe game meant for searching.
+===
 
+A `Grid` is immutable, so every `Move` applied to it creates a brand new `Grid`
+with its own cells and `GridState`. That is exactly what you want when passing
+games around, but a tree search visits millions of positions and would allocate
+all of those objects at every node.
+
+A `Board` keeps the `Grid` hash, the `GridState` hash, the Zobrist key and
+the cell players as plain integers, and updates them in place every time a
+move is made or unmade:
+
+    #!python
+    board = Board.from_grid(grid=Grid())
+    board.make_move(move=Move(number=5,player=1))
+    board.make_move(move=Move(number=1,player=2))
+    board.unmake_move()
+    grid = board.to_grid()
+
+"""
+
+from tictactoe.compute      import compute_winner, compute_board_status
+from tictactoe.errors       import TicTacToeHashException, CellIsTaken
+from tictactoe.hash.grid    import Grid, Grid4, Grid5, create_trusted_grid
+from tictactoe.hash.move    import Move, Move4, Move5
+from tictactoe.hash.zobrist import ZOBRIST_TABLE
+from tictactoe.settings     import (FREE_SPACE, PLAYER_1, PLAYER_2, TTT_3_IN_A_ROW,
+                                    TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
+from tictactoe.verification import verify_cell
+
+
+class Board(object):
+
+    MODE = TTT_3_IN_A_ROW
+
+    GRID_KLASS = Grid
+
+    MOVE_KLASS = Move
+
+    def __init__(self,grid=None):
+
+        if grid is None:
+            grid = self.GRID_KLASS()
+
+        if type(grid) is not self.GRID_KLASS:
+            raise TicTacToeHashException(
+                'grid is not a valid {} instance. Instead a {} ' \
+                'instance was passed.Cannot create Board'.format(self.GRID_KLASS,type(grid)))
+
+        self._hash    = grid.hash
+        self._state   = grid.state.hash
+        self._zobrist = grid.zobrist
+        self._keys    = ZOBRIST_TABLE[self.MODE]
+        self._cells   = [c.player for c in grid.cells]
+        self._taken   = grid.total_taken_cells()
+        self._moves   = []
+
+    @classmethod
+    def from_grid(cls,grid):
+        return cls(grid=grid)
+
+    def to_grid(self):
+        return create_trusted_grid(grid_cls=self.GRID_KLASS,hash=self._hash,zobrist=self._zobrist)
+
+    @property
+    def hash(self):
+        """
+            The hash of the `Grid` the board currently represents.
+        """
+        return self._hash
+
+    @hash.setter
+    def hash(self,value):
+        pass
+
+    @property
+    def state(self):
+        """
+            The hash of the `GridState` the board currently represents.
+        """
+        return self._state
+
+    @state.setter
+    def state(self,value):
+        pass
+
+    @property
+    def zobrist(self):
+        """
+            The Zobrist key of the `Grid` the board currently represents.
+        """
+        return self._zobrist
+
+    @zobrist.setter
+    def zobrist(self,value):
+        pass
+
+    @property
+    def moves(self):
+        return tuple(self._moves)
+
+    @moves.setter
+    def moves(self,value):
+        pass
+
+    @property
+    def turn(self):
+        """
+            The player that has to make the next move.
+        """
+        return PLAYER_1 if self._taken & 1 == 0 else PLAYER_2
+
+    @turn.setter
+    def turn(self,value):
+        pass
+
+    def player(self,number):
+
+        verify_cell(cell=number,mode=self.MODE)
+        return self._cells[number-1]
+
+    def free_cells(self):
+        return [n+1 for n, p in enumerate(self._cells) if p == FREE_SPACE]
+
+    def total_free_cells(self):
+        return len(self._cells) - self._taken
+
+    def total_taken_cells(self):
+        return self._taken
+
+    def winner(self):
+        return compute_winner(hash=self._hash,mode=self.MODE)
+
+    def status(self,extra=False):
+        return compute_board_status(winner=self.winner(),
+                                    taken=self._taken,
+                                    mode=self.MODE,
+                                    extra=extra)
+
+    def make_move(self,move):
+
+        if type(move) is not self.MOVE_KLASS:
+            raise TicTacToeHashException(
+                'move is not a valid Move instance. Instead a {}' \
+                'instance was passed.Cannot make Move'.format(type(move)))
+
+        number = move.number
+
+        if self._cells[number-1] != FREE_SPACE:
+            raise CellIsTaken(
+                'Cell {} has been taken by player {} already, ' \
+                'and cannot make Move'.format(number,self._cells[number-1]))
+
+        if move.player != self.turn:
+            raise TicTacToeHashException(
+                'It is not the turn of player {}.Player {} has ' \
+                'to move next'.format(move.player,self.turn))
+
+        # A move hash is the cell's free bit shifted by the player number,
+        # so both bits can be toggled without looking anything up.
+        self._hash ^= move.hash | (move.hash >> move.player)
+        self._state ^= 1 << (number - 1)
+        self._zobrist ^= self._keys[(number * 3) + move.player]
+        self._cells[number-1] = move.player
+        self._taken += 1
+        self._moves.append(move)
+
+    def unmake_move(self):
+
+        if not self._moves:
+            raise TicTacToeHashException(
+                'There are no moves left to unmake on the Board')
+
+        move = self._moves.pop()
+        number = move.number
+
+        self._hash ^= move.hash | (move.hash >> move.player)
+        self._state ^= 1 << (number - 1)
+        self._zobrist ^= self._keys[(number * 3) + move.player]
+        self._cells[number-1] = FREE_SPACE
+        self._taken -= 1
+
+        return move
+
+class Board4(Board):
+
+    MODE = TTT_4_IN_A_ROW
+
+    GRID_KLASS = Grid4
+
+    MOVE_KLASS = Move4
+
+class Board5(Board):
+
+    MODE = TTT_5_IN_A_ROW
+
+    GRID_KLASS = Grid5
+
+    MOVE_KLASS = Move5
@@ -0,0 +1,310 @@
+"""
+Caches for tables that are expensive to build.
+===
+
+Most of the lookup tables of the game are built per game mode, and a program
+that only plays 3x3 games has no use for the 4x4 and 5x5 ones. A `ModeTable`
+is a dictionary of game mode to table that only builds a table the first time
+its game mode is looked up:
+
+    #!python
+    WIN_LINE_MASKS = ModeTable(builder=create_win_line_masks,name='win_line_masks')
+    WIN_LINE_MASKS[TTT_3_IN_A_ROW] # Built here, the first time it is needed
+    TTT_3_IN_A_ROW in WIN_LINE_MASKS # True from now on
+
+Tables with a **name** can also be precompiled to a cache directory, so short
+lived processes can load them from disk instead of building them again. The
+cache directory is read from the `TICTACTOE_CACHE_DIR` environment variable,
+or set with `set_cache_directory`:
+
+    #!python
+    precompile_tables(directory='/var/cache/tictactoe')
+    set_cache_directory(directory='/var/cache/tictactoe')
+
+A cache file that is missing, unreadable or from another `CACHE_VERSION` is
+ignored and the table is built as usual. Unpickling is not free either, so
+only tables that load faster than they are built should get a name,
+`benchmark_cold_start` in `tictactoe.benchmark` shows whether the cache
+pays off.
+
+Values that are too many to build up front, like the cells of every 5x5
+position, go in an `LRUCache` instead, which never holds more than
+**maxsize** of them and drops the least recently used one first:
+
+    #!python
+    cache = LRUCache(maxsize=1024)
+    cells = cache.get(mask)
+    if cells is None:
+        cells = cache[mask] = compute_cells(mask)
+
+"""
+
+import cPickle
+import os
+
+from tictactoe.settings     import GAME_MODES
+
+
+CACHE_VERSION = 1
+
+CACHE_DIRECTORY_ENVIRON = 'TICTACTOE_CACHE_DIR'
+
+CACHE_DIRECTORY = {
+    'directory' : os.environ.get(CACHE_DIRECTORY_ENVIRON) or None
+}
+
+NAMED_TABLES = {}
+
+
+def get_cache_directory():
+    return CACHE_DIRECTORY['directory']
+
+def set_cache_directory(directory):
+    """
+        Sets the directory precompiled tables are loaded from. Pass None to
+        always build tables in memory.
+    """
+    CACHE_DIRECTORY['directory'] = directory
+
+def table_cache_path(directory,name,mode):
+    return os.path.join(directory, '{}_{}.pickle'.format(name, mode))
+
+def load_table(name,mode):
+
+    directory = get_cache_directory()
+    if directory is None:
+        return None
+
+    try:
+        with open(table_cache_path(directory=directory,name=name,mode=mode), 'rb') as f:
+            version, table = cPickle.load(f)
+    except (IOError, EOFError, ValueError, TypeError, cPickle.UnpicklingError):
+        return None
+
+    return table if version == CACHE_VERSION else None
+
+def save_table(directory,name,mode,table):
+
+    path = table_cache_path(directory=directory,name=name,mode=mode)
+
+    # Written under a temporary name first so a process loading the cache
+    # never sees half of a file.
+    with open(path + '.tmp', 'wb') as f:
+        cPickle.dump((CACHE_VERSION, table), f, cPickle.HIGHEST_PROTOCOL)
+
+    os.rename(path + '.tmp', path)
+
+def precompile_tables(directory=None):
+
+    """
+        Builds every named `ModeTable` for every game mode and writes them to
+        **directory**, or to the current cache directory. Returns the paths
+        of the written files.
+    """
+
+    # Tables register themselves when their modules are imported.
+    import tictactoe.compute
+    import tictactoe.line.line
+
+    directory = directory or get_cache_directory()
+    if directory is None:
+        raise ValueError(
+            'No cache directory was given and {} is not set'.format(CACHE_DIRECTORY_ENVIRON))
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    paths = []
+    for name in sorted(NAMED_TABLES):
+        table = NAMED_TABLES[name]
+        for mode in table.modes:
+            save_table(directory=directory,name=name,mode=mode,table=table.builder(mode=mode))
+            paths.append(table_cache_path(directory=directory,name=name,mode=mode))
+
+    return paths
+
+
+class ModeTable(dict):
+
+    def __init__(self,builder,name=None,modes=tuple(GAME_MODES)):
+
+        super(ModeTable, self).__init__()
+
+        self._builder = builder
+        self._name    = name
+        self._modes   = tuple(modes)
+
+        if name is not None:
+            NAMED_TABLES[name] = self
+
+    def __repr__(self):
+        return 'ModeTable(name={},modes={},built={})'.format(self._name,self._modes,self.keys())
+
+    def __missing__(self,mode):
+
+        if not self.supports(mode):
+            raise KeyError(mode)
+
+        table = load_table(name=self._name,mode=mode) if self._name is not None else None
+        if table is None:
+            table = self._builder(mode=mode)
+
+        self[mode] = table
+        return table
+
+    @property
+    def builder(self):
+        return self._builder
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def modes(self):
+        return self._modes
+
+    def supports(self,mode):
+        """
+            Whether a table can be built for **mode**. `mode in table` only
+            tells whether it was built already.
+        """
+        return mode in self._modes
+
+    def build(self):
+        """
+            Builds the tables of every game mode right away.
+        """
+        for mode in self._modes:
+            self[mode]
+
+        return self
+
+
+class LRUCache(object):
+
+    def __init__(self,maxsize=1 << 12):
+
+        self.verify_maxsize(maxsize=maxsize)
+        self._maxsize = maxsize
+
+        self.clear()
+        self.reset_statistics()
+
+    def __len__(self):
+        return len(self._links)
+
+    def __contains__(self,key):
+        return key in self._links
+
+    def __getitem__(self,key):
+
+        value = self.get(key,self)
+        if value is self:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self,key,value):
+
+        link = self._links.get(key)
+
+        if link is not None:
+            link[3] = value
+            self.touch(link=link)
+            return
+
+        if len(self._links) >= self._maxsize:
+            self.evict()
+
+        root = self._root
+        last = root[0]
+        last[1] = root[0] = self._links[key] = [last, root, key, value]
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self,value):
+        pass
+
+    def verify_maxsize(self,maxsize):
+
+        if not isinstance(maxsize,(int,long)) or maxsize < 1:
+            raise ValueError(
+                'maxsize must be an int of at least 1 entry. Instead :{} ' \
+                'was passed'.format(maxsize))
+
+    def get(self,key,default=None):
+
+        link = self._links.get(key)
+
+        if link is None:
+            self._misses += 1
+            return default
+
+        self._hits += 1
+        self.touch(link=link)
+
+        return link[3]
+
+    def touch(self,link):
+
+        # Entries are [previous, next, key, value] links of a circular list
+        # around a root link, from the least to the most recently used, so
+        # using an entry only moves its link to the end of the list.
+        previous, next, root = link[0], link[1], self._root
+        previous[1], next[0] = next, previous
+
+        last = root[0]
+        last[1] = root[0] = link
+        link[0], link[1] = last, root
+
+    def evict(self):
+
+        root = self._root
+        oldest = root[1]
+
+        root[1], oldest[1][0] = oldest[1], root
+        del self._links[oldest[2]]
+
+        self._evictions += 1
+
+    def resize(self,maxsize):
+
+        """
+            Changes **maxsize**, dropping the least recently used entries that
+            no longer fit.
+        """
+
+        self.verify_maxsize(maxsize=maxsize)
+        self._maxsize = maxsize
+
+        while len(self._links) > maxsize:
+            self.evict()
+
+    def clear(self):
+
+        self._root = []
+        self._root[:] = [self._root, self._root, None, None]
+        self._links = {}
+
+    def reset_statistics(self):
+
+        self._hits      = 0
+        self._misses    = 0
+        self._evictions = 0
+
+    def statistics(self):
+
+        lookups = self._hits + self._misses
+
+        return {
+            'maxsize'   : self._maxsize,
+            'entries'   : len(self._links),
+            'hits'      : self._hits,
+            'misses'    : self._misses,
+            'evictions' : self._evictions,
+            'hit_rate'  : float(self._hits) / lookups if lookups else 0.0
+        }
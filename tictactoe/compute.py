@@ -1,14 +1,67 @@
 
-from itertools import  permutations, chain
+from itertools import  chain, product
 
-from tictactoe.errors       import TicTacToeException
+from tictactoe.cache        import ModeTable
+from tictactoe.errors       import TicTacToeException, TicTacToeHashException
+from tictactoe.events       import (NEW_GAME, PLAYING, DRAW, WON, PLAYER_1_WON, PLAYER_2_WON,
+                                    LINE_EMPTY, LINE_MINORITY, LINE_BLOCKED, LINE_MAJORITY,
+                                    LINE_WON, LINE_PLAYER_1_MINORITY, LINE_PLAYER_2_MINORITY,
+                                    LINE_PLAYER_1_MAJORITY, LINE_PLAYER_2_MAJORITY,
+                                    LINE_PLAYER_1_WON, LINE_PLAYER_2_WON)
 from tictactoe.settings     import (FREE_SPACE, PLAYER_1, PLAYER_2, PLAYERS,
                                     TTT_3_IN_A_ROW, MODES, GAME_MODES)
-from tictactoe.verification import (verify_player, verify_hash, verify_game_mode,
+from tictactoe.verification import (DEBUG, verify_player, verify_hash, verify_game_mode,
                                     verify_cell)
 
 
 
+POPCOUNT_TABLE = tuple(bin(n).count('1') for n in xrange(0, 256, 1))
+
+
+def popcount(n):
+
+    """
+        Number of bits set in the non negative int **n**, a byte at a time.
+    """
+
+    count = 0
+    while n:
+        count += POPCOUNT_TABLE[n & 0xFF]
+        n >>= 8
+
+    return count
+
+def multiset_permutations(items):
+
+    """
+        Yields every distinct arrangement of **items** exactly once, in
+        lexicographic order. Repeated items are never swapped with each other,
+        so a line of length n with k different players takes n!/(n1!...nk!)
+        steps instead of n! plus a `set()` to remove the duplicates.
+    """
+
+    items = sorted(items)
+    total = len(items)
+
+    while True:
+        yield tuple(items)
+
+        # Find the rightmost item that is smaller than the one after it,
+        # swap it with the rightmost item bigger than it and reverse the tail.
+        i = total - 2
+        while i >= 0 and items[i] >= items[i+1]:
+            i -= 1
+
+        if i < 0:
+            return
+
+        j = total - 1
+        while items[j] <= items[i]:
+            j -= 1
+
+        items[i], items[j] = items[j], items[i]
+        items[i+1:] = items[:i:-1]
+
 def player_combinations(player_0,player_1,player_2):
 
     for player in [player_0,player_1,player_2]:
@@ -27,26 +80,150 @@ def player_combinations(player_0,player_1,player_2):
                           (player_1, PLAYER_1),
                           (player_2, PLAYER_2))
                 ])
-    return list(set(permutations(players)))
+    return list(multiset_permutations(players))
+
+def create_cell_pattern_table(mode=TTT_3_IN_A_ROW,cells_per_field=9):
+
+    """
+        Maps the bits of every field of **cells_per_field** cells of a grid
+        hash to the hashes of its cells, for the fields where every cell has
+        exactly one bit set, the only ones a `Grid` can have. Fields are
+        looked up by the masked bits of the hash where they are, without
+        shifting them, and the mask of the last field covers every bit above
+        it too, so a hash that is negative or too long never matches it.
+    """
+
+    verify_game_mode(game_mode=mode)
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    table = []
+    for c in xrange(0, cells, cells_per_field):
+        total = min(cells_per_field, cells - c)
+        fields = [[1 << (((c + i) * 3) + player) for player in (FREE_SPACE, PLAYER_1, PLAYER_2)]
+                  for i in xrange(0, total, 1)]
+
+        mask = ((1 << (total * 3)) - 1) if c + total < cells else -1
+        table.append((mask << (c * 3),
+                      dict((sum(field), field) for field in product(*fields))))
+
+    return tuple(table)
+
+
+# Building it is faster than unpickling it, so it is never cached on disk.
+CELL_PATTERN_TABLE = ModeTable(builder=create_cell_pattern_table)
 
 def decompose_grid_hash(hash,mode=TTT_3_IN_A_ROW):
 
+    """
+        Returns the hash of every cell of the grid **hash**. Every hash a
+        `Grid` can have is found in `CELL_PATTERN_TABLE`, which checks it on
+        the way. Any other hash is checked a cell at a time, and raises an
+        exception at the first cell without exactly one bit set.
+    """
+
+    cells = []
+
+    try:
+        for mask, fields in CELL_PATTERN_TABLE[mode]:
+            cells += fields[hash & mask]
+
+        return cells
+    except (KeyError, TypeError):
+        pass
+
     verify_game_mode(game_mode=mode)
-    m = GAME_MODES[mode]['GRID']
     verify_hash(hash=hash,mode=GAME_MODES[mode]['GRID'])
-    length = MODES[m]['length']
-    binary = bin(hash)[2:].zfill(length)
-    binary_cells = [c for c in
-                        reversed(
-                                    [binary[bin_range:bin_range+3]
-                                    for bin_range in xrange(0, len(binary), 3)]
-                                )
-                    ]
 
-    bits_to_push = lambda c : ((c+1) * 3) - 3
+    cells = []
+    for number in xrange(1, MODES[GAME_MODES[mode]['GRID_STATE']]['length'] + 1, 1):
+        field = (hash >> ((number - 1) * 3)) & 7
+        if field not in (1, 2, 4):
+            raise TicTacToeHashException(
+                'Invalid grid hash:{}, cell {} has the bits {} while every cell ' \
+                'must have exactly one bit set'.format(hash,number,bin(field)[2:].zfill(3)))
+
+        cells.append(field << ((number - 1) * 3))
+
+    return cells
+
+def create_bitboard_field_table(mode=TTT_3_IN_A_ROW,cells_per_field=4):
+
+    verify_game_mode(game_mode=mode)
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    player_bits = lambda field, c : {PLAYER_1 : 1 << c,
+                                     PLAYER_2 : 1 << (c + cells)}.get(field >> 1, 0)
+
+    cell_fields = [tuple(player_bits(field, c) for field in xrange(0, 8, 1))
+                   for c in xrange(0, cells, 1)]
+
+    table = []
+    for c in xrange(0, cells, cells_per_field):
+        fields = cell_fields[c:c+cells_per_field]
+        table.append((c * 3,
+                      (1 << (len(fields) * 3)) - 1,
+                      tuple(sum(f) for f in product(*reversed(fields)))))
+
+    return tuple(table)
+
+def create_grid_field_table(mode=TTT_3_IN_A_ROW,cells_per_field=4):
+
+    verify_game_mode(game_mode=mode)
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    table = []
+    for c in xrange(0, cells, cells_per_field):
+        total = min(cells_per_field, cells - c)
+        mask  = (1 << total) - 1
+        fields = []
+
+        for bits in xrange(0, 1 << (total * 2), 1):
+            player_1_bits, player_2_bits = bits & mask, bits >> total
+            fields.append(sum([1 << ((c + i) * 3 +
+                                     (PLAYER_1 if player_1_bits & (1 << i) else
+                                      PLAYER_2 if player_2_bits & (1 << i) else
+                                      FREE_SPACE))
+                               for i in xrange(0, total, 1)]))
+
+        table.append((c, total, mask, tuple(fields)))
+
+    return tuple(table)
+
 
-    return [ (1 << ((int(b, 2) >> 1) + bits_to_push(c=cell)))
-            for cell, b in enumerate(binary_cells) ]
+BITBOARD_FIELD_TABLE = ModeTable(builder=create_bitboard_field_table,name='bitboard_field_table')
+
+GRID_FIELD_TABLE = ModeTable(builder=create_grid_field_table,name='grid_field_table')
+
+def grid_hash_to_bitboards(hash,mode=TTT_3_IN_A_ROW,trusted=False):
+
+    if not trusted or DEBUG['enabled']:
+        verify_game_mode(game_mode=mode)
+        verify_hash(hash=hash,mode=GAME_MODES[mode]['GRID'])
+
+    bitboards = 0
+    for shift, mask, fields in BITBOARD_FIELD_TABLE[mode]:
+        bitboards |= fields[(hash >> shift) & mask]
+
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    return bitboards & ((1 << cells) - 1), bitboards >> cells
+
+def bitboards_to_grid_hash(player_1,player_2,mode=TTT_3_IN_A_ROW):
+
+    verify_game_mode(game_mode=mode)
+    verify_hash(hash=player_1,mode=GAME_MODES[mode]['GRID_STATE'])
+    verify_hash(hash=player_2,mode=GAME_MODES[mode]['GRID_STATE'])
+
+    if player_1 & player_2:
+        raise TicTacToeException(
+            'Player 1 bitboard:{} and Player 2 bitboard:{} both mark '\
+            'the same cells:{}'.format(player_1,player_2,player_1 & player_2))
+
+    hash = 0
+    for c, total, mask, fields in GRID_FIELD_TABLE[mode]:
+        hash |= fields[((player_1 >> c) & mask) | (((player_2 >> c) & mask) << total)]
+
+    return hash
 
 def compute_hash(cell,player,mode=TTT_3_IN_A_ROW):
 
@@ -65,15 +242,106 @@ def compute_all_hash_moves(player,mode=TTT_3_IN_A_ROW):
 
 def get_all_possible_lines(mode=TTT_3_IN_A_ROW):
 
-    key = lambda m : GAME_MODES[m]['GRID_STATE']
-    length = MODES[key(m=mode)]['length'] + 1
+    verify_game_mode(game_mode=mode)
+    size  = MODES[GAME_MODES[mode]['LINE']]['length']
+    total = size * size
 
-    horizontal = [tuple(y for y in xrange(x, 10, 3)) for x in xrange(1, 4)]
-    vertical   = [tuple(y for y in xrange(x, x+3, 1)) for x in xrange(1, 10, 3)]
-    diagnol    = [tuple(xrange(3, 8, 2)) , tuple(xrange(1, 10, 4))]
+    horizontal = [tuple(y for y in xrange(x, total+1, size)) for x in xrange(1, size+1)]
+    vertical   = [tuple(y for y in xrange(x, x+size, 1)) for x in xrange(1, total+1, size)]
+    diagnol    = [tuple(xrange(size, total-size+2, size-1)) , tuple(xrange(1, total+1, size+1))]
 
     return horizontal + vertical + diagnol
 
+def get_cell_lines(mode=TTT_3_IN_A_ROW):
+
+    lines = get_all_possible_lines(mode=mode)
+    length = MODES[GAME_MODES[mode]['GRID_STATE']]['length'] + 1
+
+    return tuple(tuple(i for i, line in enumerate(lines) if c in line)
+                 for c in xrange(1, length, 1))
+
+def create_win_line_masks(mode=TTT_3_IN_A_ROW):
+    return tuple(sum([1 << (c - 1) for c in line])
+                 for line in get_all_possible_lines(mode=mode))
+
+def create_win_line_hash_masks(player,mode=TTT_3_IN_A_ROW):
+    verify_player(player=player)
+    return tuple(sum([1 << (((c - 1) * 3) + player) for c in line])
+                 for line in get_all_possible_lines(mode=mode))
+
+def create_win_line_hash_table(mode=TTT_3_IN_A_ROW):
+    return {PLAYER_1 : create_win_line_hash_masks(player=PLAYER_1,mode=mode),
+            PLAYER_2 : create_win_line_hash_masks(player=PLAYER_2,mode=mode)}
+
+
+WIN_LINE_MASKS = ModeTable(builder=create_win_line_masks)
+
+WIN_LINE_HASH_MASKS = ModeTable(builder=create_win_line_hash_table)
+
+def compute_winner(hash,mode=TTT_3_IN_A_ROW):
+
+    for player in (PLAYER_1, PLAYER_2):
+        for mask in WIN_LINE_HASH_MASKS[mode][player]:
+            if hash & mask == mask:
+                return player
+
+    return FREE_SPACE
+
+def compute_bitboards_winner(player_1,player_2,mode=TTT_3_IN_A_ROW):
+
+    for player, bitboard in ((PLAYER_1, player_1), (PLAYER_2, player_2)):
+        for mask in WIN_LINE_MASKS[mode]:
+            if bitboard & mask == mask:
+                return player
+
+    return FREE_SPACE
+
+def compute_board_status(winner,taken,mode=TTT_3_IN_A_ROW,extra=False):
+
+    if winner != FREE_SPACE:
+        if extra:
+            return PLAYER_1_WON if winner == PLAYER_1 else PLAYER_2_WON
+        return WON
+
+    if taken == 0:
+        return NEW_GAME
+
+    if taken == MODES[GAME_MODES[mode]['GRID_STATE']]['length']:
+        return DRAW
+
+    return PLAYING
+
+def compute_line_event(player_1,player_2,length,extra=False):
+
+    """
+        Returns the line event of a line of **length** cells where **Player 1**
+        and **Player 2** have **player_1** and **player_2** marks. A line
+        with marks of both players is blocked, otherwise the player on it has
+        the majority when more than half of the line is theirs.
+    """
+
+    if player_1 and player_2:
+        return LINE_BLOCKED
+
+    if not player_1 and not player_2:
+        return LINE_EMPTY
+
+    player, marks = (PLAYER_1, player_1) if player_1 else (PLAYER_2, player_2)
+
+    if marks == length:
+        if extra:
+            return LINE_PLAYER_1_WON if player == PLAYER_1 else LINE_PLAYER_2_WON
+        return LINE_WON
+
+    if marks * 2 > length:
+        if extra:
+            return LINE_PLAYER_1_MAJORITY if player == PLAYER_1 else LINE_PLAYER_2_MAJORITY
+        return LINE_MAJORITY
+
+    if extra:
+        return LINE_PLAYER_1_MINORITY if player == PLAYER_1 else LINE_PLAYER_2_MINORITY
+    return LINE_MINORITY
+
 def new_game_hash(sum_cells=False,mode=TTT_3_IN_A_ROW):
 
     grid = compute_all_hash_moves(player=FREE_SPACE,mode=mode)
@@ -1 +1,612 @@
+"""
+Engine searches a Grid for the best Move to play.
+===
 
+`Engine` is a negamax search with alpha-beta pruning that works on any `Grid`,
+`Grid4` or `Grid5`. Moves are generated with `Grid.cells_taken(FREE_SPACE)`,
+played with `apply_trusted_move`, which skips the checks of `Grid.apply_move`
+for moves that are legal by construction, and tried in order of how many
+winning lines go through their cell, so the center and the corners are
+searched first.
+With a `MoveOrdering` they are ordered by its killer moves, history and
+static prior instead.
+
+Scores are always from the point of view of the player that has to move. A
+win is worth `WIN_SCORE` minus the number of plies it takes, so faster wins
+score higher and slower losses score higher than quick ones. A draw is worth
+`DRAW_SCORE`.
+
+    #!python
+    engine = Engine(max_nodes=100000,max_time=1.0)
+    result = engine.search(grid=Grid())
+    print(result.move, result.score, result.nodes_per_second)
+
+A search stopped by its node or time budget still returns the best root move
+found so far, with `complete` set to False. Positions at **max_depth** are
+scored as a draw, unless the engine has an `Evaluator` to score them.
+
+Transposition table entries are keyed by the grid hash, or by the 64-bit
+`Grid.zobrist` key with **zobrist** set, which every child grid gets from
+its parent with a single XOR.
+
+`iterative_search` deepens the search 1 ply at a time instead, so it always
+has the best move of the last finished depth to return when time runs out:
+
+    #!python
+    result = engine.iterative_search(grid=grid,soft_time=0.2,hard_time=0.5)
+    for report in result.iterations:
+        print(report.depth, report.score, report.nodes, report.elapsed)
+
+"""
+
+import time
+
+from collections import namedtuple
+
+from tictactoe.errors             import TicTacToeEngineException, SearchLimitReached
+from tictactoe.hash.grid          import Grid, apply_trusted_move
+from tictactoe.hash.symmetry      import IDENTITY, inverse_transform, transform_move
+from tictactoe.hash.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+from tictactoe.hash.zobrist       import zobrist_key
+from tictactoe.ordering           import CELL_PRIORS
+from tictactoe.settings           import FREE_SPACE, PLAYER_1, PLAYER_2
+
+
+WIN_SCORE  = 1000
+DRAW_SCORE = 0
+INFINITY   = WIN_SCORE + 1
+MAX_PLY    = 100
+
+TIME_CHECK_INTERVAL = 256
+
+ASPIRATION_WINDOW = 25
+
+
+IterationReport = namedtuple('IterationReport', ['depth', 'move', 'score', 'nodes', 'elapsed',
+                                                 'researches', 'principal_variation'])
+
+
+def player_to_move(grid):
+    return PLAYER_1 if grid.total_taken_cells() % 2 == 0 else PLAYER_2
+
+def score_to_table(score,ply):
+
+    # Win scores depend on the ply they were found at, so they are stored
+    # relative to the node and turned back into root scores when probed.
+    if score >= WIN_SCORE - MAX_PLY:
+        return score + ply
+
+    if score <= -(WIN_SCORE - MAX_PLY):
+        return score - ply
+
+    return score
+
+def score_from_table(score,ply):
+
+    if score >= WIN_SCORE - MAX_PLY:
+        return score - ply
+
+    if score <= -(WIN_SCORE - MAX_PLY):
+        return score + ply
+
+    return score
+
+
+class SearchResult(object):
+
+    def __init__(self,move,score,nodes,elapsed,depth,complete=True):
+
+        self._move     = move
+        self._score    = score
+        self._nodes    = nodes
+        self._elapsed  = elapsed
+        self._depth    = depth
+        self._complete = complete
+
+    def __repr__(self):
+        return 'SearchResult(move={},score={},nodes={},elapsed={:.4f},' \
+               'depth={},complete={})'.format(self.move,
+                                              self.score,
+                                              self.nodes,
+                                              self.elapsed,
+                                              self.depth,
+                                              self.complete)
+
+    @property
+    def move(self):
+        return self._move
+
+    @property
+    def score(self):
+        return self._score
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @property
+    def elapsed(self):
+        return self._elapsed
+
+    @property
+    def depth(self):
+        return self._depth
+
+    @property
+    def complete(self):
+        return self._complete
+
+    @property
+    def nodes_per_second(self):
+        return self._nodes / self._elapsed if self._elapsed > 0 else float(self._nodes)
+
+
+class IterativeSearchResult(SearchResult):
+
+    def __init__(self,move,score,nodes,elapsed,depth,complete=True,iterations=()):
+
+        super(IterativeSearchResult, self).__init__(move=move,
+                                                    score=score,
+                                                    nodes=nodes,
+                                                    elapsed=elapsed,
+                                                    depth=depth,
+                                                    complete=complete)
+        self._iterations = iterations
+
+    @property
+    def iterations(self):
+        """
+            An `IterationReport` for every iteration that finished.
+        """
+        return self._iterations
+
+
+class Engine(object):
+
+    def __init__(self,max_nodes=None,max_time=None,max_depth=None,table=None,symmetry=False,
+                 tablebase=None,evaluator=None,ordering=None,zobrist=False):
+
+        for name, value in (('max_nodes',max_nodes),('max_time',max_time),('max_depth',max_depth)):
+            if value is not None and value <= 0:
+                raise TicTacToeEngineException(
+                    '{} must be a positive number or None for no limit'.format(name))
+
+        self._max_nodes = max_nodes
+        self._max_time  = max_time
+        self._max_depth = max_depth
+        self._table     = table
+        self._symmetry  = symmetry
+        self._tablebase = tablebase
+        self._evaluator = evaluator
+        self._ordering  = ordering
+        self._zobrist   = zobrist
+
+        self._nodes      = 0
+        self._deadline   = None
+        self._time_limit = None
+        self._root_best  = (None, None)
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @property
+    def table(self):
+        return self._table
+
+    @property
+    def evaluator(self):
+        return self._evaluator
+
+    @property
+    def ordering(self):
+        return self._ordering
+
+    def verify_grid(self,grid):
+
+        if not isinstance(grid,Grid):
+            raise TicTacToeEngineException(
+                'grid is not a valid Grid instance. Instead a {} ' \
+                'instance was passed.Cannot search Grid'.format(type(grid)))
+
+    def search(self,grid):
+
+        self.verify_grid(grid=grid)
+
+        self._nodes      = 0
+        started          = time.time()
+        self._time_limit = self._max_time
+        self._deadline   = started + self._max_time if self._max_time is not None else None
+
+        if self._ordering is not None:
+            self._ordering.new_search()
+
+        depth = grid.total_free_cells()
+        if self._max_depth is not None:
+            depth = min(depth, self._max_depth)
+
+        best_move, best_score, complete = None, None, True
+
+        if self._evaluator is not None:
+            self._evaluator.reset(grid=grid)
+
+        record = self._tablebase.probe(grid=grid) if self._tablebase is not None else None
+
+        if record is not None:
+            self._nodes += 1
+            best_score, best_move = record
+
+        elif grid.winner() == FREE_SPACE and depth > 0:
+
+            entry, table_move = self.probe(grid=grid)
+            moves = self.order_moves(grid=grid,first=table_move)
+
+            try:
+                best_move, best_score = self.search_root(grid=grid,
+                                                         moves=moves,
+                                                         depth=depth,
+                                                         alpha=-INFINITY,
+                                                         beta=INFINITY)
+
+                self.store(grid=grid,score=best_score,depth=depth,bound=EXACT,move=best_move)
+
+            except SearchLimitReached:
+                complete = False
+                best_move, best_score = self._root_best
+
+                if best_move is None:
+                    best_move = moves[0]
+
+        else:
+            best_score = self.negamax(grid=grid,depth=0,alpha=-INFINITY,beta=INFINITY,ply=0)
+
+        return SearchResult(move=best_move,
+                            score=best_score,
+                            nodes=self._nodes,
+                            elapsed=time.time() - started,
+                            depth=depth,
+                            complete=complete)
+
+    def iterative_search(self,grid,soft_time=None,hard_time=None,window=ASPIRATION_WINDOW,
+                         callback=None):
+
+        """
+            Searches **grid** 1 ply deeper at a time until the depth limit,
+            a proven win or loss, or the time runs out:
+
+            * **soft_time** : no new iteration starts after this many seconds.
+            * **hard_time** : the running iteration is abandoned after this
+                              many seconds, or **max_time** when it is None.
+
+            The best move of the last finished iteration is searched first by
+            the next one, and the moves below it come from the transposition
+            table, which is why a temporary table is used when the engine has
+            none. Every iteration after the first starts with an aspiration
+            window of **window** around the previous score, and is searched
+            again with an open window when its score falls outside of it.
+
+            A report for every finished iteration is handed to **callback**
+            as soon as it finishes, and all of them are kept in the returned
+            `IterativeSearchResult`.
+        """
+
+        self.verify_grid(grid=grid)
+
+        started = time.time()
+        max_depth = grid.total_free_cells()
+        if self._max_depth is not None:
+            max_depth = min(max_depth, self._max_depth)
+
+        record = self._tablebase.probe(grid=grid) if self._tablebase is not None else None
+
+        if record is not None or grid.winner() != FREE_SPACE or max_depth == 0:
+            result = self.search(grid=grid)
+            return IterativeSearchResult(move=result.move,
+                                         score=result.score,
+                                         nodes=result.nodes,
+                                         elapsed=result.elapsed,
+                                         depth=result.depth,
+                                         complete=result.complete,
+                                         iterations=())
+
+        hard_time = hard_time if hard_time is not None else self._max_time
+
+        self._nodes      = 0
+        self._time_limit = hard_time
+        self._deadline   = started + hard_time if hard_time is not None else None
+
+        if self._ordering is not None:
+            self._ordering.new_search()
+
+        table = self._table
+        if table is None:
+            self._table = TranspositionTable()
+
+        best_move, best_score, depth, complete = None, None, 0, True
+        reports = []
+
+        try:
+            for depth in xrange(1, max_depth + 1, 1):
+                if soft_time is not None and reports and time.time() - started >= soft_time:
+                    depth -= 1
+                    break
+
+                nodes, researches = self._nodes, 0
+
+                if self._evaluator is not None:
+                    self._evaluator.reset(grid=grid)
+
+                entry, table_move = self.probe(grid=grid)
+                moves = self.order_moves(grid=grid,first=best_move or table_move)
+
+                # Win scores move with the depth they are found at, so there
+                # is no point in a window around them.
+                if window is None or best_score is None or abs(best_score) >= WIN_SCORE - MAX_PLY:
+                    alpha, beta = -INFINITY, INFINITY
+                else:
+                    alpha, beta = best_score - window, best_score + window
+
+                while True:
+                    move, score = self.search_root(grid=grid,moves=moves,depth=depth,alpha=alpha,beta=beta)
+
+                    if score <= alpha and alpha != -INFINITY:
+                        alpha = -INFINITY
+                    elif score >= beta and beta != INFINITY:
+                        beta = INFINITY
+                        moves.remove(move)
+                        moves.insert(0, move)
+                    else:
+                        break
+
+                    researches += 1
+
+                self.store(grid=grid,score=score,depth=depth,bound=EXACT,move=move)
+                best_move, best_score = move, score
+
+                report = IterationReport(depth=depth,
+                                         move=move,
+                                         score=score,
+                                         nodes=self._nodes - nodes,
+                                         elapsed=time.time() - started,
+                                         researches=researches,
+                                         principal_variation=self.principal_variation(grid=grid,depth=depth))
+                reports.append(report)
+
+                if callback is not None:
+                    callback(report)
+
+                if abs(score) >= WIN_SCORE - MAX_PLY:
+                    break
+
+        except SearchLimitReached:
+            complete = False
+            depth -= 1
+
+            if best_move is None:
+                best_move, best_score = self._root_best
+
+                if best_move is None:
+                    best_move = self.order_moves(grid=grid)[0]
+
+        finally:
+            self._table = table
+
+        return IterativeSearchResult(move=best_move,
+                                     score=best_score,
+                                     nodes=self._nodes,
+                                     elapsed=time.time() - started,
+                                     depth=depth,
+                                     complete=complete,
+                                     iterations=tuple(reports))
+
+    def search_root(self,grid,moves,depth,alpha,beta):
+
+        # The best move so far is kept on the engine, so it survives a
+        # SearchLimitReached raised in the middle of the loop.
+        self._root_best  = (None, None)
+        best_move, best_score = None, None
+
+        for move in moves:
+            score = -self.search_move(grid=grid,
+                                      move=move,
+                                      depth=depth-1,
+                                      alpha=-beta,
+                                      beta=-alpha,
+                                      ply=1)
+
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+                self._root_best = (best_move, best_score)
+
+            alpha = max(alpha, score)
+
+            if alpha >= beta:
+                break
+
+        return best_move, best_score
+
+    def principal_variation(self,grid,depth):
+
+        """
+            The moves the engine expects to be played from **grid**, read back
+            from the best moves of the transposition table.
+        """
+
+        moves = []
+        for _ in xrange(0, depth, 1):
+            if grid.winner() != FREE_SPACE:
+                break
+
+            entry, move = self.probe(grid=grid)
+
+            if move is None or not isinstance(move,grid.MOVE_KLASS) or \
+               move.player != player_to_move(grid=grid) or \
+               grid.get_cell(number=move.number).player != FREE_SPACE:
+                break
+
+            moves.append(move)
+            grid = apply_trusted_move(grid=grid,move=move)
+
+        return tuple(moves)
+
+    def negamax(self,grid,depth,alpha,beta,ply):
+
+        self.count_node()
+
+        if grid.winner() != FREE_SPACE:
+            return -(WIN_SCORE - ply)
+
+        if grid.total_free_cells() == 0:
+            return DRAW_SCORE
+
+        if self._tablebase is not None:
+            record = self._tablebase.probe(grid=grid)
+
+            if record is not None:
+                return score_from_table(record[0],ply)
+
+        if depth == 0:
+            return self.evaluate(grid=grid)
+
+        original_alpha = alpha
+        entry, table_move = self.probe(grid=grid)
+
+        if entry is not None and entry.depth >= depth:
+            score = score_from_table(entry.score,ply)
+
+            if entry.bound == EXACT:
+                return score
+            elif entry.bound == LOWER_BOUND:
+                alpha = max(alpha, score)
+            elif entry.bound == UPPER_BOUND:
+                beta = min(beta, score)
+
+            if alpha >= beta:
+                return score
+
+        best_move, best_score = None, -INFINITY
+
+        for move in self.order_moves(grid=grid,first=table_move,ply=ply):
+            score = -self.search_move(grid=grid,
+                                      move=move,
+                                      depth=depth-1,
+                                      alpha=-beta,
+                                      beta=-alpha,
+                                      ply=ply+1)
+
+            if score > best_score:
+                best_move, best_score = move, score
+
+            if score > alpha:
+                alpha = score
+
+            if alpha >= beta:
+                if self._ordering is not None:
+                    self._ordering.cutoff(move=move,depth=depth,ply=ply)
+                break
+
+        if self._table is not None:
+            if best_score <= original_alpha:
+                bound = UPPER_BOUND
+            elif best_score >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+
+            self.store(grid=grid,score=score_to_table(best_score,ply),depth=depth,bound=bound,move=best_move)
+
+        return best_score
+
+    def search_move(self,grid,move,depth,alpha,beta,ply):
+
+        if self._evaluator is None:
+            return self.negamax(grid=apply_trusted_move(grid=grid,move=move),
+                                depth=depth,alpha=alpha,beta=beta,ply=ply)
+
+        # The evaluator is updated in place, so the move has to be taken back
+        # once its subtree has been searched.
+        self._evaluator.make_move(move=move)
+        score = self.negamax(grid=apply_trusted_move(grid=grid,move=move),
+                             depth=depth,alpha=alpha,beta=beta,ply=ply)
+        self._evaluator.unmake_move(move=move)
+
+        return score
+
+    def table_key(self,grid):
+
+        if self._symmetry:
+            key, transform = grid.canonical()
+
+            if self._zobrist:
+                key = zobrist_key(hash=key,mode=grid.MODE)
+
+            return key, transform
+
+        return grid.zobrist if self._zobrist else grid.hash, IDENTITY
+
+    def probe(self,grid):
+
+        if self._table is None:
+            return None, None
+
+        key, transform = self.table_key(grid=grid)
+        entry = self._table.probe(key)
+
+        if entry is None or entry.move is None:
+            return entry, None
+
+        # Moves are stored for the canonical grid, so they have to be
+        # mapped back onto the grid being searched.
+        if transform != IDENTITY:
+            return entry, transform_move(move=entry.move,transform=inverse_transform(transform))
+
+        return entry, entry.move
+
+    def store(self,grid,score,depth,bound,move):
+
+        if self._table is None:
+            return
+
+        key, transform = self.table_key(grid=grid)
+
+        if move is not None and transform != IDENTITY:
+            move = transform_move(move=move,transform=transform)
+
+        self._table.store(key,score,depth,bound,move)
+
+    def evaluate(self,grid):
+
+        if self._evaluator is None:
+            return DRAW_SCORE
+
+        return self._evaluator.relative_score(player=player_to_move(grid=grid))
+
+    def order_moves(self,grid,first=None,ply=0):
+
+        player = player_to_move(grid=grid)
+
+        if self._ordering is not None:
+            return self._ordering.order_moves(grid=grid,player=player,ply=ply,first=first)
+
+        priors = CELL_PRIORS[grid.MODE]
+        cells  = sorted(grid.cells_taken(FREE_SPACE), key=lambda c : (-priors[c.number-1], c.number))
+        moves  = [grid.MOVE_KLASS(number=c.number,player=player) for c in cells]
+
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+
+        return moves
+
+    def count_node(self):
+
+        self._nodes += 1
+
+        if self._max_nodes is not None and self._nodes > self._max_nodes:
+            raise SearchLimitReached(
+                'Node budget of {} nodes was reached'.format(self._max_nodes))
+
+        if self._deadline is not None and self._nodes % TIME_CHECK_INTERVAL == 0:
+            if time.time() >= self._deadline:
+                raise SearchLimitReached(
+                    'Time budget of {} seconds was reached'.format(self._time_limit))
@@ -17,4 +17,8 @@ class CellIsTaken(TicTacToeGridException):
 class TicTacToeLineException(TicTacToeException):
     pass
 
+class TicTacToeEngineException(TicTacToeException):
+    pass
 
+class SearchLimitReached(TicTacToeEngineException):
+    pass
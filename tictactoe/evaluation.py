@@ -0,0 +1,174 @@
+"""
+Evaluator scores a position from the line events of its win lines.
+===
+
+4x4 and 5x5 games are too big to be searched to the end, so the `Engine` has
+to stop at a depth and guess who is better. An `Evaluator` makes that guess
+from the extra line events of `tictactoe.events` of every win line: lines
+where **Player 1** has the minority, the majority and so on. Every line event
+has a weight, and the score is the sum of the weights of all the lines, from
+the point of view of **Player 1**.
+
+Only the lines through a cell change when a move is made, so the `Evaluator`
+keeps the marks of both players on every line and updates the score when a
+move is made or unmade:
+
+    #!python
+    evaluator = Evaluator(mode=TTT_4_IN_A_ROW)
+    evaluator.reset(grid=grid)
+    evaluator.make_move(move=move)
+    print(evaluator.score)
+    evaluator.unmake_move(move=move)
+
+Plugged into an `Engine`, the scores are turned to the point of view of the
+player to move and kept below the score of any win:
+
+    #!python
+    engine = Engine(max_depth=4,evaluator=Evaluator(mode=TTT_5_IN_A_ROW))
+
+"""
+
+from tictactoe.cache        import ModeTable
+from tictactoe.compute      import (compute_line_event, get_cell_lines, grid_hash_to_bitboards,
+                                    popcount, WIN_LINE_MASKS)
+from tictactoe.engine       import WIN_SCORE, MAX_PLY
+from tictactoe.errors       import TicTacToeException
+from tictactoe.events       import (LINE_EMPTY, LINE_BLOCKED, LINE_PLAYER_1_MINORITY,
+                                    LINE_PLAYER_2_MINORITY, LINE_PLAYER_1_MAJORITY,
+                                    LINE_PLAYER_2_MAJORITY, LINE_PLAYER_1_WON,
+                                    LINE_PLAYER_2_WON)
+from tictactoe.settings     import PLAYER_1, GAME_MODES, MODES, TTT_4_IN_A_ROW
+from tictactoe.verification import verify_game_mode
+
+
+MAX_EVALUATION = WIN_SCORE - MAX_PLY - 1
+
+DEFAULT_WEIGHTS = {
+    LINE_EMPTY             : 0,
+    LINE_BLOCKED           : 0,
+    LINE_PLAYER_1_MINORITY : 1,
+    LINE_PLAYER_2_MINORITY : -1,
+    LINE_PLAYER_1_MAJORITY : 10,
+    LINE_PLAYER_2_MAJORITY : -10,
+    LINE_PLAYER_1_WON      : 100,
+    LINE_PLAYER_2_WON      : -100
+}
+
+
+CELL_LINES = ModeTable(builder=get_cell_lines)
+
+
+def create_line_weights(weights,mode=TTT_4_IN_A_ROW):
+
+    """
+        Returns the weight of a line for every number of marks of both
+        players, as a flat list indexed by `player_1 * (length + 1) + player_2`.
+    """
+
+    length = MODES[GAME_MODES[mode]['LINE']]['length']
+    table  = [0] * ((length + 1) * (length + 1))
+
+    for player_1 in xrange(0, length + 1, 1):
+        for player_2 in xrange(0, length + 1 - player_1, 1):
+            event = compute_line_event(player_1,player_2,length,extra=True)
+            table[(player_1 * (length + 1)) + player_2] = weights[event]
+
+    return table
+
+
+class Evaluator(object):
+
+    def __init__(self,mode=TTT_4_IN_A_ROW,weights=None):
+
+        verify_game_mode(game_mode=mode)
+
+        unknown = [e for e in (weights or {}) if e not in DEFAULT_WEIGHTS]
+        if unknown:
+            raise TicTacToeException(
+                'Invalid line event(s):{} in weights. Only valid line events ' \
+                'are :{}'.format(unknown,sorted(DEFAULT_WEIGHTS)))
+
+        self._mode    = mode
+        self._weights = dict(DEFAULT_WEIGHTS)
+        self._weights.update(weights or {})
+        self._length  = MODES[GAME_MODES[mode]['LINE']]['length']
+        self._masks   = WIN_LINE_MASKS[mode]
+        self._lines   = CELL_LINES[mode]
+        self._table   = create_line_weights(weights=self._weights,mode=mode)
+
+        self.reset()
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def weights(self):
+        return dict(self._weights)
+
+    @property
+    def score(self):
+        """
+            The score of the current position from the point of view of
+            **Player 1**.
+        """
+        return self._score
+
+    def reset(self,grid=None):
+
+        """
+            Starts tracking **grid**, or an empty grid if there is none.
+        """
+
+        self._player_1 = [0] * len(self._masks)
+        self._player_2 = [0] * len(self._masks)
+
+        if grid is not None:
+            if grid.MODE != self._mode:
+                raise TicTacToeException(
+                    'Evaluator for game mode {} cannot track a grid of ' \
+                    'game mode {}'.format(self._mode,grid.MODE))
+
+            player_1, player_2 = grid_hash_to_bitboards(hash=grid.hash,mode=self._mode,trusted=True)
+
+            for l, mask in enumerate(self._masks):
+                self._player_1[l] = popcount(player_1 & mask)
+                self._player_2[l] = popcount(player_2 & mask)
+
+        columns = self._length + 1
+        self._score = sum([self._table[(p1 * columns) + p2]
+                           for p1, p2 in zip(self._player_1, self._player_2)])
+
+    def evaluate(self,grid):
+        """
+            Scores **grid** from scratch, from the point of view of **Player 1**.
+        """
+        self.reset(grid=grid)
+        return self._score
+
+    def make_move(self,move):
+        self.update(number=move.number,player=move.player,delta=1)
+
+    def unmake_move(self,move):
+        self.update(number=move.number,player=move.player,delta=-1)
+
+    def update(self,number,player,delta):
+
+        table, columns = self._table, self._length + 1
+        marks = self._player_1 if player == PLAYER_1 else self._player_2
+        score = self._score
+
+        for l in self._lines[number-1]:
+            before = table[(self._player_1[l] * columns) + self._player_2[l]]
+            marks[l] += delta
+            score += table[(self._player_1[l] * columns) + self._player_2[l]] - before
+
+        self._score = score
+
+    def relative_score(self,player):
+        """
+            The score from the point of view of **player**, kept below the
+            score of any win so a search never mistakes it for one.
+        """
+        score = self._score if player == PLAYER_1 else -self._score
+        return max(-MAX_EVALUATION, min(MAX_EVALUATION, score))
@@ -0,0 +1,172 @@
+"""
+BitBoard is a compact representation of a Tic Tac Toe game using one bitmask per player.
+===
+
+A `Grid` hash spends 3 bits on every cell, one for each of **FREE_SPACE**,
+**Player 1** and **Player 2**. A `BitBoard` only keeps 2 bitmasks instead,
+one per real player, numbered exactly like the cells of a `GridState`.
+That is, bit 0 is cell 1, bit 1 is cell 2 and so on. A cell is free when
+neither of the bitmasks has it.
+
+The `hash` of a `BitBoard` is both bitmasks packed together, **Player 1** in the
+lower bits and **Player 2** right above it:
+
+    #!python
+    #|x|-|-|
+    #|-|o|-|
+    #|-|-|-|
+    board = BitBoard.from_grid(grid=grid)
+    print(board.player_1) # 1
+    print(board.player_2) # 16
+    print(board.hash)     # 1 | (16 << 9)
+
+So a 3x3 game fits in 18 bits, a 4x4 game in 32 bits and a 5x5 game in 50
+bits, instead of 27, 48 and 75 bits for a `Grid` hash. Conversion to and
+from a `Grid` is lossless.
+
+"""
+
+from tictactoe.compute      import (grid_hash_to_bitboards, bitboards_to_grid_hash,
+                                    compute_bitboards_winner, compute_board_status, popcount)
+from tictactoe.errors       import TicTacToeHashException
+from tictactoe.hash         import Hashable
+from tictactoe.hash.grid    import Grid, Grid4, Grid5
+from tictactoe.settings     import (GAME_MODES, MODES, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW,
+                                    TTT_5_IN_A_ROW)
+from tictactoe.verification import verify_binary, verify_hash
+
+
+class BitBoard(Hashable):
+
+    MODE = TTT_3_IN_A_ROW
+
+    GRID_KLASS = Grid
+
+    CELLS = MODES[GAME_MODES[TTT_3_IN_A_ROW]['GRID_STATE']]['length']
+
+    def __init__(self,player_1=0,player_2=0):
+
+        verify_hash(hash=player_1,mode=GAME_MODES[self.MODE]['GRID_STATE'])
+        verify_hash(hash=player_2,mode=GAME_MODES[self.MODE]['GRID_STATE'])
+
+        if player_1 & player_2:
+            raise TicTacToeHashException(
+                'Player 1 and Player 2 cannot mark the same ' \
+                'cells:{}'.format(player_1 & player_2))
+
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._binary   = None
+
+    @classmethod
+    def from_hash(cls,hash):
+        mask = (1 << cls.CELLS) - 1
+        return cls(player_1=hash & mask,player_2=hash >> cls.CELLS)
+
+    @classmethod
+    def from_binary(cls,binary):
+
+        if isinstance(binary,(list,tuple)):
+            binary = "".join([str(n) for n in binary])
+
+        verify_binary(binary=binary[-cls.CELLS:],mode=GAME_MODES[cls.MODE]['GRID_STATE'])
+        verify_binary(binary=binary[:-cls.CELLS],mode=GAME_MODES[cls.MODE]['GRID_STATE'])
+
+        return cls.from_hash(hash=int(binary, 2))
+
+    @classmethod
+    def from_grid(cls,grid):
+
+        if type(grid) is not cls.GRID_KLASS:
+            raise TicTacToeHashException(
+                'grid is not a valid {} instance. Instead a {} ' \
+                'instance was passed'.format(cls.GRID_KLASS,type(grid)))
+
+        player_1, player_2 = grid_hash_to_bitboards(hash=grid.hash,mode=cls.MODE,trusted=True)
+
+        return cls(player_1=player_1,player_2=player_2)
+
+    def to_grid(self):
+        return self.GRID_KLASS(hash=bitboards_to_grid_hash(player_1=self.player_1,
+                                                           player_2=self.player_2,
+                                                           mode=self.MODE))
+
+    @property
+    def hash(self):
+        return self._player_1 | (self._player_2 << self.CELLS)
+
+    @hash.setter
+    def hash(self,value):
+        pass
+
+    @property
+    def binary(self):
+        if self._binary is None:
+            self._binary = bin(self.hash)[2:].zfill(self.CELLS * 2)
+
+        return self._binary
+
+    @binary.setter
+    def binary(self,value):
+        pass
+
+    @property
+    def player_1(self):
+        """
+            Bitmask of the cells marked by **Player 1**.
+        """
+        return self._player_1
+
+    @player_1.setter
+    def player_1(self,value):
+        pass
+
+    @property
+    def player_2(self):
+        """
+            Bitmask of the cells marked by **Player 2**.
+        """
+        return self._player_2
+
+    @player_2.setter
+    def player_2(self,value):
+        pass
+
+    @property
+    def state(self):
+        """
+            Bitmask of the taken cells. This is the same hash as the
+            `GridState` of the equivalent `Grid`.
+        """
+        return self._player_1 | self._player_2
+
+    @state.setter
+    def state(self,value):
+        pass
+
+    def winner(self):
+        return compute_bitboards_winner(player_1=self._player_1,
+                                        player_2=self._player_2,
+                                        mode=self.MODE)
+
+    def status(self,extra=False):
+        return compute_board_status(winner=self.winner(),
+                                    taken=popcount(self.state),
+                                    mode=self.MODE,
+                                    extra=extra)
+
+class BitBoard4(BitBoard):
+
+    MODE = TTT_4_IN_A_ROW
+
+    GRID_KLASS = Grid4
+
+    CELLS = MODES[GAME_MODES[TTT_4_IN_A_ROW]['GRID_STATE']]['length']
+
+class BitBoard5(BitBoard):
+
+    MODE = TTT_5_IN_A_ROW
+
+    GRID_KLASS = Grid5
+
+    CELLS = MODES[GAME_MODES[TTT_5_IN_A_ROW]['GRID_STATE']]['length']
@@ -31,14 +31,21 @@ Here is an example
     mark = Cell(number=2,player=1)
     print(mark.hash) # This equals 16
 
+Every `Cell` of a game mode is created once, the first time any of them is
+asked for, and kept in a flat table of its class. A cell hash is a single
+bit, `1 << ((number - 1) * 3 + player)`, so the position of that bit is the
+index of the cell in the table:
+
+    #!python
+    Cell(number=2,player=1) is Cell.from_hash(hash=16) # True
+
 """
-import weakref
 
 from tictactoe.compute      import compute_hash
 from tictactoe.errors       import TicTacToeException
 from tictactoe.hash         import Hashable
-from tictactoe.settings     import (FREE_SPACE, GAME_MODES, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW,
-                                    TTT_5_IN_A_ROW)
+from tictactoe.settings     import (FREE_SPACE, PLAYER_1, PLAYER_2, GAME_MODES, MODES,
+                                    TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
 from tictactoe.verification import verify_player, verify_cell, verify_binary
 
 
@@ -53,20 +60,77 @@ def create_new_cell(cell_cls,number,player):
     return cell
 
 
+def create_cell_table(cell_class):
+
+    """
+        Creates every cell of **cell_class** and keeps them in its `_Table`,
+        indexed by `(number - 1) * 3 + player`.
+    """
+
+    length = MODES[GAME_MODES[cell_class.MODE]['GRID_STATE']]['length']
+
+    table = []
+    for number in xrange(1, length + 1, 1):
+        for player in (FREE_SPACE, PLAYER_1, PLAYER_2):
+            cell = create_new_cell(cell_cls=cell_class,number=number,player=player)
+            cell._hash = compute_hash(cell=number,player=player,mode=cell_class.MODE)
+            table.append(cell)
+
+    cell_class._Table = tuple(table)
+
+    return cell_class._Table
+
+
+def get_cell_table(cell_class):
+
+    table = cell_class._Table
+    if table is None:
+        table = create_cell_table(cell_class=cell_class)
+
+    return table
+
+
 def create_and_verify_cell(number,player,cell_class):
 
+    table = get_cell_table(cell_class=cell_class)
+
+    # Anything out of range either fails the checks or the lookup, and the
+    # verify functions below explain what is wrong with it.
+    try:
+        if player in (FREE_SPACE, PLAYER_1, PLAYER_2) and number >= 1:
+            return table[((number - 1) * 3) + player]
+
+    except (IndexError, TypeError):
+        pass
+
+    for name, value in (('number', number), ('player', player)):
+        if not isinstance(value,(int,long)):
+            raise TicTacToeException(
+                'Cell {} must be an int or long. Instead a {} was ' \
+                'passed :{}'.format(name,type(value),value))
+
     verify_player(player=player)
     verify_cell(cell=number,mode=cell_class.MODE)
 
-    ref_key = '{}-{}'.format(number,player)
-    cell = cell_class._Refs.get(ref_key,None)
+    raise TicTacToeException(
+        'Cell number:{} is not a valid cell number'.format(number))
 
-    if cell is None:
-        cell = create_new_cell(cell_cls=cell_class,number=number,player=player)
-        cell_class._Refs[ref_key] = cell
-        cell_class._Hashes[cell.hash] = cell_class._Refs[ref_key]
 
-    return cell
+def look_up_cell_hash(hash,cell_class):
+
+    if not isinstance(hash,(long,int)):
+        raise TicTacToeException('A {} type was passed to hash. Only '
+                          'an long or an int type is acceptable'.format(type(hash)))
+
+    table = get_cell_table(cell_class=cell_class)
+    index = hash.bit_length() - 1
+
+    if hash <= 0 or hash != 1 << index or index >= len(table):
+        raise TicTacToeException(
+            'Hash:{} is an invalid {}. Only a single bit of the first {} ' \
+            'can be set in the hash'.format(hash,cell_class.__name__,len(table)))
+
+    return table[index]
 
 
 class Cell(Hashable):
@@ -80,8 +144,7 @@ class Cell(Hashable):
                     or a **Player 1**'s or **Player 2**'s marking.
     """
 
-    _Refs   = weakref.WeakValueDictionary()
-    _Hashes = weakref.WeakValueDictionary()
+    _Table = None
 
     MODE   = TTT_3_IN_A_ROW
 
@@ -92,8 +155,8 @@ class Cell(Hashable):
             same `Cell` instances created more than once. That is, everytime you construct
             a new `Cell` instance when a previous `Cell` was constructed early on with the
             same `hash` value(same `number` and `player` property), then it
-            returns the previously one created that is stored inside a **_Refs**
-            or **_Hashes**. If you check the id of both `Cell` instances through the
+            returns the previously one created that is stored inside **_Table**.
+            If you check the id of both `Cell` instances through the
             id() method , then you will see that they are exactly the same object.
         """
 
@@ -150,20 +213,7 @@ class Cell(Hashable):
             It only takes a valid hash of a `Cell` , anything else and it will raise a
             **TicTacToeException** or **TicTacToeHashException**.
         """
-        if not isinstance(hash,(long,int)):
-            raise TicTacToeException('A {} type was passed to hash. Only '
-                              'an long or an int type is acceptable'.format(type(hash)))
-
-        previous_cell = cls._Hashes.get(hash,None)
-        if previous_cell:
-            return previous_cell
-        else:
-            binary = "".join([b for b in reversed(bin(hash)[2:].zfill(27))])
-
-            cls.validate_binary(binary=binary)
-            cell, player = cls.decompose_binary(index=binary.index('1'))
-
-            return cls(number=cell,player=player)
+        return look_up_cell_hash(hash=hash,cell_class=cls)
 
     @property
     def hash(self):
@@ -173,11 +223,6 @@ class Cell(Hashable):
             value that will be returned when the object is *hashed*
             through the python native **hash()** method.
         """
-        if self._hash is None:
-            self._hash = compute_hash(cell=self.number,
-                                      player=self.player,
-                                      mode=self.MODE)
-
         return self._hash
 
     @hash.setter
@@ -235,8 +280,7 @@ class Cell4(Cell):
         the right numbering for 4-IN-A-ROW game.
     """
 
-    _Refs   = weakref.WeakValueDictionary()
-    _Hashes = weakref.WeakValueDictionary()
+    _Table = None
 
     MODE   = TTT_4_IN_A_ROW
 
@@ -254,8 +298,7 @@ class Cell5(Cell):
         the right numbering for 5-IN-A-ROW game.
     """
 
-    _Refs   = weakref.WeakValueDictionary()
-    _Hashes = weakref.WeakValueDictionary()
+    _Table = None
 
     MODE   = TTT_5_IN_A_ROW
 
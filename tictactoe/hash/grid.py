@@ -2,25 +2,44 @@
 Grid is the the main representation of a Tic Tac Toe game containing all the cells of the game.
 ===
 
+A `Grid` never changes once it is created, so grids built from the same hash
+can be shared. Every game mode keeps the last `GRID_CACHE_SIZE` grids built
+from a hash in an `LRUCache`, and building one of them again returns the
+same instance instead of decomposing the hash again:
+
+    #!python
+    Grid(hash=grid.hash) is Grid(hash=grid.hash) # True while it is cached
+    set_grid_cache_size(size=1 << 16,mode=TTT_4_IN_A_ROW)
+    print(grid_cache_statistics(mode=TTT_4_IN_A_ROW)['hit_rate'])
+
+A size of 0 turns the cache of a game mode off. Grids made by `apply_move`
+are not cached, a search would only fill the cache with positions that are
+never built from their hash again.
 
 """
 
 
 from itertools import chain
 
+from tictactoe.cache              import LRUCache, ModeTable
 from tictactoe.compute            import (compute_hash, compute_all_hash_moves, new_game_hash,
-                                          decompose_grid_hash)
+                                          decompose_grid_hash, compute_winner,
+                                          compute_board_status, grid_hash_to_bitboards,
+                                          bitboards_to_grid_hash, popcount)
 from tictactoe.errors             import (TicTacToeException, TicTacToeHashException, IncompatibleGrid,
                                           CellIsTaken)
 from tictactoe.hash               import Hashable
-from tictactoe.hash.cell          import Cell, Cell4, Cell5
+from tictactoe.hash.cell          import Cell, Cell4, Cell5, get_cell_table
 from tictactoe.hash.move          import Move, Move4, Move5
-from tictactoe.hash.state         import GridState, GridState4, GridState5
+from tictactoe.hash.state         import (GridState, GridState4, GridState5,
+                                          create_new_grid_state)
+from tictactoe.hash.symmetry      import canonical_grid_hash, transform_grid_hash
 from tictactoe.hash.transposition import HashTable
+from tictactoe.hash.zobrist       import ZOBRIST_TABLE, zobrist_key
 from tictactoe.settings           import (FREE_SPACE, PLAYER_1, PLAYER_2, GAME_MODES,
                                          TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
-from tictactoe.verification       import (verify_cell, verify_player, verify_grid, verify_binary,
-                                          verify_hash, verify_game_mode)
+from tictactoe.verification       import (DEBUG, verify_cell, verify_player, verify_grid,
+                                          verify_binary, verify_hash, verify_game_mode)
 
 
 
@@ -43,11 +62,194 @@ def create_player_hash_table(mode=TTT_3_IN_A_ROW):
     return HashTable(table=player_hash_table)
 
 
-CELL_HASH_TABLE = {
-    TTT_3_IN_A_ROW : create_player_hash_table(mode=TTT_3_IN_A_ROW),
-    TTT_4_IN_A_ROW : create_player_hash_table(mode=TTT_4_IN_A_ROW),
-    TTT_5_IN_A_ROW : create_player_hash_table(mode=TTT_5_IN_A_ROW)
-}
+# Cells are interned by their classes, so this table is never cached on disk.
+CELL_HASH_TABLE = ModeTable(builder=create_player_hash_table)
+
+
+GRID_CACHE_SIZE = 1 << 12
+
+GRID_CACHE_SIZES = dict([(m, GRID_CACHE_SIZE) for m in GAME_MODES])
+
+
+def create_grid_cache(mode=TTT_3_IN_A_ROW):
+    size = GRID_CACHE_SIZES[mode]
+    return LRUCache(maxsize=size) if size else None
+
+
+GRID_CACHES = ModeTable(builder=create_grid_cache)
+
+
+def set_grid_cache_size(size,mode=None):
+
+    """
+        Sets how many grids built from a hash are kept for **mode**, or for
+        every game mode if it is None. A **size** of 0 turns the cache off.
+    """
+
+    if not isinstance(size,(int,long)) or size < 0:
+        raise TicTacToeException(
+            'size must be a positive int, or 0 to turn the grid cache off. ' \
+            'Instead :{} was passed'.format(size))
+
+    modes = GAME_MODES.keys() if mode is None else [mode]
+
+    for m in modes:
+        verify_game_mode(game_mode=m)
+        GRID_CACHE_SIZES[m] = size
+
+        # Caches that were never used are simply built with the new size.
+        if m not in GRID_CACHES:
+            continue
+
+        cache = GRID_CACHES[m]
+        if not size:
+            GRID_CACHES[m] = None
+        elif cache is None:
+            GRID_CACHES[m] = LRUCache(maxsize=size)
+        else:
+            cache.resize(maxsize=size)
+
+def get_grid_cache_size(mode=TTT_3_IN_A_ROW):
+    verify_game_mode(game_mode=mode)
+    return GRID_CACHE_SIZES[mode]
+
+def clear_grid_caches():
+    for cache in GRID_CACHES.values():
+        if cache is not None:
+            cache.clear()
+
+def grid_cache_statistics(mode=TTT_3_IN_A_ROW):
+
+    """
+        Hits, misses and evictions of the grid cache of **mode**, or None if
+        it is turned off.
+    """
+
+    verify_game_mode(game_mode=mode)
+
+    cache = GRID_CACHES[mode]
+    return cache.statistics() if cache is not None else None
+
+def look_up_grid(grid_cls,hash):
+
+    # Lookups skip the cache with debug on, so every grid gets checked.
+    cache = GRID_CACHES[grid_cls.MODE]
+    if cache is None or DEBUG['enabled'] or not isinstance(hash,(int,long)):
+        return None, None
+
+    grid = cache.get(hash)
+
+    # Subclasses of the same game mode share the cache of their mode.
+    if grid is not None and type(grid) is not grid_cls:
+        return None, cache
+
+    return grid, cache
+
+
+def create_new_grid(grid_cls,hash,cells,state,zobrist=None):
+
+    grid = Hashable.__new__(grid_cls)
+    grid._hash     = hash
+    grid._binary   = None
+    grid._hash_map = CELL_HASH_TABLE[grid_cls.MODE]
+    grid._cells    = cells
+    grid._state    = state
+    grid._zobrist  = zobrist
+
+    return grid
+
+
+def create_grid_cells(cell_cls,hash):
+
+    table = get_cell_table(cell_class=cell_cls)
+    return [table[h.bit_length() - 1] for h in decompose_grid_hash(hash=hash,mode=cell_cls.MODE)]
+
+
+def create_trusted_grid(grid_cls,hash,validate=False,zobrist=None):
+
+    """
+        Builds a grid from a **hash** the library made out of valid grids,
+        like a transformed grid, without checking the hash or the moves of
+        both players again. With **validate** the moves of both players are
+        still checked before the grid is cached. A known **zobrist** key is
+        only given to a newly built grid, a cached one is shared and never
+        changed. With debug on it goes through `Grid.__init__`.
+    """
+
+    if DEBUG['enabled']:
+        return grid_cls(hash=hash)
+
+    grid, cache = look_up_grid(grid_cls=grid_cls,hash=hash)
+    if grid is not None:
+        return grid
+
+    player_1, player_2 = grid_hash_to_bitboards(hash=hash,mode=grid_cls.MODE,trusted=True)
+
+    grid = create_new_grid(grid_cls=grid_cls,
+                           hash=hash,
+                           cells=create_grid_cells(cell_cls=grid_cls.CELL_KLASS,hash=hash),
+                           state=create_new_grid_state(state_cls=grid_cls.GRID_STATE_KLASS,
+                                                       hash=player_1 | player_2),
+                           zobrist=zobrist)
+
+    # Cached grids are handed out by Grid(hash=...) without any check, so an
+    # invalid grid must never get into the cache.
+    if validate:
+        grid.validate_grid()
+
+    if cache is not None:
+        cache[hash] = grid
+
+    return grid
+
+
+def create_moved_grid(grid,move):
+
+    # The parent grid is already valid, so only the moved cell and the move
+    # count can change. The child is derived from the parent by swapping the
+    # moved cell's free bit for its player bit.
+    number = move.number
+    hash   = grid._hash ^ grid._cells[number-1].hash ^ move.hash
+
+    zobrist = grid._zobrist
+    if zobrist is not None:
+        zobrist ^= ZOBRIST_TABLE[grid.MODE][(number * 3) + move.player]
+
+    if DEBUG['enabled']:
+        child = type(grid)(hash=hash)
+        child._zobrist = zobrist
+        return child
+
+    cells = list(grid._cells)
+    cells[number-1] = get_cell_table(cell_class=grid.CELL_KLASS)[((number - 1) * 3) + move.player]
+
+    state = create_new_grid_state(state_cls=grid.GRID_STATE_KLASS,
+                                  hash=grid._state.hash | (1 << (number - 1)))
+
+    return create_new_grid(grid_cls=type(grid),hash=hash,cells=cells,state=state,zobrist=zobrist)
+
+
+def apply_trusted_move(grid,move):
+
+    """
+        Applies **move** to **grid** without checking it, for searches that
+        only ever play the player to move on a free cell. With debug on it
+        goes through `Grid.apply_move` and all of its checks.
+    """
+
+    if DEBUG['enabled']:
+        return grid.apply_move(move)
+
+    return create_moved_grid(grid=grid,move=move)
+
+
+def verify_player_cells(player_1_cells,player_2_cells):
+
+    if (player_1_cells != player_2_cells) and (player_1_cells - 1 != player_2_cells):
+        raise TicTacToeHashException(
+            'Invalid grid setup, Player1 has {} moves while ' \
+            'Player2 has {} moves.Grid is not a valid '\
+            'Tic Tac Toe grid'.format(player_1_cells,player_2_cells))
 
 
 class Grid(Hashable):
@@ -60,22 +262,41 @@ class Grid(Hashable):
 
     MOVE_KLASS = Move
 
-    def __init__(self,hash=None):
+    def __new__(cls,hash=None):
+
+        """
+            Grids are built in **__new__**, like `Cell` instances, so a grid
+            that is still in the grid cache of its game mode is returned as
+            it is instead of being built again.
+        """
+
         if hash is None:
-            hash = new_game_hash(sum_cells=True,mode=self.MODE)
+            hash = new_game_hash(sum_cells=True,mode=cls.MODE)
+
+        grid, cache = look_up_grid(grid_cls=cls,hash=hash)
+        if grid is not None:
+            return grid
+
+        verify_hash(hash=hash,mode=GAME_MODES[cls.MODE]['GRID'])
 
-        verify_hash(hash=hash,mode=GAME_MODES[self.MODE]['GRID'])
-        self._hash  = hash
-        self._binary = None
-        self._hash_map = CELL_HASH_TABLE[self.MODE]
-        self._cells = [self.CELL_KLASS.from_hash(hash=h)
-                       for h in decompose_grid_hash(hash=self._hash,mode=self.MODE)]
+        player_1, player_2 = grid_hash_to_bitboards(hash=hash,mode=cls.MODE,trusted=True)
 
-        state_hash = sum([ ( 1 << n) for n, c in enumerate(self._cells)
-                        if (c.player == PLAYER_1 or c.player == PLAYER_2)])
+        grid = create_new_grid(grid_cls=cls,
+                               hash=hash,
+                               cells=create_grid_cells(cell_cls=cls.CELL_KLASS,hash=hash),
+                               state=create_new_grid_state(state_cls=cls.GRID_STATE_KLASS,
+                                                           hash=player_1 | player_2))
+        grid.validate_grid()
 
-        self._state = self.GRID_STATE_KLASS(hash=state_hash)
-        self.validate_grid()
+        if cache is not None:
+            cache[hash] = grid
+
+        return grid
+
+    def __reduce__(self):
+        # Unpickling goes through __new__ with the hash, so it can never
+        # overwrite a grid shared through the cache.
+        return type(self), (self._hash,)
 
     def __getitem__(self,cell):
         return self.get_cell(number=cell)
@@ -115,6 +336,22 @@ class Grid(Hashable):
     def hash(self,value):
         pass
 
+    @property
+    def zobrist(self):
+        """
+            A 64-bit Zobrist key of the grid, see `tictactoe.hash.zobrist`.
+            It is only computed from scratch the first time it is asked for,
+            every grid made from this one by `apply_move` updates it instead.
+        """
+        if self._zobrist is None:
+            self._zobrist = zobrist_key(hash=self._hash,mode=self.MODE)
+
+        return self._zobrist
+
+    @zobrist.setter
+    def zobrist(self,value):
+        pass
+
     @property
     def binary(self):
         if self._binary is None:
@@ -126,16 +363,33 @@ class Grid(Hashable):
     def binary(self,value):
         pass
 
+    @property
+    def cells(self):
+        return tuple(self._cells)
+
+    @cells.setter
+    def cells(self,value):
+        pass
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self,value):
+        pass
+
     def cells_taken(self,player=FREE_SPACE):
 
         verify_player(player=player)
+        cells = self._cells
 
         if player != FREE_SPACE:
-            return [self[n] for n in self._state.get_taken_cells()
-                    if self[n].player == player]
+            return [cells[n-1] for n in self._state.get_taken_cells()
+                    if cells[n-1].player == player]
 
         else:
-            return [self[n] for n in self._state.get_free_cells()]
+            return [cells[n-1] for n in self._state.get_free_cells()]
 
     def total_free_cells(self):
         return self._state.free
@@ -143,6 +397,41 @@ class Grid(Hashable):
     def total_taken_cells(self):
         return self._state.taken
 
+    def canonical(self):
+        """
+            Returns a tuple with the hash of the canonical grid among all the
+            rotations and reflections of the current grid, and the transform
+            that turns the current grid into it.
+        """
+        return canonical_grid_hash(hash=self._hash,mode=self.MODE)
+
+    def canonical_hash(self):
+        return self.canonical()[0]
+
+    def transform(self,transform):
+        return create_trusted_grid(grid_cls=type(self),
+                                   hash=transform_grid_hash(hash=self._hash,
+                                                            transform=transform,
+                                                            mode=self.MODE))
+
+    def winner(self):
+        """
+            Returns the player that completed a line, or **FREE_SPACE** if
+            no player has completed one yet.
+        """
+        return compute_winner(hash=self._hash,mode=self.MODE)
+
+    def status(self,extra=False):
+        """
+            Returns the board event of the grid : `NEW_GAME`, `PLAYING`, `DRAW`
+            or `WON`. If **extra** is True, a won grid returns `PLAYER_1_WON` or
+            `PLAYER_2_WON` instead of `WON`.
+        """
+        return compute_board_status(winner=self.winner(),
+                                    taken=self.total_taken_cells(),
+                                    mode=self.MODE,
+                                    extra=extra)
+
     def get_cell(self,number):
 
         verify_cell(cell=number,mode=self.MODE)
@@ -162,17 +451,10 @@ class Grid(Hashable):
             return self.CELL_KLASS(number=cell, player=player)
 
     def validate_grid(self):
-        total_taken = self.total_taken_cells()
-
-        if total_taken != 0:
-            player_1_cells = len(self.cells_taken(player = PLAYER_1))
-            player_2_cells = len(self.cells_taken(player = PLAYER_2))
 
-            if (player_1_cells != player_2_cells) and (player_1_cells - 1 != player_2_cells):
-                raise TicTacToeHashException(
-                    'Invalid grid setup, Player1 has {} moves while ' \
-                    'Player2 has {} moves.Grid is not a valid '\
-                    'Tic Tac Toe grid'.format(player_1_cells,player_2_cells))
+        if self._state.hash:
+            player_1, player_2 = grid_hash_to_bitboards(hash=self._hash,mode=self.MODE,trusted=True)
+            verify_player_cells(popcount(player_1),popcount(player_2))
 
     def apply_grid(self,grid,backwards=False):
 
@@ -181,25 +463,41 @@ class Grid(Hashable):
                 'grid is not a valid Grid instance. Instead a {}' \
                 'instance was passed.Cannot apply Grid'.format(type(grid)))
 
-        applied_hash = self.hash | grid.hash
-        applied_grid = [Cell.from_hash(hash=h) for h in decompose_grid_hash(hash=applied_hash,mode=self.MODE)]
+        if grid.MODE != self.MODE:
+            raise IncompatibleGrid(
+                'A grid of game mode {} cannot be applied to a grid of game ' \
+                'mode {}'.format(grid.MODE,self.MODE))
 
-        for c in applied_grid:
+        mine_1, mine_2 = grid_hash_to_bitboards(hash=self._hash,mode=self.MODE,trusted=True)
+        theirs_1, theirs_2 = grid_hash_to_bitboards(hash=grid.hash,mode=self.MODE,trusted=True)
 
-            if (self[c.number].player != FREE_SPACE) and (c.player != self[c.number].player):
+        taken = (mine_1 & theirs_2) | (mine_2 & theirs_1)
+        if taken:
+            number = (taken & -taken).bit_length()
 
-                raise CellIsTaken(
-                    'Cell {} has been taken by player {} already, ' \
-                    'and cannot override Grid.Grid applied ' \
-                    'failed'.format(c.number,self[c.number].player))
+            raise CellIsTaken(
+                'Cell {} has been taken by player {} already, ' \
+                'and cannot override Grid.Grid applied ' \
+                'failed'.format(number,self._cells[number-1].player))
+
+        player_1, player_2 = mine_1 | theirs_1, mine_2 | theirs_2
 
         if not backwards:
-            if applied_hash != grid.hash:
+            if (player_1, player_2) != (theirs_1, theirs_2):
                 raise IncompatibleGrid(
                     'New grid cannot go backwards in moves. Must provide all the '\
                     'previous moves plus 1 or more moves.')
 
-        return self if applied_hash == self.hash else self.GRID_KLASS(hash=applied_hash)
+        if (player_1, player_2) == (mine_1, mine_2):
+            return self
+
+        # Both grids are valid, but the moves of one player can still
+        # outnumber the other's once they are put together.
+        return create_trusted_grid(grid_cls=type(self),
+                                   hash=bitboards_to_grid_hash(player_1=player_1,
+                                                               player_2=player_2,
+                                                               mode=self.MODE),
+                                   validate=True)
 
     def apply_move(self,move):
 
@@ -208,21 +506,24 @@ class Grid(Hashable):
                 'move is not a valid Move instance. Instead a {}' \
                 'instance was passed.Cannot apply Move'.format(type(move)))
 
-        if (self[move.number].player != FREE_SPACE) and (move.player != self[move.number].player):
+        player = self._cells[move.number-1].player
+
+        if (player != FREE_SPACE) and (move.player != player):
             raise CellIsTaken(
                 'Cell {} has been taken by player {} already, ' \
                 'and cannot override Move.Move applied ' \
-                'failed'.format(move.number,self[move.number].player))
+                'failed'.format(move.number,player))
 
-        elif self[move.number].player == move.player:
+        elif player == move.player:
             return self
 
         else:
 
-            cells = [c for c in self._cells]
-            cells[move.number-1] = move
+            total_taken = self.total_taken_cells()
+            verify_player_cells(player_1_cells=((total_taken + 1) >> 1) + (move.player == PLAYER_1),
+                                player_2_cells=(total_taken >> 1) + (move.player == PLAYER_2))
 
-            return type(self)(hash=sum([c.hash for c in cells]))
+            return create_moved_grid(grid=self,move=move)
 
 class Grid4(Grid):
 
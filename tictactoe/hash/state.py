@@ -1,11 +1,97 @@
+"""
+GridState is the set of cells of a grid that have been taken.
+===
 
-from funcy import  memoize
+Bit n-1 of a `GridState` hash is set when cell **n** is taken by either
+player. Lists of the taken and free cell numbers are looked up by that mask
+instead of being worked out from a binary string:
 
+* 3x3 and 4x4 : every mask has a tuple of taken cells in a table built the
+                first time the game mode is used, 512 and 65536 tuples.
+* 5x5 : 2^25 masks are too many to build, so the tuples are computed when
+        they are first asked for and kept in a bounded `LRUCache` of
+        `STATE_CACHE_SIZE` masks.
+
+The free cells of a mask are the taken cells of its complement, so both
+come from the same table.
+
+"""
+
+from tictactoe.cache        import LRUCache, ModeTable
+from tictactoe.compute      import popcount
 from tictactoe.hash         import Hashable
-from tictactoe.settings     import GAME_MODES, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW
+from tictactoe.settings     import GAME_MODES, MODES, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW
 from tictactoe.verification import verify_binary, verify_hash
 
 
+MAX_TABLE_CELLS = 16
+
+STATE_CACHE_SIZE = 1 << 15
+
+
+def create_state_cells_table(mode=TTT_3_IN_A_ROW):
+
+    """
+        Returns the taken cells of every mask of **mode** as a tuple indexed
+        by the mask, or an empty `LRUCache` for grids with more than
+        `MAX_TABLE_CELLS` cells.
+    """
+
+    length = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    if length > MAX_TABLE_CELLS:
+        return LRUCache(maxsize=STATE_CACHE_SIZE)
+
+    # Every mask is a smaller mask plus its highest bit, which was already
+    # built by the time the loop gets to it.
+    table = [()]
+    for number in xrange(1, length + 1, 1):
+        table.extend([cells + (number,) for cells in table])
+
+    return tuple(table)
+
+
+STATE_CELLS_TABLE = ModeTable(builder=create_state_cells_table)
+
+STATE_LENGTHS = dict([(m, MODES[GAME_MODES[m]['GRID_STATE']]['length']) for m in GAME_MODES])
+
+
+def get_state_cells(mask,mode=TTT_3_IN_A_ROW):
+
+    """
+        The numbers of the cells set in **mask**, in ascending order.
+    """
+
+    table = STATE_CELLS_TABLE[mode]
+
+    if type(table) is tuple:
+        return table[mask]
+
+    cells = table.get(mask)
+
+    if cells is None:
+        cells, number, bits = [], 1, mask
+        while bits:
+            if bits & 1:
+                cells.append(number)
+
+            bits >>= 1
+            number += 1
+
+        cells = table[mask] = tuple(cells)
+
+    return cells
+
+def create_new_grid_state(state_cls,hash):
+
+    state = Hashable.__new__(state_cls)
+    state._hash   = hash
+    state._binary = None
+    state._taken  = None
+
+    return state
+
+
 class GridState(Hashable):
 
     MODE = TTT_3_IN_A_ROW
@@ -15,6 +101,7 @@ class GridState(Hashable):
         verify_hash(hash=hash,mode=GAME_MODES[self.MODE]['GRID_STATE'])
         self._hash = hash
         self._binary = None
+        self._taken  = None
 
     @classmethod
     def from_binary(cls,binary):
@@ -33,7 +120,8 @@ class GridState(Hashable):
     @property
     def binary(self):
         if self._binary is None:
-            self._binary = bin(self.hash)[2:].zfill(9)
+            length = MODES[GAME_MODES[self.MODE]['GRID_STATE']]['length']
+            self._binary = bin(self.hash)[2:].zfill(length)
 
         return self._binary
 
@@ -43,19 +131,21 @@ class GridState(Hashable):
 
     @property
     def free(self):
-        return self.binary.count('0')
+        return STATE_LENGTHS[self.MODE] - self.taken
 
     @property
     def taken(self):
-        return self.binary.count('1')
+        if self._taken is None:
+            self._taken = popcount(self._hash)
+
+        return self._taken
 
-    @memoize
     def get_taken_cells(self):
-       return [i+1 for i,b in enumerate(reversed(self.binary)) if b == '1']
+        return get_state_cells(mask=self._hash,mode=self.MODE)
 
-    @memoize
     def get_free_cells(self):
-       return [i+1 for i,b in enumerate(reversed(self.binary)) if b == '0']
+        return get_state_cells(mask=self._hash ^ ((1 << STATE_LENGTHS[self.MODE]) - 1),
+                               mode=self.MODE)
 
 class GridState4(GridState):
 
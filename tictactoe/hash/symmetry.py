@@ -0,0 +1,157 @@
+"""
+Symmetries of a square Tic Tac Toe grid.
+===
+
+Every square grid looks the same after being rotated or reflected, so any
+position has up to 8 equivalent positions: the identity, 3 rotations and 4
+reflections. Searching or caching all of them separately is wasted work.
+
+Each transform is stored as a permutation of the cell numbers for every game
+mode, where `CELL_PERMUTATIONS[mode][transform][n-1]` is the cell that cell
+**n** ends up on. The canonical form of a position is the transformed grid
+with the smallest `BitBoard` hash, and it comes with the transform that
+produced it:
+
+    #!python
+    canonical_hash, transform = canonical_grid_hash(hash=grid.hash,mode=grid.MODE)
+    #Moves found on the canonical grid map back through the inverse transform
+    move = transform_move(move=canonical_move,transform=inverse_transform(transform))
+
+"""
+
+from tictactoe.cache        import ModeTable
+from tictactoe.compute      import grid_hash_to_bitboards, bitboards_to_grid_hash
+from tictactoe.errors       import TicTacToeHashException
+from tictactoe.settings     import GAME_MODES, MODES, TTT_3_IN_A_ROW
+from tictactoe.verification import verify_game_mode
+
+
+IDENTITY               = 0
+ROTATE_90              = 1
+ROTATE_180             = 2
+ROTATE_270             = 3
+REFLECT_HORIZONTAL     = 4
+REFLECT_VERTICAL       = 5
+REFLECT_DIAGONAL       = 6
+REFLECT_ANTI_DIAGONAL  = 7
+
+TRANSFORMS = (IDENTITY, ROTATE_90, ROTATE_180, ROTATE_270,
+              REFLECT_HORIZONTAL, REFLECT_VERTICAL, REFLECT_DIAGONAL,
+              REFLECT_ANTI_DIAGONAL)
+
+INVERSE_TRANSFORMS = (IDENTITY, ROTATE_270, ROTATE_180, ROTATE_90,
+                      REFLECT_HORIZONTAL, REFLECT_VERTICAL, REFLECT_DIAGONAL,
+                      REFLECT_ANTI_DIAGONAL)
+
+
+def create_cell_permutations(mode=TTT_3_IN_A_ROW):
+
+    verify_game_mode(game_mode=mode)
+    size = MODES[GAME_MODES[mode]['LINE']]['length']
+    last = size - 1
+
+    coordinates = {
+        IDENTITY              : lambda r, c : (r, c),
+        ROTATE_90             : lambda r, c : (c, last - r),
+        ROTATE_180            : lambda r, c : (last - r, last - c),
+        ROTATE_270            : lambda r, c : (last - c, r),
+        REFLECT_HORIZONTAL    : lambda r, c : (r, last - c),
+        REFLECT_VERTICAL      : lambda r, c : (last - r, c),
+        REFLECT_DIAGONAL      : lambda r, c : (c, r),
+        REFLECT_ANTI_DIAGONAL : lambda r, c : (last - c, last - r)
+    }
+
+    permutations = []
+    for transform in TRANSFORMS:
+        cells = []
+        for n in xrange(0, size * size, 1):
+            row, column = coordinates[transform](n // size, n % size)
+            cells.append((row * size) + column + 1)
+        permutations.append(tuple(cells))
+
+    return tuple(permutations)
+
+def create_bitboard_transform_table(mode=TTT_3_IN_A_ROW,bits_per_field=8):
+
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+    table = []
+
+    for permutation in CELL_PERMUTATIONS[mode]:
+        fields = []
+        for c in xrange(0, cells, bits_per_field):
+            total  = min(bits_per_field, cells - c)
+            images = [1 << (permutation[c + i] - 1) for i in xrange(0, total, 1)]
+            masks  = [0]
+
+            # Every mask is the mask without its highest bit plus the
+            # image of that bit, so each entry costs a single OR.
+            for i, image in enumerate(images):
+                masks.extend([m | image for m in masks[:1 << i]])
+
+            fields.append((c, (1 << total) - 1, tuple(masks)))
+        table.append(tuple(fields))
+
+    return tuple(table)
+
+
+CELL_PERMUTATIONS = ModeTable(builder=create_cell_permutations)
+
+BITBOARD_TRANSFORM_TABLE = ModeTable(builder=create_bitboard_transform_table)
+
+
+def verify_transform(transform):
+    if transform not in TRANSFORMS:
+        raise TicTacToeHashException(
+            'Invalid transform:{}. Only valid transforms are :{}'.format(transform,TRANSFORMS))
+
+def inverse_transform(transform):
+    verify_transform(transform=transform)
+    return INVERSE_TRANSFORMS[transform]
+
+def transform_bitboard(bitboard,transform,mode=TTT_3_IN_A_ROW):
+
+    transformed = 0
+    for shift, mask, masks in BITBOARD_TRANSFORM_TABLE[mode][transform]:
+        transformed |= masks[(bitboard >> shift) & mask]
+
+    return transformed
+
+def transform_grid_hash(hash,transform,mode=TTT_3_IN_A_ROW):
+
+    verify_transform(transform=transform)
+    player_1, player_2 = grid_hash_to_bitboards(hash=hash,mode=mode)
+
+    return bitboards_to_grid_hash(player_1=transform_bitboard(player_1,transform,mode),
+                                  player_2=transform_bitboard(player_2,transform,mode),
+                                  mode=mode)
+
+def canonical_grid_hash(hash,mode=TTT_3_IN_A_ROW):
+
+    player_1, player_2 = grid_hash_to_bitboards(hash=hash,mode=mode)
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    best = None
+    for transform, fields in enumerate(BITBOARD_TRANSFORM_TABLE[mode]):
+        transformed_1 = transformed_2 = 0
+
+        for shift, mask, masks in fields:
+            transformed_1 |= masks[(player_1 >> shift) & mask]
+            transformed_2 |= masks[(player_2 >> shift) & mask]
+
+        key = transformed_1 | (transformed_2 << cells)
+        if best is None or key < best[0]:
+            best = (key, transformed_1, transformed_2, transform)
+
+    key, player_1, player_2, transform = best
+
+    return bitboards_to_grid_hash(player_1=player_1,player_2=player_2,mode=mode), transform
+
+def transform_cell_number(number,transform,mode=TTT_3_IN_A_ROW):
+    verify_transform(transform=transform)
+    return CELL_PERMUTATIONS[mode][transform][number-1]
+
+def transform_move(move,transform):
+    return type(move)(number=transform_cell_number(number=move.number,
+                                                   transform=transform,
+                                                   mode=move.MODE),
+                      player=move.player)
@@ -1,6 +1,38 @@
 
-from tictactoe.errors import TicTacToeException
-from tictactoe.hash   import Hashable
+import mmap
+import os
+import struct
+
+from collections import namedtuple
+
+from tictactoe.errors    import TicTacToeException
+from tictactoe.hash      import Hashable
+from tictactoe.hash.move import Move, Move4, Move5
+
+
+EXACT       = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+DEPTH_PREFERRED = 0
+ALWAYS_REPLACE  = 1
+TWO_TIER        = 2
+
+REPLACEMENT_SCHEMES = (DEPTH_PREFERRED, ALWAYS_REPLACE, TWO_TIER)
+
+
+SHARED_ENTRY = struct.Struct('<QQQ')
+
+SHARED_KEY_BITS = 128
+
+MOVE_KLASSES = {
+    Move.MODE  : Move,
+    Move4.MODE : Move4,
+    Move5.MODE : Move5
+}
+
+
+TranspositionEntry = namedtuple('TranspositionEntry', ['key', 'score', 'depth', 'bound', 'move'])
 
 
 class HashTable(object):
@@ -32,7 +64,7 @@ class HashTable(object):
 
     def get(self,hash,silent=True):
         if silent:
-            return self._table.get(hash,None)
+            return self.table.get(hash,None)
 
         return self.table[hash]
 
@@ -57,3 +89,301 @@ class HashTable(object):
                 'hashable is not a valid Hashable instance. Instead a : ' \
                 '{} type was found'.format(type(hashable)))
 
+
+class TranspositionTable(object):
+
+    """
+        A fixed size table of search results keyed by a grid hash. Every
+        entry keeps the score, the remaining depth it was searched to, whether
+        the score is `EXACT`, a `LOWER_BOUND` or an `UPPER_BOUND`, and the best
+        move found.
+
+        The table never holds more than **size** entries. When two keys land
+        on the same slot, the **replacement** scheme decides which one stays:
+
+        * `DEPTH_PREFERRED` : keep whichever entry was searched deeper.
+        * `ALWAYS_REPLACE` : the newest entry always wins.
+        * `TWO_TIER` : every bucket has a depth-preferred slot and an
+                       always-replace slot, so shallow entries still get
+                       stored without evicting deep ones.
+    """
+
+    def __init__(self,size=1 << 16,replacement=DEPTH_PREFERRED):
+
+        if not isinstance(size,(int,long)) or size < 2:
+            raise TicTacToeException(
+                'size must be an int of at least 2 entries. Instead :{} ' \
+                'was passed'.format(size))
+
+        if replacement not in REPLACEMENT_SCHEMES:
+            raise TicTacToeException(
+                'Invalid replacement scheme :{}. Only valid schemes are {} for ' \
+                'depth-preferred, {} for always-replace and {} for ' \
+                'two-tier'.format(replacement,DEPTH_PREFERRED,ALWAYS_REPLACE,TWO_TIER))
+
+        self._size        = size
+        self._replacement = replacement
+        self._ways        = 2 if replacement == TWO_TIER else 1
+
+        # Buckets are a power of two so the bucket of a key is the top bits
+        # of a multiplicative hash, which spreads the very regular grid
+        # hashes over the whole table.
+        buckets = 1
+        while buckets * 2 <= size // self._ways:
+            buckets *= 2
+
+        self._buckets = buckets
+        self._shift   = 64 - (buckets.bit_length() - 1)
+
+        self.allocate()
+        self.reset_statistics()
+
+    def __len__(self):
+        return len(self._slots) - self._slots.count(None)
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def replacement(self):
+        return self._replacement
+
+    def allocate(self):
+        self._slots = [None] * (self._buckets * self._ways)
+
+    def index(self,key):
+        mixed = ((key ^ (key >> 32)) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        return (mixed >> self._shift) * self._ways
+
+    def probe(self,key):
+
+        index = self.index(key)
+
+        for entry in self._slots[index:index+self._ways]:
+            if entry is not None and entry.key == key:
+                self._hits += 1
+                return entry
+
+        if self._slots[index] is not None:
+            self._collisions += 1
+
+        self._misses += 1
+        return None
+
+    def store(self,key,score,depth,bound,move=None):
+
+        index = self.index(key)
+        entry = TranspositionEntry(key,score,depth,bound,move)
+        current = self._slots[index]
+
+        self._stores += 1
+
+        if current is None or current.key == key:
+            self._slots[index] = entry
+
+        elif self._replacement == ALWAYS_REPLACE or depth >= current.depth:
+            self._slots[index] = entry
+
+            if self._replacement == TWO_TIER:
+                # The deep entry being pushed out still gets a second chance
+                # in the always-replace slot of the bucket.
+                entry, index = current, index + 1
+                current = self._slots[index]
+                self._slots[index] = entry
+
+            if current is not None and current.key != entry.key:
+                self._overwrites += 1
+
+        elif self._replacement == TWO_TIER:
+            if self._slots[index+1] is not None and self._slots[index+1].key != key:
+                self._overwrites += 1
+
+            self._slots[index+1] = entry
+
+        else:
+            self._rejected += 1
+
+    def clear(self):
+        self.allocate()
+
+    def reset_statistics(self):
+
+        self._hits       = 0
+        self._misses     = 0
+        self._collisions = 0
+        self._stores     = 0
+        self._overwrites = 0
+        self._rejected   = 0
+
+    def statistics(self):
+
+        probes = self._hits + self._misses
+
+        return {
+            'size'       : self._size,
+            'entries'    : len(self),
+            'hits'       : self._hits,
+            'misses'     : self._misses,
+            'collisions' : self._collisions,
+            'stores'     : self._stores,
+            'overwrites' : self._overwrites,
+            'rejected'   : self._rejected,
+            'hit_rate'   : float(self._hits) / probes if probes else 0.0
+        }
+
+
+def pack_shared_data(score,depth,bound,move):
+
+    # score (16 bits, offset to be unsigned) | depth (8) | bound (8) |
+    # move cell (8) | move player (8) | move game mode (8) | valid flag (8)
+    data = (score + 0x8000) | (depth << 16) | (bound << 24) | (1 << 56)
+
+    if move is not None:
+        data |= (move.number << 32) | (move.player << 40) | (move.MODE << 48)
+
+    return data
+
+def unpack_shared_data(key,data):
+
+    number = (data >> 32) & 0xFF
+    move = MOVE_KLASSES[(data >> 48) & 0xFF](number=number,player=(data >> 40) & 0xFF) \
+           if number else None
+
+    return TranspositionEntry(key,
+                              (data & 0xFFFF) - 0x8000,
+                              (data >> 16) & 0xFF,
+                              (data >> 24) & 0xFF,
+                              move)
+
+
+class SharedTranspositionTable(TranspositionTable):
+
+    """
+        A `TranspositionTable` whose entries live in shared memory, so every
+        process searching with it reads and writes the same entries without
+        pickling them.
+
+        The memory is an anonymous `mmap` by default, which is shared with
+        the processes forked after the table is created, like the workers of
+        a `multiprocessing.Pool`. With a **path** it is a memory-mapped file
+        instead, so unrelated processes can open the same table.
+
+        Every entry is 3 little-endian uint64 words: the low 64 bits of the
+        key, the high 64 bits of the key and the packed data. Both key words
+        are stored XOR'd with the data, so an entry torn by 2 processes
+        writing it at the same time fails the key check and reads as a miss
+        instead of a wrong result. There are no locks.
+
+        Keys are limited to 128 bits, scores to 16 bits and depths to 255.
+        Statistics are counted per process.
+    """
+
+    def __init__(self,size=1 << 16,replacement=DEPTH_PREFERRED,path=None):
+
+        self._path = path
+        super(SharedTranspositionTable, self).__init__(size=size,replacement=replacement)
+
+    def __len__(self):
+
+        total = 0
+        for index in xrange(0, self._buckets * self._ways, 1):
+            if self.read(index) is not None:
+                total += 1
+
+        return total
+
+    @property
+    def path(self):
+        return self._path
+
+    def allocate(self):
+
+        length = self._buckets * self._ways * SHARED_ENTRY.size
+
+        if self._path is None:
+            self._map = mmap.mmap(-1, length)
+            return
+
+        with open(self._path, 'a+b') as f:
+            if os.fstat(f.fileno()).st_size != length:
+                f.truncate(length)
+
+            self._map = mmap.mmap(f.fileno(), length)
+
+    def close(self):
+        self._map.close()
+
+    def read(self,index):
+
+        low, high, data = SHARED_ENTRY.unpack_from(self._map, index * SHARED_ENTRY.size)
+        if not data:
+            return None
+
+        low, high = low ^ data, high ^ data
+        return (low | (high << 64)), data
+
+    def write(self,index,key,data):
+        SHARED_ENTRY.pack_into(self._map, index * SHARED_ENTRY.size,
+                               (key & 0xFFFFFFFFFFFFFFFF) ^ data, (key >> 64) ^ data, data)
+
+    def probe(self,key):
+
+        index = self.index(key)
+
+        for slot in xrange(index, index + self._ways, 1):
+            stored = self.read(slot)
+
+            if stored is not None and stored[0] == key:
+                self._hits += 1
+                return unpack_shared_data(key,stored[1])
+
+        if self.read(index) is not None:
+            self._collisions += 1
+
+        self._misses += 1
+        return None
+
+    def store(self,key,score,depth,bound,move=None):
+
+        if key >> SHARED_KEY_BITS or not 0 <= depth <= 0xFF:
+            raise TicTacToeException(
+                'Key:{} or depth:{} does not fit in a shared table entry, keys can ' \
+                'have up to {} bits and depths go up to 255'.format(key,depth,SHARED_KEY_BITS))
+
+        index = self.index(key)
+        data = pack_shared_data(score,depth,bound,move)
+        current = self.read(index)
+
+        self._stores += 1
+
+        if current is None or current[0] == key:
+            self.write(index,key,data)
+
+        elif self._replacement == ALWAYS_REPLACE or depth >= (current[1] >> 16) & 0xFF:
+            self.write(index,key,data)
+
+            if self._replacement == TWO_TIER:
+                # Same second chance for the evicted deep entry as in
+                # TranspositionTable.store.
+                key, data = current
+                index += 1
+                current = self.read(index)
+                self.write(index,key,data)
+
+            if current is not None and current[0] != key:
+                self._overwrites += 1
+
+        elif self._replacement == TWO_TIER:
+            second = self.read(index+1)
+            if second is not None and second[0] != key:
+                self._overwrites += 1
+
+            self.write(index+1,key,data)
+
+        else:
+            self._rejected += 1
+
+    def clear(self):
+        self._map.seek(0)
+        self._map.write('\x00' * len(self._map))
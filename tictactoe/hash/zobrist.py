@@ -0,0 +1,84 @@
+"""
+Zobrist keys of a Tic Tac Toe grid.
+===
+
+A `Grid` hash grows with the size of the grid: 27 bits for a `Grid`, 48 bits
+for a `Grid4` and 75 bits for a `Grid5`, which is past a native int. A
+Zobrist key is a 64-bit alternative. Every (cell, player) pair of a game
+mode gets a random 64-bit number from a seeded generator, so the keys are
+the same in every process, and the key of a position is the XOR of the
+numbers of its marked cells.
+
+Making or unmaking a move XORs the number of that one cell, so the key of the
+next position comes for free from the key of the current one:
+
+    #!python
+    key = zobrist_key(hash=grid.hash,mode=grid.MODE)
+    key ^= zobrist_move_key(number=move.number,player=move.player,mode=grid.MODE)
+    assert key == grid.apply_move(move).zobrist
+
+Different positions can share a key, but with 64 bits it takes billions of
+positions for that to be likely.
+
+"""
+
+import random
+
+from tictactoe.cache        import ModeTable
+from tictactoe.compute      import grid_hash_to_bitboards
+from tictactoe.settings     import GAME_MODES, MODES, PLAYER_1, PLAYER_2, TTT_3_IN_A_ROW
+from tictactoe.verification import verify_game_mode
+
+
+ZOBRIST_SEED = 0x5A0B
+
+ZOBRIST_BITS = 64
+
+
+def create_zobrist_table(mode=TTT_3_IN_A_ROW):
+
+    """
+        Returns the random number of every (cell, player) pair of **mode** as
+        a flat tuple indexed by `number * 3 + player`. Free cells are always
+        0, so they never change a key.
+    """
+
+    verify_game_mode(game_mode=mode)
+
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+    generator = random.Random(ZOBRIST_SEED + mode)
+
+    table = [0] * ((cells + 1) * 3)
+    for number in xrange(1, cells + 1, 1):
+        for player in (PLAYER_1, PLAYER_2):
+            table[(number * 3) + player] = generator.getrandbits(ZOBRIST_BITS)
+
+    return tuple(table)
+
+
+ZOBRIST_TABLE = ModeTable(builder=create_zobrist_table)
+
+
+def zobrist_move_key(number,player,mode=TTT_3_IN_A_ROW):
+    return ZOBRIST_TABLE[mode][(number * 3) + player]
+
+def zobrist_key(hash,mode=TTT_3_IN_A_ROW):
+
+    """
+        Computes the Zobrist key of the grid **hash** of **mode** from
+        scratch.
+    """
+
+    table = ZOBRIST_TABLE[mode]
+    key = 0
+
+    for player, bitboard in zip((PLAYER_1, PLAYER_2), grid_hash_to_bitboards(hash=hash,mode=mode)):
+        number = 1
+        while bitboard:
+            if bitboard & 1:
+                key ^= table[(number * 3) + player]
+
+            bitboard >>= 1
+            number += 1
+
+    return key
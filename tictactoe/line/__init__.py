@@ -3,7 +3,6 @@ from itertools import  combinations_with_replacement
 
 from rome import Roman
 
-from tictactoe.compute      import player_combinations
 from tictactoe.errors       import TicTacToeException
 from tictactoe.settings     import (FREE_SPACE, PLAYER_1, PLAYER_2, PLAYERS ,
                                    TTT_3_IN_A_ROW, MODES, GAME_MODES, MARKS)
@@ -37,22 +36,14 @@ def generate_combinations(players_to_combine,length):
         verify_player(player=p)
 
 
+    # Every pattern is a different multiset of players, so each one maps to
+    # its own player counts and there is nothing to de-duplicate.
     combinations = []
 
     for pattern in combinations_with_replacement(players_to_combine,length):
-        pattern_combinations = player_combinations(
-                                             player_0 = pattern.count(FREE_SPACE),
-                                             player_1 = pattern.count(PLAYER_1) ,
-                                             player_2 = pattern.count(PLAYER_2)
-                                             )
-
-        for combination in pattern_combinations:
-            p = [combination.count(FREE_SPACE),
-                 combination.count(PLAYER_1) ,
-                 combination.count(PLAYER_2)]
-
-            if p not in combinations:
-                combinations.append(p)
+        combinations.append([pattern.count(FREE_SPACE),
+                             pattern.count(PLAYER_1),
+                             pattern.count(PLAYER_2)])
 
     return combinations
 
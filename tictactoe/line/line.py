@@ -1,11 +1,35 @@
+"""
+Line is a row, column or diagonal of a Grid.
+===
 
-from itertools import ifilterfalse
+A `Line` is classified with a single lookup. Its cells are read as the digits
+of a base 3 number, the first cell being the least significant digit and
+every digit being the player on the cell:
 
+    #!python
+    #|x|o|-| on a 3x3 Grid is 1 + (2 * 3) + (0 * 9) = 7
+    state, event, extra_event = LINE_PATTERN_TABLE[TTT_3_IN_A_ROW][7]
+
+`LINE_PATTERN_TABLE` has an entry for every possible pattern of every game
+mode, that is 3 ** n entries for lines of n cells, with the `LineState` of the
+line plus its line event and its extra line event from `tictactoe.events`.
+
+"""
+
+from itertools import ifilterfalse, product
+
+from tictactoe.cache          import ModeTable
+from tictactoe.compute        import compute_line_event
 from tictactoe.errors         import TicTacToeLineException
 from tictactoe.hash.grid      import Grid, Grid4, Grid5
 from tictactoe.line.generator import LineStateGenerator
-from tictactoe.settings       import (GAME_MODES, MODES, TTT_3_IN_A_ROW, TTT_4_IN_A_ROW,
-                                      TTT_5_IN_A_ROW)
+from tictactoe.settings       import (FREE_SPACE, PLAYER_1, PLAYER_2, GAME_MODES, MODES,
+                                      TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
+
+
+# A cell hash has a single bit set, at the offset of its player, so the
+# 3 bits of a cell are turned into its base 3 digit with a single index.
+CELL_DIGITS = (None, FREE_SPACE, PLAYER_1, None, PLAYER_2)
 
 
 class Line(object):
@@ -18,11 +42,7 @@ class Line(object):
         TTT_5_IN_A_ROW : LineStateGenerator(game_mode=TTT_5_IN_A_ROW)
     }
 
-    STATES = {
-        TTT_3_IN_A_ROW : GENERATORS[TTT_3_IN_A_ROW].all_states(),
-        TTT_4_IN_A_ROW : GENERATORS[TTT_4_IN_A_ROW].all_states(),
-        TTT_5_IN_A_ROW : GENERATORS[TTT_5_IN_A_ROW].all_states()
-    }
+    STATES = ModeTable(builder=lambda mode : Line.GENERATORS[mode].all_states(),name='line_states')
 
     GRIDS  = {
         Grid   : MODE_KEY(game_mode=TTT_3_IN_A_ROW),
@@ -40,6 +60,8 @@ class Line(object):
         self._grid = grid
         self._indexes = indexes
         self.verify_indexes()
+        self._mask = sum([7 << (i * 3) for i in self._indexes])
+        self._digits = tuple((i * 3, 3 ** n) for n, i in enumerate(self._indexes))
 
     @property
     def grid(self):
@@ -74,5 +96,44 @@ class Line(object):
 
 
     def hash(self):
-        return sum([self.grid[i+1].hash for i in self.indexes()])
+        return self.grid.hash & self._mask
+
+    def pattern(self):
+        """
+            The cells of the line as a base 3 number, see `LINE_PATTERN_TABLE`.
+        """
+        hash = self.grid.hash
+        return sum([CELL_DIGITS[(hash >> shift) & 7] * weight for shift, weight in self._digits])
+
+    def state(self):
+        return LINE_PATTERN_TABLE[self.grid.MODE][self.pattern()][0]
+
+    def event(self,extra=False):
+        return LINE_PATTERN_TABLE[self.grid.MODE][self.pattern()][2 if extra else 1]
+
+
+def create_line_pattern_table(mode=TTT_3_IN_A_ROW):
+
+    length = MODES[GAME_MODES[mode]['LINE']]['length']
+    states = dict([((s.player_1, s.player_2), s) for s in Line.STATES[mode]])
+
+    table = []
+
+    # product() yields the digits of every pattern most significant first,
+    # that is the cells in reverse, which has no effect on the counts.
+    for digits in product((FREE_SPACE, PLAYER_1, PLAYER_2), repeat=length):
+        player_1, player_2 = digits.count(PLAYER_1), digits.count(PLAYER_2)
+
+        if (player_1, player_2) not in states:
+            raise TicTacToeLineException(
+                'There is no LineState for {} Player 1 and {} Player 2 marks ' \
+                'in game mode {}'.format(player_1,player_2,mode))
+
+        table.append((states[(player_1, player_2)],
+                      compute_line_event(player_1,player_2,length),
+                      compute_line_event(player_1,player_2,length,extra=True)))
+
+    return tuple(table)
+
 
+LINE_PATTERN_TABLE = ModeTable(builder=create_line_pattern_table)
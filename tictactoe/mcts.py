@@ -0,0 +1,415 @@
+"""
+MonteCarloEngine searches a Grid with Monte Carlo Tree Search.
+===
+
+A 5x5 game is far too big for `Engine` to search to the end. A
+`MonteCarloEngine` grows a tree of the most promising moves instead and
+scores every new node by playing the rest of the game at random, choosing
+where to look next with the UCT formula:
+
+    wins / visits + exploration * sqrt(ln(parent visits) / visits)
+
+Playouts never create a `Grid` or a `Move`. They play on the 2 `BitBoard`
+masks of the position as plain integers, and only check the win lines that
+go through the cell that was just marked.
+
+A search is bounded by a number of iterations, a time budget or both. The
+tree is kept between searches, so when the next search starts from a
+position already in the tree, because the engine and its opponent played
+the moves it searched, all the playouts below it are reused:
+
+    #!python
+    engine = MonteCarloEngine(max_time=0.5)
+    result = engine.search(grid=grid)
+    grid = grid.apply_move(result.move)
+    grid = grid.apply_move(opponent_move)
+    result = engine.search(grid=grid) # Starts from the subtree of both moves
+    print(result.playouts_per_second)
+
+"""
+
+import math
+import random
+import time
+
+from tictactoe.cache        import ModeTable
+from tictactoe.compute      import WIN_LINE_MASKS, get_cell_lines, grid_hash_to_bitboards
+from tictactoe.errors       import TicTacToeEngineException
+from tictactoe.hash.grid    import Grid
+from tictactoe.settings     import FREE_SPACE, PLAYER_1, PLAYER_2, GAME_MODES, MODES
+
+
+DEFAULT_EXPLORATION = math.sqrt(2)
+
+DRAW_REWARD = 0.5
+
+TIME_CHECK_INTERVAL = 16
+
+# Deepest the tree is searched for the position of a new search, that is
+# the engine's own move plus the reply of its opponent.
+REUSE_DEPTH = 2
+
+
+def create_cell_win_masks(mode):
+    masks = WIN_LINE_MASKS[mode]
+    return tuple(tuple(masks[l] for l in lines) for lines in get_cell_lines(mode=mode))
+
+
+CELL_WIN_MASKS = ModeTable(builder=create_cell_win_masks)
+
+
+def other_player(player):
+    return PLAYER_2 if player == PLAYER_1 else PLAYER_1
+
+
+class MonteCarloNode(object):
+
+    """
+        A position of the tree. **player** is the player that made the move
+        on **cell** to reach it, so **wins** are counted for that player.
+    """
+
+    __slots__ = ('player_1', 'player_2', 'player', 'cell', 'parent', 'children',
+                 'untried', 'visits', 'wins', 'winner', 'terminal')
+
+    def __init__(self,player_1,player_2,player,cell=None,parent=None,winner=FREE_SPACE,
+                 terminal=False,cells=9):
+
+        self.player_1 = player_1
+        self.player_2 = player_2
+        self.player   = player
+        self.cell     = cell
+        self.parent   = parent
+        self.children = []
+        self.visits   = 0
+        self.wins     = 0.0
+        self.winner   = winner
+        self.terminal = terminal
+
+        taken = player_1 | player_2
+        self.untried = [] if terminal else [c for c in xrange(0, cells, 1) if not taken & (1 << c)]
+
+    def child(self,cell):
+        for child in self.children:
+            if child.cell == cell:
+                return child
+
+        return None
+
+
+class MonteCarloResult(object):
+
+    def __init__(self,move,visits,win_rate,iterations,playouts,elapsed,tree_size,reused):
+
+        self._move       = move
+        self._visits     = visits
+        self._win_rate   = win_rate
+        self._iterations = iterations
+        self._playouts   = playouts
+        self._elapsed    = elapsed
+        self._tree_size  = tree_size
+        self._reused     = reused
+
+    def __repr__(self):
+        return 'MonteCarloResult(move={},visits={},win_rate={:.3f},iterations={},' \
+               'playouts={},elapsed={:.4f},reused={})'.format(self.move,
+                                                              self.visits,
+                                                              self.win_rate,
+                                                              self.iterations,
+                                                              self.playouts,
+                                                              self.elapsed,
+                                                              self.reused)
+
+    @property
+    def move(self):
+        return self._move
+
+    @property
+    def visits(self):
+        """
+            How many times the chosen move was visited.
+        """
+        return self._visits
+
+    @property
+    def win_rate(self):
+        """
+            Share of the playouts through the chosen move won by the player
+            making it, with draws counting as half a win.
+        """
+        return self._win_rate
+
+    @property
+    def iterations(self):
+        return self._iterations
+
+    @property
+    def playouts(self):
+        return self._playouts
+
+    @property
+    def elapsed(self):
+        return self._elapsed
+
+    @property
+    def tree_size(self):
+        return self._tree_size
+
+    @property
+    def reused(self):
+        """
+            Visits of the root that came from previous searches.
+        """
+        return self._reused
+
+    @property
+    def playouts_per_second(self):
+        return self._playouts / self._elapsed if self._elapsed > 0 else float(self._playouts)
+
+
+class MonteCarloEngine(object):
+
+    def __init__(self,max_iterations=None,max_time=None,exploration=DEFAULT_EXPLORATION,seed=None):
+
+        if max_iterations is None and max_time is None:
+            raise TicTacToeEngineException(
+                'MonteCarloEngine needs max_iterations, max_time or both to know when to stop')
+
+        for name, value in (('max_iterations',max_iterations),('max_time',max_time)):
+            if value is not None and value <= 0:
+                raise TicTacToeEngineException(
+                    '{} must be a positive number or None for no limit'.format(name))
+
+        self._max_iterations = max_iterations
+        self._max_time       = max_time
+        self._exploration    = exploration
+        self._random         = random.Random(seed)
+
+        self._root  = None
+        self._mode  = None
+        self._cells = None
+        self._masks = None
+
+        self._total_playouts = 0
+        self._total_elapsed  = 0.0
+        self._playouts       = 0
+
+    @property
+    def root(self):
+        return self._root
+
+    def statistics(self):
+        """
+            Playouts of every search since the engine was created.
+        """
+        return {
+            'playouts'            : self._total_playouts,
+            'elapsed'             : self._total_elapsed,
+            'playouts_per_second' : self._total_playouts / self._total_elapsed
+                                    if self._total_elapsed > 0 else float(self._total_playouts)
+        }
+
+    def reset(self):
+        """
+            Drops the tree, so the next search starts from scratch.
+        """
+        self._root = None
+
+    def advance(self,move):
+
+        """
+            Moves the root of the tree to the position after **move**,
+            keeping everything that was searched below it.
+        """
+
+        if self._root is None:
+            return
+
+        child = self._root.child(cell=move.number - 1)
+
+        if child is None or child.player != move.player:
+            self._root = None
+            return
+
+        child.parent = None
+        self._root   = child
+
+    def search(self,grid):
+
+        if not isinstance(grid,Grid):
+            raise TicTacToeEngineException(
+                'grid is not a valid Grid instance. Instead a {} ' \
+                'instance was passed.Cannot search Grid'.format(type(grid)))
+
+        started = time.time()
+        deadline = started + self._max_time if self._max_time is not None else None
+
+        root = self.find_root(grid=grid)
+        reused = root.visits
+
+        if root.terminal:
+            return MonteCarloResult(move=None,visits=0,win_rate=0.0,iterations=0,playouts=0,
+                                    elapsed=time.time() - started,tree_size=1,reused=reused)
+
+        iterations, self._playouts = 0, 0
+        while self._max_iterations is None or iterations < self._max_iterations:
+            if deadline is not None and iterations % TIME_CHECK_INTERVAL == 0 and iterations:
+                if time.time() >= deadline:
+                    break
+
+            self.iterate(root=root)
+            iterations += 1
+
+        elapsed = time.time() - started
+        self._total_playouts += self._playouts
+        self._total_elapsed  += elapsed
+
+        best = max(root.children, key=lambda c : (c.visits, c.wins))
+
+        return MonteCarloResult(move=grid.MOVE_KLASS(number=best.cell + 1,player=best.player),
+                                visits=best.visits,
+                                win_rate=best.wins / best.visits if best.visits else 0.0,
+                                iterations=iterations,
+                                playouts=self._playouts,
+                                elapsed=elapsed,
+                                tree_size=self.tree_size(node=root),
+                                reused=reused)
+
+    def find_root(self,grid):
+
+        player_1, player_2 = grid_hash_to_bitboards(hash=grid.hash,mode=grid.MODE,trusted=True)
+
+        if self._root is not None and self._mode == grid.MODE:
+            nodes = [self._root]
+
+            for _ in xrange(0, REUSE_DEPTH + 1, 1):
+                for node in nodes:
+                    if node.player_1 == player_1 and node.player_2 == player_2:
+                        node.parent = None
+                        self._root  = node
+                        return node
+
+                nodes = [c for node in nodes for c in node.children]
+
+        self._mode  = grid.MODE
+        self._cells = MODES[GAME_MODES[grid.MODE]['GRID_STATE']]['length']
+        self._masks = CELL_WIN_MASKS[grid.MODE]
+
+        last_player = PLAYER_2 if grid.total_taken_cells() % 2 == 0 else PLAYER_1
+        winner = grid.winner()
+
+        self._root = MonteCarloNode(player_1=player_1,
+                                    player_2=player_2,
+                                    player=last_player,
+                                    winner=winner,
+                                    terminal=winner != FREE_SPACE or grid.total_free_cells() == 0,
+                                    cells=self._cells)
+        return self._root
+
+    def iterate(self,root):
+
+        node = root
+
+        # Selection: follow the best UCT child until a node still has
+        # moves that have never been tried.
+        while not node.untried and node.children:
+            node = self.select(node=node)
+
+        # Expansion
+        if node.untried:
+            cell = node.untried.pop(self._random.randrange(len(node.untried)))
+            node = self.expand(node=node,cell=cell)
+
+        # Simulation
+        if node.terminal:
+            winner = node.winner
+        else:
+            winner = self.playout(player_1=node.player_1,
+                                  player_2=node.player_2,
+                                  player=other_player(node.player))
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+
+            if winner == node.player:
+                node.wins += 1
+            elif winner == FREE_SPACE:
+                node.wins += DRAW_REWARD
+
+            node = node.parent
+
+    def select(self,node):
+
+        log_visits  = math.log(node.visits)
+        exploration = self._exploration
+
+        best, best_value = None, None
+        for child in node.children:
+            value = (child.wins / child.visits) + exploration * math.sqrt(log_visits / child.visits)
+
+            if best_value is None or value > best_value:
+                best, best_value = child, value
+
+        return best
+
+    def expand(self,node,cell):
+
+        player = other_player(node.player)
+        bit = 1 << cell
+        player_1 = node.player_1 | bit if player == PLAYER_1 else node.player_1
+        player_2 = node.player_2 | bit if player == PLAYER_2 else node.player_2
+
+        marks = player_1 if player == PLAYER_1 else player_2
+        won = any([marks & m == m for m in self._masks[cell]])
+
+        child = MonteCarloNode(player_1=player_1,
+                               player_2=player_2,
+                               player=player,
+                               cell=cell,
+                               parent=node,
+                               winner=player if won else FREE_SPACE,
+                               terminal=won or (player_1 | player_2) == (1 << self._cells) - 1,
+                               cells=self._cells)
+
+        node.children.append(child)
+        return child
+
+    def playout(self,player_1,player_2,player):
+
+        """
+            Plays random moves from the position until someone wins or the
+            grid is full, and returns the winner or **FREE_SPACE** for a draw.
+            **player** has to move first.
+        """
+
+        self._playouts += 1
+
+        taken = player_1 | player_2
+        free  = [c for c in xrange(0, self._cells, 1) if not taken & (1 << c)]
+        self._random.shuffle(free)
+
+        masks  = self._masks
+        boards = {PLAYER_1 : player_1, PLAYER_2 : player_2}
+
+        for cell in free:
+            marks = boards[player] | (1 << cell)
+            boards[player] = marks
+
+            for mask in masks[cell]:
+                if marks & mask == mask:
+                    return player
+
+            player = PLAYER_2 if player == PLAYER_1 else PLAYER_1
+
+        return FREE_SPACE
+
+    def tree_size(self,node):
+
+        total, nodes = 0, [node]
+        while nodes:
+            node = nodes.pop()
+            total += 1
+            nodes.extend(node.children)
+
+        return total
@@ -0,0 +1,205 @@
+"""
+MoveOrdering decides which moves a search tries first.
+===
+
+Alpha-beta only prunes when the best move is searched early, and
+`GridState.get_free_cells()` hands moves out in plain cell number order. A
+`MoveOrdering` sorts them with 3 tables, all keyed by cell number and
+player:
+
+* **Static prior** : cells on more win lines come first, then the ones
+                     closest to the center. Built once per game mode from
+                     its win lines.
+* **Killer moves** : the last moves that caused a cutoff at every ply. A
+                     move refuting one position tends to refute its
+                     siblings too.
+* **History** : every cutoff adds `depth * depth` to the move that caused
+                it, so moves that keep refuting deep subtrees anywhere in
+                the tree rise to the top.
+
+It works with any search over `Grid` moves, which only has to ask it for
+the order of the moves and tell it about the cutoffs:
+
+    #!python
+    ordering = MoveOrdering(mode=TTT_4_IN_A_ROW)
+    for move in ordering.order_moves(grid=grid,player=player,ply=ply,first=table_move):
+        ...
+        if alpha >= beta:
+            ordering.cutoff(move=move,depth=depth,ply=ply)
+            break
+
+or plugged into an `Engine`:
+
+    #!python
+    engine = Engine(max_depth=6,ordering=MoveOrdering(mode=TTT_5_IN_A_ROW))
+
+"""
+
+from tictactoe.cache        import ModeTable
+from tictactoe.compute      import get_cell_lines
+from tictactoe.errors       import TicTacToeException
+from tictactoe.settings     import FREE_SPACE, PLAYER_1, PLAYER_2, TTT_3_IN_A_ROW
+from tictactoe.verification import verify_game_mode
+
+
+KILLER_SLOTS = 2
+
+MAX_KILLER_PLY = 100
+
+# The center distance only breaks ties between cells on the same number of
+# win lines, it is never larger than this on a 5x5 grid.
+LINE_PRIOR = 256
+
+
+def create_cell_priors(mode=TTT_3_IN_A_ROW):
+
+    """
+        Number of win lines through every cell, indexed by cell number - 1.
+    """
+
+    return tuple(len(lines) for lines in get_cell_lines(mode=mode))
+
+def create_static_priors(mode=TTT_3_IN_A_ROW):
+
+    """
+        Static prior of every cell, indexed by cell number - 1: its number of
+        win lines times `LINE_PRIOR`, minus its squared distance to the
+        center, in half cells so it stays an integer.
+    """
+
+    lines = get_cell_lines(mode=mode)
+    side = int(round(len(lines) ** 0.5))
+
+    priors = []
+    for cell, cell_lines in enumerate(lines):
+        row, column = divmod(cell, side)
+        distance = ((2 * row) - (side - 1)) ** 2 + ((2 * column) - (side - 1)) ** 2
+        priors.append((len(cell_lines) * LINE_PRIOR) - distance)
+
+    return tuple(priors)
+
+
+CELL_PRIORS = ModeTable(builder=create_cell_priors)
+
+STATIC_PRIORS = ModeTable(builder=create_static_priors)
+
+
+class MoveOrdering(object):
+
+    def __init__(self,mode=TTT_3_IN_A_ROW,killers=KILLER_SLOTS,history=True,priors=True):
+
+        verify_game_mode(game_mode=mode)
+
+        if killers < 0:
+            raise TicTacToeException(
+                'killers must be the number of killer moves kept per ply, 0 ' \
+                'for none. Instead :{} was passed'.format(killers))
+
+        self._mode    = mode
+        self._slots   = killers
+        self._history = history
+        self._priors  = STATIC_PRIORS[mode] if priors else (0,) * len(CELL_PRIORS[mode])
+
+        self.clear()
+
+    @property
+    def mode(self):
+        return self._mode
+
+    def clear(self):
+
+        """
+            Forgets every killer move and the whole history.
+        """
+
+        cells = len(self._priors)
+
+        self._killers = [[] for _ in xrange(0, MAX_KILLER_PLY + 1, 1)]
+        self._scores  = {
+            PLAYER_1 : [0] * (cells + 1),
+            PLAYER_2 : [0] * (cells + 1)
+        }
+
+    def new_search(self):
+
+        """
+            Gets ready for a new search: killer moves only make sense for the
+            tree they were found in, while the history is halved so it still
+            helps but gives way to the new cutoffs.
+        """
+
+        self._killers = [[] for _ in xrange(0, MAX_KILLER_PLY + 1, 1)]
+
+        for scores in self._scores.values():
+            for number in xrange(0, len(scores), 1):
+                scores[number] >>= 1
+
+    def killers(self,ply):
+        """
+            The killer moves of **ply** as (cell number, player) pairs, the
+            most recent first.
+        """
+        return tuple(self._killers[ply]) if ply <= MAX_KILLER_PLY else ()
+
+    def history(self,number,player):
+        return self._scores[player][number]
+
+    def cutoff(self,move,depth,ply):
+
+        """
+            Records that **move** caused a beta cutoff with **depth** plies
+            left to search at **ply**.
+        """
+
+        key = (move.number, move.player)
+
+        if self._slots and ply <= MAX_KILLER_PLY:
+            killers = self._killers[ply]
+
+            if key in killers:
+                killers.remove(key)
+
+            killers.insert(0, key)
+            del killers[self._slots:]
+
+        if self._history:
+            self._scores[move.player][move.number] += depth * depth
+
+    def order_cells(self,numbers,player,ply=0):
+
+        """
+            Sorts the free cell **numbers** for **player** to move at **ply**:
+            killer moves first, then by history and static prior, then by
+            cell number.
+        """
+
+        scores, priors = self._scores[player], self._priors
+        ordered = sorted(numbers, key=lambda n : (-scores[n], -priors[n-1], n))
+
+        if self._slots and ply <= MAX_KILLER_PLY:
+            killers = [n for n, p in self._killers[ply] if p == player and n in ordered]
+
+            for number in reversed(killers):
+                ordered.remove(number)
+                ordered.insert(0, number)
+
+        return ordered
+
+    def order_moves(self,grid,player,ply=0,first=None):
+
+        """
+            Returns the moves of **player** on every free cell of **grid**,
+            best first. **first**, usually the move of a transposition table,
+            goes ahead of everything else.
+        """
+
+        numbers = self.order_cells(numbers=[c.number for c in grid.cells_taken(FREE_SPACE)],
+                                   player=player,
+                                   ply=ply)
+        moves = [grid.MOVE_KLASS(number=n,player=player) for n in numbers]
+
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+
+        return moves
@@ -0,0 +1,304 @@
+"""
+ParallelSearch spreads a search over a pool of processes.
+===
+
+`Engine` and `MonteCarloEngine` only ever use one core. A `ParallelSearch`
+runs them on a `multiprocessing` pool of **workers** in 2 ways:
+
+* `search` splits the moves of the root, from `Grid.cells_taken(FREE_SPACE)`,
+  between the workers. Every worker searches the grid after its move with
+  its own `Engine` and transposition table, and the best move is picked from
+  all of them.
+* `search_monte_carlo` runs an independent `MonteCarloEngine` tree in every
+  worker, each with its own seed, and adds up the visits and wins of the
+  moves of the root of every tree.
+
+With **shared** set, the workers of `search` also share a single
+`SharedTranspositionTable`, so a position searched by one of them is not
+searched again by the others.
+
+**max_nodes** is the budget of the whole search, not of every worker. It is
+split between the root moves, the first ones in move order getting the
+remainder. Every root move is first scored by looking at the grid after it,
+which takes one node, so every move has a score even when its search runs
+out of budget. Those searches fall back to that score and the result is
+marked incomplete.
+
+Merging is deterministic. Root moves are searched in the order of
+`Engine.order_moves` and ties go to the first one, while Monte Carlo moves
+are ranked by total visits, then total wins, then cell number. With
+iteration and node limits, instead of time limits, the same search always
+returns the same move.
+
+    #!python
+    parallel = ParallelSearch(workers=8,max_depth=6)
+    result = parallel.search(grid=grid)
+    result = parallel.search_monte_carlo(grid=grid,iterations=80000)
+    parallel.close()
+
+"""
+
+import multiprocessing
+import time
+
+from tictactoe.engine             import (Engine, SearchResult, INFINITY, player_to_move,
+                                          score_from_table)
+from tictactoe.errors             import TicTacToeEngineException
+from tictactoe.evaluation         import Evaluator
+from tictactoe.hash.grid          import Grid, apply_trusted_move, create_trusted_grid
+from tictactoe.hash.transposition import TranspositionTable, SharedTranspositionTable
+from tictactoe.mcts               import DEFAULT_EXPLORATION, MonteCarloEngine, MonteCarloResult
+from tictactoe.settings           import FREE_SPACE
+from tictactoe.tablebase          import GRID_KLASSES
+
+
+# Workers find the shared transposition table of their search here. It is
+# set right before the pool forks them, so they inherit its memory map.
+SHARED_TABLE = {
+    'table' : None
+}
+
+
+def split_budget(total,parts):
+
+    """
+        Splits **total** nodes into **parts** budgets that add up to it, the
+        first ones one node larger when it does not split evenly.
+    """
+
+    share, remainder = divmod(total, parts)
+    return [share + (n < remainder) for n in xrange(0, parts, 1)]
+
+def search_root_move(task):
+
+    """
+        Searches the grid after one root move in a worker. Returns the score
+        of the move for the player making it, whether it was searched to the
+        full depth, and the number of nodes searched. Every move is scored by
+        looking at the grid after it first, so a search that runs out of
+        budget still has that score to fall back to.
+    """
+
+    mode, hash, number, player, options = task
+
+    # The grid and its root moves come from a grid the parent process
+    # already checked.
+    grid  = create_trusted_grid(grid_cls=GRID_KLASSES[mode],hash=hash)
+    child = apply_trusted_move(grid=grid,move=grid.MOVE_KLASS(number=number,player=player))
+
+    if options['shared']:
+        table = SHARED_TABLE['table']
+    else:
+        table = TranspositionTable(size=options['table_size']) if options['table_size'] else None
+
+    evaluator = Evaluator(mode=mode,weights=options['weights']) if options['evaluation'] else None
+
+    if evaluator is not None:
+        evaluator.reset(grid=child)
+
+    # The child is scored for the other player one ply deeper, which is
+    # exactly what a table score looks like to its parent.
+    scorer = Engine(evaluator=evaluator)
+    score  = score_from_table(-scorer.negamax(grid=child,depth=0,alpha=-INFINITY,beta=INFINITY,ply=0),1)
+
+    # A depth of 1 at the root leaves nothing to search below the move, and
+    # a grid that is over has nothing to search at all.
+    if options['max_depth'] == 0 or child.winner() != FREE_SPACE or child.total_free_cells() == 0:
+        return score, True, scorer.nodes
+
+    budget = options['max_nodes'] - scorer.nodes if options['max_nodes'] is not None else None
+    if budget is not None and budget < 1:
+        return score, False, scorer.nodes
+
+    engine = Engine(max_nodes=budget,
+                    max_time=options['max_time'],
+                    max_depth=options['max_depth'] or None,
+                    table=table,
+                    evaluator=evaluator)
+
+    result = engine.search(grid=child)
+
+    # The node that ran past the budget is counted by the engine but never
+    # searched.
+    if not result.complete:
+        return score, False, scorer.nodes + min(result.nodes, budget or result.nodes)
+
+    return score_from_table(-result.score,1), True, scorer.nodes + result.nodes
+
+def search_monte_carlo_tree(task):
+
+    """
+        Runs one Monte Carlo tree in a worker and returns the visits and wins
+        of every root move, with the iterations and playouts it ran.
+    """
+
+    mode, hash, seed, options = task
+
+    engine = MonteCarloEngine(max_iterations=options['iterations'],
+                              max_time=options['max_time'],
+                              exploration=options['exploration'],
+                              seed=seed)
+    result = engine.search(grid=create_trusted_grid(grid_cls=GRID_KLASSES[mode],hash=hash))
+
+    moves = dict([(c.cell + 1, (c.visits, c.wins)) for c in engine.root.children])
+
+    return moves, result.iterations, result.playouts, result.tree_size
+
+
+class ParallelSearch(object):
+
+    def __init__(self,workers=None,max_depth=None,max_nodes=None,max_time=None,
+                 table_size=1 << 16,evaluation=False,weights=None,shared=False):
+
+        if workers is not None and workers < 1:
+            raise TicTacToeEngineException(
+                'workers must be a positive number, or None for one worker per core')
+
+        self._workers = workers or multiprocessing.cpu_count()
+        self._pool    = None
+        self._table   = SharedTranspositionTable(size=table_size) if shared else None
+
+        self._options = {
+            'max_depth'  : max_depth,
+            'max_nodes'  : max_nodes,
+            'max_time'   : max_time,
+            'table_size' : table_size,
+            'evaluation' : evaluation,
+            'weights'    : weights,
+            'shared'     : shared
+        }
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @property
+    def table(self):
+        """
+            The `SharedTranspositionTable` of every worker, or None when each
+            worker searches with its own table.
+        """
+        return self._table
+
+    def map(self,function,tasks):
+
+        SHARED_TABLE['table'] = self._table
+
+        # A single worker searches in this process, which also makes it the
+        # baseline to measure the speedup of the pool against.
+        if self._workers == 1:
+            return map(function, tasks)
+
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(processes=self._workers)
+
+        return self._pool.map(function, tasks, chunksize=1)
+
+    def close(self):
+
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def verify_grid(self,grid):
+
+        if not isinstance(grid,Grid):
+            raise TicTacToeEngineException(
+                'grid is not a valid Grid instance. Instead a {} ' \
+                'instance was passed.Cannot search Grid'.format(type(grid)))
+
+        if grid.winner() != FREE_SPACE or grid.total_free_cells() == 0:
+            raise TicTacToeEngineException(
+                'The game on grid is over, there are no moves to search')
+
+    def search(self,grid):
+
+        """
+            Searches every root move of **grid** in parallel and returns a
+            `SearchResult` for the best one. Nodes are added up over all the
+            workers, never more than **max_nodes** in total unless there are
+            more root moves than that, and elapsed is the wall clock time.
+            Moves whose search ran out of budget keep the score of the grid
+            after them, and the result is marked incomplete.
+        """
+
+        self.verify_grid(grid=grid)
+        started = time.time()
+
+        options = dict(self._options)
+        if options['max_depth'] is not None:
+            options['max_depth'] = options['max_depth'] - 1
+
+        moves = Engine().order_moves(grid=grid)
+
+        # Every root move is scored with at least one node.
+        budgets = [options['max_nodes']] * len(moves)
+        if options['max_nodes'] is not None:
+            budgets = split_budget(total=max(options['max_nodes'], len(moves)),parts=len(moves))
+
+        tasks   = [(grid.MODE, grid.hash, m.number, m.player, dict(options,max_nodes=budget))
+                   for m, budget in zip(moves, budgets)]
+        results = self.map(search_root_move, tasks)
+
+        best_move, best_score, nodes, complete = None, None, 0, True
+
+        for move, (score, move_complete, move_nodes) in zip(moves, results):
+            nodes += move_nodes
+            complete = complete and move_complete
+
+            if best_score is None or score > best_score:
+                best_move, best_score = move, score
+
+        depth = grid.total_free_cells()
+        if self._options['max_depth'] is not None:
+            depth = min(depth, self._options['max_depth'])
+
+        return SearchResult(move=best_move,
+                            score=best_score,
+                            nodes=nodes,
+                            elapsed=time.time() - started,
+                            depth=depth,
+                            complete=complete)
+
+    def search_monte_carlo(self,grid,iterations=None,max_time=None,exploration=None,seed=0):
+
+        """
+            Runs one Monte Carlo tree per worker, with **iterations** split
+            evenly between them and worker **n** seeded with **seed** + n, and
+            returns a `MonteCarloResult` for the move with the most visits.
+        """
+
+        self.verify_grid(grid=grid)
+
+        if iterations is None and max_time is None:
+            raise TicTacToeEngineException(
+                'search_monte_carlo needs iterations, max_time or both to know when to stop')
+
+        started = time.time()
+
+        options = {
+            'iterations'  : -(-iterations // self._workers) if iterations is not None else None,
+            'max_time'    : max_time,
+            'exploration' : exploration if exploration is not None else DEFAULT_EXPLORATION
+        }
+
+        tasks   = [(grid.MODE, grid.hash, seed + n, options) for n in xrange(0, self._workers, 1)]
+        results = self.map(search_monte_carlo_tree, tasks)
+
+        totals = {}
+        for moves, _, _, _ in results:
+            for number, (visits, wins) in moves.items():
+                total_visits, total_wins = totals.get(number, (0, 0.0))
+                totals[number] = (total_visits + visits, total_wins + wins)
+
+        number = max(sorted(totals), key=lambda n : (totals[n][0], totals[n][1], -n))
+        visits, wins = totals[number]
+        return MonteCarloResult(move=grid.MOVE_KLASS(number=number,player=player_to_move(grid=grid)),
+                                visits=visits,
+                                win_rate=wins / visits if visits else 0.0,
+                                iterations=sum([r[1] for r in results]),
+                                playouts=sum([r[2] for r in results]),
+                                elapsed=time.time() - started,
+                                tree_size=sum([r[3] for r in results]),
+                                reused=0)
@@ -0,0 +1,620 @@
+"""
+Tablebases are solved positions stored on disk.
+===
+
+A 3x3 game only has 5,478 positions that can be reached by playing legal moves,
+and just 765 of them are different once rotations and reflections are taken
+into account. `write_tablebase` enumerates all of them, solves every one of them
+and writes a small binary file of sorted records:
+
+    canonical grid hash (uint32) | score (int16) | best move cell (uint8) | padding
+
+The score is from the point of view of the player that has to move, using the
+same scale as `tictactoe.engine`, and is relative to the position itself. That
+is, a win in 3 plies is `WIN_SCORE - 3`. The best move is given on the canonical
+grid and is 0 for positions that are already over.
+
+`Tablebase` memory-maps the file, so every process using the same file shares
+the same page-cached copy of it, and answers lookups with a binary search over
+the records without building any dictionary:
+
+    #!python
+    write_tablebase(path='ttt3.tb')
+    tablebase = Tablebase(path='ttt3.tb')
+    score, move = tablebase.probe(grid=grid)
+
+Bigger games can't be solved from the first move, but positions with only a
+few free cells left are cheap to solve. `write_endgame_tablebase` solves every
+position of a game mode with at most **max_free** free cells by retrograde
+analysis: the full grids are scored first, then every grid with one free cell
+from those, and so on. Each number of free cells gets its own file, made of
+chunks of records that share the same `GridState` occupancy:
+
+    chunk index : occupancy (uint32) | first record (uint32) | total records (uint32)
+    records     : Player 1 bitboard (uint32) | score (int16) | best move cell (uint8) | padding
+
+`EndgameTablebase` only memory-maps a file the first time a grid with that many
+free cells is probed, and answers with 2 binary searches, one over the chunk
+index and one over the records of the chunk.
+
+    #!python
+    write_endgame_tablebase(directory='tb',mode=TTT_4_IN_A_ROW,max_free=3)
+    tablebase = EndgameTablebase(directory='tb',mode=TTT_4_IN_A_ROW)
+    score, move = tablebase.probe(grid=grid)
+
+A layer is solved one chunk at a time and written to disk as it goes. The
+children of a chunk only live in the `occupancy | cell` chunks of the layer
+with one free cell less, so only those are read back from its file, and full
+grids are scored on the fly without a file of their own. Memory stays flat no
+matter the game mode, which makes 5x5 endgames with a few free cells
+buildable: 1 free cell takes a couple of minutes and a 450MB file, and every
+extra free cell multiplies both several times over.
+
+"""
+
+import mmap
+import os
+import struct
+import sys
+
+from array     import array
+from bisect    import bisect_left
+from itertools import combinations, islice
+
+from tictactoe.compute       import WIN_LINE_MASKS, grid_hash_to_bitboards
+from tictactoe.engine        import WIN_SCORE, DRAW_SCORE, player_to_move
+from tictactoe.errors        import TicTacToeException
+from tictactoe.hash.grid     import Grid, Grid4, Grid5, apply_trusted_move
+from tictactoe.hash.symmetry import IDENTITY, inverse_transform, transform_move
+from tictactoe.settings      import (FREE_SPACE, PLAYER_1, PLAYER_2, GAME_MODES, MODES,
+                                     TTT_3_IN_A_ROW, TTT_4_IN_A_ROW, TTT_5_IN_A_ROW)
+from tictactoe.verification  import verify_game_mode
+
+
+TABLEBASE_MAGIC   = 'TTTB'
+TABLEBASE_VERSION = 1
+
+ENDGAME_MAGIC = 'TTTE'
+
+HEADER = struct.Struct('<4sBBHI')
+RECORD = struct.Struct('<IhBx')
+KEY    = struct.Struct('<I')
+
+ENDGAME_HEADER = struct.Struct('<4sBBBxII')
+CHUNK          = struct.Struct('<III')
+
+# Records are packed and written this many at a time, a 5x5 chunk can
+# have millions of them.
+ENDGAME_WRITE_BATCH = 1 << 16
+
+GRID_KLASSES = {
+    TTT_3_IN_A_ROW : Grid,
+    TTT_4_IN_A_ROW : Grid4,
+    TTT_5_IN_A_ROW : Grid5
+}
+
+
+def back_up_score(score):
+
+    """
+        Turns the score of a child position into the score of its parent.
+        The sign flips because the other player is moving, and wins and
+        losses get one ply further away.
+    """
+
+    if score > DRAW_SCORE:
+        return -score + 1
+
+    if score < DRAW_SCORE:
+        return -score - 1
+
+    return DRAW_SCORE
+
+def enumerate_grids(grid=None):
+
+    """
+        Yields every grid that can be reached from **grid** by playing legal
+        moves, each one only once. Grids that are won are yielded but not
+        played any further.
+    """
+
+    stack = [grid if grid is not None else Grid()]
+    seen = set()
+
+    while stack:
+        grid = stack.pop()
+
+        if grid.hash in seen:
+            continue
+
+        seen.add(grid.hash)
+        yield grid
+
+        if grid.winner() != FREE_SPACE:
+            continue
+
+        player = player_to_move(grid=grid)
+        for cell in grid.cells_taken(FREE_SPACE):
+            stack.append(apply_trusted_move(grid=grid,move=grid.MOVE_KLASS(number=cell.number,player=player)))
+
+def solve_grids(grid=None):
+
+    """
+        Solves every grid reachable from **grid** and returns a dictionary of
+        canonical grid hash to a (score, best move cell) tuple.
+    """
+
+    solved = {}
+
+    def solve(grid):
+
+        key, transform = grid.canonical()
+        if key in solved:
+            return solved[key][0]
+
+        if grid.winner() != FREE_SPACE:
+            score, move = -WIN_SCORE, None
+
+        elif grid.total_free_cells() == 0:
+            score, move = DRAW_SCORE, None
+
+        else:
+            player = player_to_move(grid=grid)
+            score, move = None, None
+
+            for cell in grid.cells_taken(FREE_SPACE):
+                child_move  = grid.MOVE_KLASS(number=cell.number,player=player)
+                child_score = back_up_score(score=solve(apply_trusted_move(grid=grid,move=child_move)))
+
+                if score is None or child_score > score:
+                    score, move = child_score, child_move
+
+            move = transform_move(move=move,transform=transform)
+
+        solved[key] = (score, move.number if move is not None else 0)
+
+        return score
+
+    for g in enumerate_grids(grid=grid):
+        solve(g)
+
+    return solved
+
+def write_tablebase(path,mode=TTT_3_IN_A_ROW):
+
+    if mode != TTT_3_IN_A_ROW:
+        raise TicTacToeException(
+            'Full tablebases can only be built for 3-in-a-row games. Use ' \
+            'the endgame tablebases for bigger games.')
+
+    solved = solve_grids(grid=Grid())
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(TABLEBASE_MAGIC, TABLEBASE_VERSION, mode, 0, len(solved)))
+
+        for key in sorted(solved):
+            score, move = solved[key]
+            f.write(RECORD.pack(key, score, move))
+
+    return len(solved)
+
+
+class Tablebase(object):
+
+    MODE = TTT_3_IN_A_ROW
+
+    GRID_KLASS = Grid
+
+    def __init__(self,path):
+
+        self._path = path
+
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, mode, _, count = HEADER.unpack_from(self._map, 0)
+
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION or mode != self.MODE:
+            self.close()
+            raise TicTacToeException(
+                'File:{} is not a version {} tablebase for game mode {}'.format(path,
+                                                                             TABLEBASE_VERSION,
+                                                                             self.MODE))
+
+        if len(self._map) != HEADER.size + (count * RECORD.size):
+            self.close()
+            raise TicTacToeException(
+                'Tablebase file:{} is truncated or corrupted'.format(path))
+
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def path(self):
+        return self._path
+
+    def close(self):
+        self._map.close()
+
+    def probe_hash(self,hash):
+
+        """
+            Looks up a canonical grid hash and returns a (score, best move cell)
+            tuple, or None if the hash is not in the tablebase.
+        """
+
+        low, high = 0, self._count - 1
+        data, offset, size = self._map, HEADER.size, RECORD.size
+
+        while low <= high:
+            middle = (low + high) >> 1
+            key = KEY.unpack_from(data, offset + (middle * size))[0]
+
+            if key < hash:
+                low = middle + 1
+            elif key > hash:
+                high = middle - 1
+            else:
+                return RECORD.unpack_from(data, offset + (middle * size))[1:3]
+
+        return None
+
+    def probe(self,grid):
+
+        """
+            Returns a (score, best move) tuple for **grid**, with the best move
+            mapped back from the canonical grid onto **grid**, or None if the
+            grid is not in the tablebase.
+        """
+
+        if type(grid) is not self.GRID_KLASS:
+            return None
+
+        key, transform = grid.canonical()
+        record = self.probe_hash(hash=key)
+
+        if record is None:
+            return None
+
+        score, cell = record
+        if cell == 0:
+            return score, None
+
+        move = grid.MOVE_KLASS(number=cell,player=player_to_move(grid=grid))
+        if transform != IDENTITY:
+            move = transform_move(move=move,transform=inverse_transform(transform))
+
+        return score, move
+
+
+def endgame_tablebase_path(directory,mode,free):
+
+    size = MODES[GAME_MODES[mode]['LINE']]['length']
+    return os.path.join(directory, 'ttt{}x{}_free{}.tb'.format(size, size, free))
+
+def enumerate_endgame_occupancies(mode,free):
+
+    """
+        Returns the `GridState` occupancy of every grid of **mode** with
+        exactly **free** free cells, sorted.
+    """
+
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+    bits = [1 << c for c in xrange(0, cells, 1)]
+
+    return sorted([sum(taken) for taken in combinations(bits, cells - free)])
+
+def verify_endgame_limits(mode,max_free):
+
+    verify_game_mode(game_mode=mode)
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+
+    if max_free < 1 or max_free >= cells:
+        raise TicTacToeException(
+            'max_free must be a number between 1-{} for game mode {}'.format(cells - 1, mode))
+
+def solve_endgame_chunk(mode,free,occupancy,previous=None):
+
+    """
+        Yields a (Player 1 bitboard, score, best move cell) tuple for every
+        grid with **free** free cells and **occupancy** taken cells that can
+        be reached by playing, sorted by Player 1 bitboard. **previous** is
+        the `EndgameLayer` with one free cell less, only the chunks of
+        occupancy | cell of it are read. Full grids are scored on the fly,
+        so it is not needed when **free** is 1.
+    """
+
+    cells = MODES[GAME_MODES[mode]['GRID_STATE']]['length']
+    lines = WIN_LINE_MASKS[mode]
+
+    def has_line(bitboard):
+        for m in lines:
+            if bitboard & m == m:
+                return True
+        return False
+
+    # A won grid is only reached if taking back one of the moves of the
+    # winner leaves no line at all, otherwise the game ended earlier.
+    won_by_last_move = lambda bitboard : any([not has_line(bitboard ^ (1 << c))
+                                              for c in xrange(0, cells, 1) if bitboard & (1 << c)])
+
+    taken = cells - free
+    last_player = PLAYER_1 if taken % 2 else PLAYER_2
+
+    free_bits = [(c, 1 << c) for c in xrange(0, cells, 1) if not occupancy & (1 << c)]
+    children = {}
+
+    if free > 1:
+        for c, bit in free_bits:
+            children[bit] = previous.chunk(occupancy=occupancy | bit)
+
+    # Player 2 marks are picked from the highest cell down, so the Player 1
+    # bitboards, the rest of the occupancy, come out sorted.
+    taken_bits = [1 << c for c in xrange(cells - 1, -1, -1) if occupancy & (1 << c)]
+
+    for marks in combinations(taken_bits, taken // 2):
+        player_2 = sum(marks)
+        player_1 = occupancy ^ player_2
+        won_1, won_2 = has_line(player_1), has_line(player_2)
+
+        # Only the player that moved last can have completed a line.
+        if (won_1 and last_player == PLAYER_2) or (won_2 and last_player == PLAYER_1):
+            continue
+
+        if won_1 or won_2:
+            if won_by_last_move(player_1 if won_1 else player_2):
+                yield player_1, -WIN_SCORE, 0
+
+            continue
+
+        mover = player_1 if last_player == PLAYER_2 else player_2
+        best_score, best_cell = None, 0
+
+        for c, bit in free_bits:
+            if has_line(mover | bit):
+                best_score, best_cell = back_up_score(score=-WIN_SCORE), c + 1
+                break
+
+            if free == 1:
+                score = DRAW_SCORE
+            else:
+                keys, values = children[bit]
+                child_player_1 = player_1 | bit if last_player == PLAYER_2 else player_1
+                score = back_up_score(score=values[bisect_left(keys, child_player_1)])
+
+            if best_score is None or score > best_score:
+                best_score, best_cell = score, c + 1
+
+        yield player_1, best_score, best_cell
+
+def write_endgame_tablebase(directory,mode=TTT_4_IN_A_ROW,max_free=2):
+
+    """
+        Solves every grid of **mode** with 1 to **max_free** free cells and
+        writes one file per number of free cells into **directory**. Returns
+        a dictionary of free cells to the number of positions written.
+    """
+
+    verify_endgame_limits(mode=mode,max_free=max_free)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    totals = {}
+    previous = None
+
+    try:
+        for free in xrange(1, max_free + 1, 1):
+            path = endgame_tablebase_path(directory=directory,mode=mode,free=free)
+            occupancies = enumerate_endgame_occupancies(mode=mode,free=free)
+            index = []
+            first = 0
+
+            with open(path, 'wb') as f:
+                # The header and the chunk index are only known at the end,
+                # the records go right after the space left for them.
+                f.seek(ENDGAME_HEADER.size + (len(occupancies) * CHUNK.size))
+
+                for occupancy in occupancies:
+                    records = solve_endgame_chunk(mode=mode,free=free,occupancy=occupancy,previous=previous)
+                    total = 0
+
+                    while True:
+                        batch = [RECORD.pack(*record) for record in islice(records, ENDGAME_WRITE_BATCH)]
+                        if not batch:
+                            break
+
+                        f.write(''.join(batch))
+                        total += len(batch)
+
+                    index.append(CHUNK.pack(occupancy, first, total))
+                    first += total
+
+                f.seek(0)
+                f.write(ENDGAME_HEADER.pack(ENDGAME_MAGIC, TABLEBASE_VERSION, mode, free,
+                                            len(occupancies), first))
+                f.write(''.join(index))
+
+            if previous is not None:
+                previous.close()
+
+            previous = EndgameLayer(path=path,mode=mode,free=free)
+            totals[free] = first
+    finally:
+        if previous is not None:
+            previous.close()
+
+    return totals
+
+
+class EndgameLayer(object):
+
+    def __init__(self,path,mode,free):
+
+        self._path = path
+
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, layer_mode, layer_free, chunks, records = ENDGAME_HEADER.unpack_from(self._map, 0)
+
+        if magic != ENDGAME_MAGIC or version != TABLEBASE_VERSION or \
+           layer_mode != mode or layer_free != free:
+            self.close()
+            raise TicTacToeException(
+                'File:{} is not a version {} endgame tablebase for game mode {} ' \
+                'with {} free cells'.format(path,TABLEBASE_VERSION,mode,free))
+
+        if len(self._map) != ENDGAME_HEADER.size + (chunks * CHUNK.size) + (records * RECORD.size):
+            self.close()
+            raise TicTacToeException(
+                'Endgame tablebase file:{} is truncated or corrupted'.format(path))
+
+        self._chunks  = chunks
+        self._records = ENDGAME_HEADER.size + (chunks * CHUNK.size)
+
+    def close(self):
+        self._map.close()
+
+    def _find_chunk(self,occupancy):
+
+        data = self._map
+        low, high = 0, self._chunks - 1
+
+        while low <= high:
+            middle = (low + high) >> 1
+            key, first, total = CHUNK.unpack_from(data, ENDGAME_HEADER.size + (middle * CHUNK.size))
+
+            if key < occupancy:
+                low = middle + 1
+            elif key > occupancy:
+                high = middle - 1
+            else:
+                return first, total
+
+        return None
+
+    def chunk(self,occupancy):
+
+        """
+            Returns a (Player 1 bitboards, scores) tuple of arrays, sorted by
+            Player 1 bitboard, with all the records of **occupancy**, or None
+            if there is no chunk for it.
+        """
+
+        found = self._find_chunk(occupancy=occupancy)
+        if found is None:
+            return None
+
+        first, total = found
+        start = self._records + (first * RECORD.size)
+        data = self._map[start:start + (total * RECORD.size)]
+
+        keys, fields = array('I'), array('h')
+        keys.fromstring(data)
+        fields.fromstring(data)
+
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            fields.byteswap()
+
+        # A record is 2 words of uint32, or 4 of int16, and the score is
+        # the third int16.
+        return keys[0::2], fields[2::4]
+
+    def probe(self,occupancy,player_1):
+
+        found = self._find_chunk(occupancy=occupancy)
+        if found is None:
+            return None
+
+        data = self._map
+        first, total = found
+        low, high = first, first + total - 1
+
+        while low <= high:
+            middle = (low + high) >> 1
+            key = KEY.unpack_from(data, self._records + (middle * RECORD.size))[0]
+
+            if key < player_1:
+                low = middle + 1
+            elif key > player_1:
+                high = middle - 1
+            else:
+                return RECORD.unpack_from(data, self._records + (middle * RECORD.size))[1:3]
+
+        return None
+
+
+class EndgameTablebase(object):
+
+    def __init__(self,directory,mode=TTT_4_IN_A_ROW):
+
+        verify_game_mode(game_mode=mode)
+
+        self._directory = directory
+        self._mode      = mode
+        self._layers    = {}
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def directory(self):
+        return self._directory
+
+    def layer(self,free):
+
+        """
+            Returns the `EndgameLayer` for grids with **free** free cells,
+            memory-mapping its file the first time it is needed, or None if
+            there is no file for it.
+        """
+
+        if free not in self._layers:
+            path = endgame_tablebase_path(directory=self._directory,mode=self._mode,free=free)
+            self._layers[free] = EndgameLayer(path=path,mode=self._mode,free=free) \
+                                 if os.path.isfile(path) else None
+
+        return self._layers[free]
+
+    def close(self):
+
+        for layer in self._layers.values():
+            if layer is not None:
+                layer.close()
+
+        self._layers = {}
+
+    def probe(self,grid):
+
+        """
+            Returns a (score, best move) tuple for **grid**, or None if there
+            is no endgame tablebase for it.
+        """
+
+        if type(grid) is not GRID_KLASSES[self._mode]:
+            return None
+
+        free = grid.total_free_cells()
+        if free == 0:
+            return None
+
+        layer = self.layer(free=free)
+        if layer is None:
+            return None
+
+        player_1, player_2 = grid_hash_to_bitboards(hash=grid.hash,mode=self._mode,trusted=True)
+        record = layer.probe(occupancy=player_1 | player_2,player_1=player_1)
+
+        if record is None:
+            return None
+
+        score, cell = record
+        if cell == 0:
+            return score, None
+
+        return score, grid.MOVE_KLASS(number=cell,player=player_to_move(grid=grid))
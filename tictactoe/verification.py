@@ -1,4 +1,6 @@
 
+import os
+
 from functools import partial
 from itertools import ifilterfalse
 
@@ -9,6 +11,26 @@ from tictactoe.settings import (available_modes, FREE_SPACE, PLAYER_1, PLAYER_2,
                                 TTT_4_IN_A_ROW, TTT_5_IN_A_ROW, MODES, GAME_MODES)
 
 
+DEBUG_ENVIRON = 'TICTACTOE_DEBUG'
+
+# Values the library builds from values it already checked, like the grid
+# after a legal move, skip these checks. With debug on they are checked
+# again anyway, which is slower but catches a bug in the library itself.
+DEBUG = {
+    'enabled' : os.environ.get(DEBUG_ENVIRON, '').lower() not in ('', '0', 'false', 'no')
+}
+
+
+def is_debug():
+    return DEBUG['enabled']
+
+def set_debug(enabled):
+    """
+        Turns full checking of every value the library builds internally on
+        or off, overriding the `TICTACTOE_DEBUG` environment variable.
+    """
+    DEBUG['enabled'] = bool(enabled)
+
 
 non_players = partial(
                 ifilterfalse,
@@ -96,24 +118,20 @@ def verify_hash(hash,mode=GRID):
     if not isinstance(hash,(int,long)):
         raise TicTacToeException('Hash must be an int or long')
 
-    for m in [GRID, GRID_STATE, LINE,
-              GRID_4, GRID_STATE_4, LINE_4,
-              GRID_5, GRID_STATE_5, LINE_5]:
-
-        if m == mode:
-            if hash < 0 or hash >= (1 << MODES[mode]['length']):
-                TicTacToeException(
-                    'An invalid hash:{} was passed for mode:{}, '\
-                    'only hash acceptables are from 0-{}'.format(hash,
-                                                                mode,
-                                                                (1 << MODES[mode]['length'] -1)))
-            else:
-                break
-    else:
+    try:
+        length = MODES[mode]['length']
+    except (KeyError, TypeError):
         raise TicTacToeException(
             'An invalid hash mode was found:{} '\
             'only acceptable modes are :{} '.format(mode, available_modes()))
 
+    if hash < 0 or hash >> length:
+        raise TicTacToeException(
+            'An invalid hash:{} was passed for mode:{}, '\
+            'only hash acceptables are from 0-{}'.format(hash,
+                                                        mode,
+                                                        (1 << length) - 1))
+
 def verify_binary(binary,mode=GRID):
 
     for m in [GRID, GRID_STATE, LINE,